@@ -0,0 +1,11 @@
+"""
+Puts ../backend on sys.path so these scripts share the backend's services (same approach
+as api/index.py). Import it before any `app.` module: `import backend_path  # noqa: F401`.
+"""
+import os
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
@@ -0,0 +1,129 @@
+"""
+Benchmark the local FinBERT inference backends and check the ONNX backends' accuracy
+parity against full-precision PyTorch.
+
+Usage:
+    cd Starting_Algorithm
+    python bench_inference.py [--corpus headlines.txt] [--threads 4] [--batch 32] [--min-agreement 0.97]
+
+--corpus is a text file with one headline per line, or a JSON Lines file with "text"
+(e.g. a --high-out / --low-out file from main.py). Without it a built-in sample is
+repeated with numbered variants. Exits with status 1 if an ONNX backend agrees with
+PyTorch on fewer than --min-agreement of the labels.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+import backend_path  # noqa: F401  (puts the backend's `app` package on sys.path)
+
+from app.core.config import settings
+from inference import OnnxBackend, TorchBackend
+
+MODEL_NAME = "ProsusAI/finbert"
+
+SAMPLE = [
+    "The new normal: Wall Street says high stock valuations may be here to stay.",
+    "Fears Britain may be edging closer to a recession have been stoked by new figures showing a drop in job openings.",
+    "The FED Chair Jerome Powell has announced a rate increase of 50bps.",
+    "Despite rising costs, the company managed to meet earnings expectations.",
+    "Apple shares surge to a record high after earnings beat estimates",
+    "Tesla stock plunges as deliveries miss analyst forecasts",
+    "Oil prices steady ahead of OPEC meeting",
+    "Regional bank shares tumble after a surprise quarterly loss and a dividend cut",
+    "Microsoft to hold its annual shareholder meeting in December",
+    "Retailer raises full-year guidance on strong holiday demand, shares jump in premarket trading",
+]
+
+def load_corpus(path: str, size: int) -> list[str]:
+    if path:
+        with open(path, encoding="utf-8") as f:
+            lines = [line.strip() for line in f if line.strip()]
+        if lines and lines[0].startswith("{"):
+            lines = [json.loads(line).get("text") or json.loads(line).get("headline") for line in lines]
+        return [line for line in lines if line]
+    # Numbered variants so no two texts are identical
+    return [f"{SAMPLE[i % len(SAMPLE)]} ({i})" for i in range(size)]
+
+def run(name, factory, texts, batch, repeat):
+    start = time.perf_counter()
+    backend = factory()
+    load_seconds = time.perf_counter() - start
+
+    backend.predict(texts[:batch])  # warm-up
+    batch_latencies = []
+    predictions = None
+    start = time.perf_counter()
+    for _ in range(repeat):
+        predictions = []
+        for i in range(0, len(texts), batch):
+            t = time.perf_counter()
+            predictions.extend(backend.predict(texts[i:i + batch]))
+            batch_latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+
+    ordered = sorted(batch_latencies)
+    row = {
+        "backend": name,
+        "load_seconds": round(load_seconds, 2),
+        "headlines_per_second": round(len(texts) * repeat / elapsed, 1),
+        "batch_p50_ms": round(statistics.median(ordered) * 1000, 1),
+        "batch_p95_ms": round(ordered[min(int(0.95 * len(ordered)), len(ordered) - 1)] * 1000, 1),
+    }
+    print(f"{name:<18} load {row['load_seconds']:>6.2f}s  {row['headlines_per_second']:>8.1f} headlines/s"
+          f"  batch p50 {row['batch_p50_ms']:>7.1f}ms  p95 {row['batch_p95_ms']:>7.1f}ms")
+    return row, predictions
+
+def parity(reference, candidate) -> dict:
+    agreement = sum(r[0] == c[0] for r, c in zip(reference, candidate)) / len(reference)
+    # Compare the probability each backend gives its own winning label only where labels agree
+    diffs = [abs(r[1] - c[1]) for r, c in zip(reference, candidate) if r[0] == c[0]]
+    return {
+        "label_agreement": round(agreement, 4),
+        "mean_confidence_diff": round(statistics.mean(diffs), 4) if diffs else None,
+        "max_confidence_diff": round(max(diffs), 4) if diffs else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=None)
+    parser.add_argument("--size", type=int, default=256, help="Headlines in the built-in corpus")
+    parser.add_argument("--batch", type=int, default=settings.FINBERT_MAX_BATCH)
+    parser.add_argument("--threads", type=int, default=settings.FINBERT_THREADS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--onnx-dir", default=settings.FINBERT_ONNX_DIR)
+    parser.add_argument("--min-agreement", type=float, default=0.97)
+    args = parser.parse_args()
+
+    texts = load_corpus(args.corpus, args.size)
+    options = {"max_batch": args.batch, "threads": args.threads}
+    print(f"{len(texts)} headlines, batch {args.batch}, threads {args.threads or 'default'}\n")
+
+    variants = [
+        ("torch (unbucketed)", lambda: TorchBackend(MODEL_NAME, bucket=False, **options)),
+        ("torch", lambda: TorchBackend(MODEL_NAME, **options)),
+        ("onnx fp32", lambda: OnnxBackend(MODEL_NAME, args.onnx_dir, quantize=False, **options)),
+        ("onnx int8", lambda: OnnxBackend(MODEL_NAME, args.onnx_dir, quantize=True, **options)),
+    ]
+    rows, outputs = [], {}
+    for name, factory in variants:
+        row, predictions = run(name, factory, texts, args.batch, args.repeat)
+        rows.append(row)
+        outputs[name] = predictions
+
+    print("\nParity against torch:")
+    failed = False
+    for name in ("torch (unbucketed)", "onnx fp32", "onnx int8"):
+        result = parity(outputs["torch"], outputs[name])
+        ok = result["label_agreement"] >= args.min_agreement
+        failed |= not ok
+        print(f"  {name:<18} {result}  {'PASS' if ok else 'FAIL'}")
+        next(row for row in rows if row["backend"] == name).update(result)
+
+    print("\n" + json.dumps(rows, indent=2))
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
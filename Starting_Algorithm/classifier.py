@@ -1,14 +1,53 @@
-# Import the necessary components from the transformers library
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
+import threading
+
+import backend_path  # noqa: F401  (puts the backend's `app` package on sys.path)
+
+from app.core.config import settings
+from app.services.sentiment_cache import SentimentCache
+from inference import InferenceBackend, cache_suffix, make_backend
 
 # Define the model we want to use. "ProsusAI/finbert" is a popular, well-trained choice.
 MODEL_NAME = "ProsusAI/finbert"
 
-print("Loading model and tokenizer...")
-tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
-print("Model and tokenizer loaded.")
+# Content-addressed score cache, shared with the backend classifier.
+# Repeated headlines skip the model entirely, including across restarts.
+# Quantized scores differ slightly, so they are kept apart from the full-precision ones.
+sentiment_cache = SentimentCache(
+    settings.SENTIMENT_CACHE_PATH,
+    max_entries=settings.SENTIMENT_CACHE_MAX_ENTRIES,
+    namespace=MODEL_NAME + cache_suffix(settings.FINBERT_BACKEND, settings.FINBERT_ONNX_QUANTIZE),
+)
+
+# The model is loaded on first use (or by `warmup()`), not at import, so importing this
+# module and running `main.py --help` stay fast and cached headlines never load it at all.
+_backend: InferenceBackend | None = None
+_backend_lock = threading.Lock()
+
+def get_backend() -> InferenceBackend:
+    """
+    The FinBERT inference backend selected by FINBERT_BACKEND, loaded on first call.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            # FINBERT_BACKEND selects PyTorch ("torch") or the int8-quantized ONNX export ("onnx")
+            print(f"Loading model and tokenizer ({settings.FINBERT_BACKEND} backend)...")
+            _backend = make_backend(
+                settings.FINBERT_BACKEND,
+                MODEL_NAME,
+                settings.FINBERT_ONNX_DIR,
+                quantize=settings.FINBERT_ONNX_QUANTIZE,
+                max_batch=settings.FINBERT_MAX_BATCH,
+                threads=settings.FINBERT_THREADS,
+            )
+            print("Model and tokenizer loaded.")
+        return _backend
+
+def warmup():
+    """
+    Load the model now instead of on the first uncached headline.
+    """
+    get_backend()
 
 def analyze_sentiment(text: str) -> tuple[str, float]:
     """
@@ -21,35 +60,39 @@ def analyze_sentiment(text: str) -> tuple[str, float]:
         A tuple containing the predicted sentiment ('positive', 'negative', 'neutral')
         and the confidence score (a float between 0 and 1).
     """
-    if not text or not isinstance(text, str):
-        return ("invalid_input", 0.0)
-
-    # 1. Tokenize the input text
-    # The tokenizer prepares the text for the model.
-    # `padding=True` and `truncation=True` handle texts of different lengths.
-    inputs = tokenizer(text, padding=True, truncation=True, return_tensors='pt', max_length=512)
-
-    # 2. Get model predictions (logits)
-    # We disable gradient calculation for inference, which speeds things up.
-    with torch.no_grad():
-        outputs = model(**inputs)
-        logits = outputs.logits
-
-    # 3. Convert logits to probabilities
-    # A "softmax" function converts the raw model output (logits) into probabilities for each class.
-    probabilities = torch.nn.functional.softmax(logits, dim=-1)
-
-    # 4. Get the winning label and its score
-    # `torch.argmax` finds the index of the highest probability.
-    predicted_class_id = torch.argmax(probabilities).item()
-    confidence_score = probabilities[0][predicted_class_id].item()
-
-    # The model's labels are ['positive', 'negative', 'neutral']. We map the index to the label.
-    # You might see this called `model.config.id2label` in more advanced use cases.
-    labels = ['positive', 'negative', 'neutral']
-    predicted_label = labels[predicted_class_id]
-
-    return (predicted_label, confidence_score)
+    return analyze_sentiment_batch([text])[0]
+
+def analyze_sentiment_batch(texts: list[str]) -> list[tuple[str, float]]:
+    """
+    Analyzes several texts with batched forward passes of the model.
+
+    Returns one (stance, confidence) tuple per text, in order, with the same semantics
+    as `analyze_sentiment`. Cached and duplicate texts are not sent to the model.
+    """
+    results = [("invalid_input", 0.0)] * len(texts)
+
+    positions: dict[str, list[int]] = {}
+    for i, text in enumerate(texts):
+        if text and isinstance(text, str):
+            positions.setdefault(text, []).append(i)
+
+    cached = sentiment_cache.get_many(positions) if positions else {}
+    for text, result in cached.items():
+        for i in positions[text]:
+            results[i] = result
+    to_score = [text for text in positions if text not in cached]
+
+    if not to_score:
+        return results
+
+    # Length-bucketed batches through the selected backend
+    scored = list(zip(to_score, get_backend().predict(to_score)))
+
+    sentiment_cache.set_many(scored)
+    for text, result in scored:
+        for i in positions[text]:
+            results[i] = result
+    return results
 
 # --- Example Usage ---
 if __name__ == "__main__":
@@ -0,0 +1,210 @@
+import os
+import shutil
+import tempfile
+from typing import TYPE_CHECKING
+
+# numpy, torch, transformers and onnxruntime are imported when a backend is built,
+# so importing this module (and classifier.py) stays cheap
+if TYPE_CHECKING:
+    import numpy as np
+
+# The model's labels are ['positive', 'negative', 'neutral']; the index of the
+# winning logit maps to a label (see `model.config.id2label`).
+LABELS = ['positive', 'negative', 'neutral']
+
+def length_buckets(lengths: list[int], max_batch: int) -> list[list[int]]:
+    """
+    Group text positions into batches of similar token length (longest first), so each
+    batch is only padded to its own longest text instead of the longest text overall.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    step = max(1, max_batch)
+    return [order[i:i + step] for i in range(0, len(order), step)]
+
+def cache_suffix(name: str, quantize: bool = True) -> str:
+    """
+    Sentiment cache namespace suffix for a backend, known before the backend is loaded.
+    Scores from numerically different backends are cached separately.
+    """
+    if name == "onnx":
+        return ":onnx-int8" if quantize else ":onnx"
+    return ""
+
+def _softmax(logits: "np.ndarray") -> "np.ndarray":
+    import numpy as np
+
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+class InferenceBackend:
+    """
+    Tokenizes texts once, runs them through the model in length-bucketed batches and
+    returns one (stance, confidence) tuple per text, in order.
+
+    Subclasses implement `_logits(encoded)` for one padded batch.
+
+    Args:
+        max_batch: Maximum texts per forward pass.
+        threads: Intra-op CPU threads (0 keeps the runtime's default).
+        bucket: Sort texts into length buckets; False pads each batch in input order.
+    """
+
+    name = "base"
+
+    def __init__(self, tokenizer, max_batch: int = 32, threads: int = 0, bucket: bool = True, max_length: int = 512):
+        self.tokenizer = tokenizer
+        self.max_batch = max_batch
+        self.threads = threads
+        self.bucket = bucket
+        self.max_length = max_length
+
+    def _logits(self, encoded: dict) -> "np.ndarray":
+        raise NotImplementedError
+
+    def _tensor_type(self) -> str:
+        return "np"
+
+    def predict(self, texts: list[str]) -> list[tuple[str, float]]:
+        if not texts:
+            return []
+        # 1. Tokenize without padding; each batch is padded separately below
+        encodings = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+        if self.bucket:
+            batches = length_buckets([len(ids) for ids in encodings["input_ids"]], self.max_batch)
+        else:
+            batches = [list(range(i, min(i + self.max_batch, len(texts)))) for i in range(0, len(texts), self.max_batch)]
+
+        results: list[tuple[str, float]] = [("neutral", 0.0)] * len(texts)
+        for positions in batches:
+            features = {key: [encodings[key][i] for i in positions] for key in encodings.keys()}
+            # 2. Pad to the batch's longest text and get the logits
+            encoded = self.tokenizer.pad(features, padding=True, return_tensors=self._tensor_type())
+            # 3. Convert logits to probabilities and take the winning label per row
+            probabilities = _softmax(self._logits(encoded))
+            for i, row in zip(positions, probabilities):
+                class_id = int(row.argmax())
+                results[i] = (LABELS[class_id], float(row[class_id]))
+        return results
+
+class TorchBackend(InferenceBackend):
+    """
+    The full-precision PyTorch FinBERT model.
+    """
+
+    name = "torch"
+
+    def __init__(self, model_name: str, **options):
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+        super().__init__(AutoTokenizer.from_pretrained(model_name), **options)
+        self._torch = torch
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        self.model.eval()
+
+    def _tensor_type(self) -> str:
+        return "pt"
+
+    def _logits(self, encoded: dict) -> "np.ndarray":
+        # We disable gradient calculation for inference, which speeds things up.
+        with self._torch.no_grad():
+            return self.model(**encoded).logits.numpy()
+
+def export_onnx(model_name: str, out_dir: str, quantize: bool = True) -> str:
+    """
+    Export `model_name` to ONNX in `out_dir` (with its tokenizer), optionally adding a
+    dynamically int8-quantized copy, and return the path of the model to serve.
+    Exports are reused; delete `out_dir` to force a new one.
+    """
+    fp32_path = os.path.join(out_dir, "model.onnx")
+    int8_path = os.path.join(out_dir, "model.int8.onnx")
+    target = int8_path if quantize else fp32_path
+    if os.path.exists(target):
+        return target
+
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    print(f"Exporting {model_name} to ONNX in {out_dir}...")
+    os.makedirs(os.path.dirname(os.path.abspath(out_dir)), exist_ok=True)
+    # Build in a scratch directory and move it into place, so a crash never leaves half an export
+    scratch = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(out_dir)))
+    try:
+        if os.path.exists(fp32_path):
+            shutil.copy(fp32_path, os.path.join(scratch, "model.onnx"))
+        else:
+            tokenizer = AutoTokenizer.from_pretrained(model_name)
+            model = AutoModelForSequenceClassification.from_pretrained(model_name)
+            model.eval()
+            sample = tokenizer(["Export sample headline"], return_tensors="pt")
+            names = list(sample.keys())
+            torch.onnx.export(
+                model,
+                tuple(sample[name] for name in names),
+                os.path.join(scratch, "model.onnx"),
+                input_names=names,
+                output_names=["logits"],
+                dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in names}, "logits": {0: "batch"}},
+                opset_version=14,
+            )
+            tokenizer.save_pretrained(scratch)
+
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            # Weights of the linear layers become int8; activations are quantized on the fly
+            quantize_dynamic(os.path.join(scratch, "model.onnx"), os.path.join(scratch, "model.int8.onnx"), weight_type=QuantType.QInt8)
+
+        os.makedirs(out_dir, exist_ok=True)
+        for entry in os.listdir(scratch):
+            os.replace(os.path.join(scratch, entry), os.path.join(out_dir, entry))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    print("Export done.")
+    return target
+
+class OnnxBackend(InferenceBackend):
+    """
+    FinBERT exported to ONNX and run with onnxruntime on CPU, int8-quantized by default.
+    Needs `onnxruntime` (and `torch` + `onnx` once, for the export).
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_name: str, onnx_dir: str, quantize: bool = True, **options):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError("The onnx backend needs onnxruntime: pip install onnxruntime onnx") from e
+        from transformers import AutoTokenizer
+
+        model_path = export_onnx(model_name, onnx_dir, quantize=quantize)
+        super().__init__(AutoTokenizer.from_pretrained(onnx_dir), **options)
+        self.quantize = quantize
+
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.threads:
+            session_options.intra_op_num_threads = self.threads
+            session_options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(model_path, session_options, providers=["CPUExecutionProvider"])
+        self._input_names = [i.name for i in self.session.get_inputs()]
+
+    def _logits(self, encoded: dict) -> "np.ndarray":
+        import numpy as np
+
+        feed = {name: np.asarray(encoded[name], dtype=np.int64) for name in self._input_names if name in encoded}
+        return self.session.run(["logits"], feed)[0]
+
+BACKENDS = {"torch": TorchBackend, "onnx": OnnxBackend}
+
+def make_backend(name: str, model_name: str, onnx_dir: str, quantize: bool = True, **options) -> InferenceBackend:
+    """
+    Build the inference backend called `name` ("torch" or "onnx").
+    """
+    if name == "onnx":
+        return OnnxBackend(model_name, onnx_dir, quantize=quantize, **options)
+    if name == "torch":
+        return TorchBackend(model_name, **options)
+    raise ValueError(f"Unknown inference backend {name!r}; expected one of {sorted(BACKENDS)}")
@@ -1,24 +1,44 @@
 import requests
 from bs4 import BeautifulSoup
-import pandas as pd
-import time
-import random
 from urllib.parse import urljoin
 
+import backend_path  # noqa: F401  (puts the backend's `app` package on sys.path)
+
+from app.core.config import settings
+from app.core.ratelimit import map_concurrently, rate_limited_get
+from app.services.universe import sp500_universe
+
 def get_sp500_tickers() -> list[str]:
     """
-    Scrape the current list of S&P 500 tickers from Wikipedia.
-    Returns a list of symbols with '.' replaced by '-' (e.g., BRK.B -> BRK-B).
-    Falls back to a small default list on error.
+    Current list of S&P 500 tickers (e.g. BRK-B), shared with the backend's cached universe.
+    Read from the local snapshot when one exists; otherwise scraped from Wikipedia once and saved.
+    Falls back to a small default list if no snapshot exists and scraping fails.
     """
-    url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+    return sp500_universe.get(wait=True)
+
+def make_session() -> requests.Session:
+    session = requests.Session()
+    session.headers.update({'User-Agent': 'Mozilla/5.0 (compatible; goodfellow-bot/0.1)'})
+    return session
+
+def scrape_ticker_headlines(session: requests.Session, ticker: str) -> list[dict]:
+    """
+    Scrape the Yahoo Finance news headlines for one ticker as {'ticker', 'headline'} dicts.
+    Returns an empty list if the page cannot be fetched.
+    """
+    url = f"https://finance.yahoo.com/quote/{ticker}/news?p={ticker}"
     try:
-        df = pd.read_html(url, header=0)[0]
-        tickers = df['Symbol'].astype(str).str.replace('.', '-', regex=False).tolist()
-        return tickers
+        # Paced by the per-host limiter shared with the backend; retries 429/5xx
+        response = rate_limited_get(session, url, timeout=10)
+        response.raise_for_status()
+        soup = BeautifulSoup(response.text, 'html.parser')
+
+        # Find all news headlines
+        headlines = soup.find_all('h3', class_='Mb(5px)')
+        return [{'ticker': ticker, 'headline': headline.get_text(strip=True)} for headline in headlines]
     except Exception:
-        # fallback to a few major tickers if scraping fails
-        return ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'BRK-B', 'JNJ', 'V', 'WMT', 'JPM', 'META', 'NVDA', 'UNH', 'HD', 'PG', 'DIS', 'MA', 'PYPL', 'BAC']
+        # skip problematic tickers and continue
+        return []
 
 def yfinance_scrape(tickers: list[str] | None = None, max_tickers: int | None = 500) -> list[dict]:
     """
@@ -37,31 +57,50 @@ def yfinance_scrape(tickers: list[str] | None = None, max_tickers: int | None =
     if max_tickers is not None:
         tickers = tickers[:max_tickers]
 
-    all_headlines = []
-    session = requests.Session()
-    session.headers.update({'User-Agent': 'Mozilla/5.0 (compatible; goodfellow-bot/0.1)'})
+    session = make_session()
 
-    for ticker in tickers:
-        url = f"https://finance.yahoo.com/quote/{ticker}/news?p={ticker}"
-        try:
-            response = session.get(url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Find all news headlines
-            headlines = soup.find_all('h3', class_='Mb(5px)')
-
-            for headline in headlines:
-                text = headline.get_text(strip=True)
-                all_headlines.append({'ticker': ticker, 'headline': text})
-        except Exception:
-            # skip problematic tickers and continue
-            continue
+    # Concurrent fetches; the shared rate limiter keeps requests just under the allowed rate
+    results = map_concurrently(lambda ticker: scrape_ticker_headlines(session, ticker), tickers, settings.SCRAPE_CONCURRENCY)
+    return [headline for headlines in results for headline in headlines]
 
-        # polite rate limiting to avoid hammering the site
-        time.sleep(random.uniform(0.2, 0.8))
+# Default Yahoo Finance pages for general market headlines
+GENERAL_SOURCES = [
+    "https://finance.yahoo.com/",                       # front page / top stories
+    "https://finance.yahoo.com/news",                   # news feed
+    "https://finance.yahoo.com/topic/stock-market-news" # market-focused stories
+]
 
-    return all_headlines
+def scrape_general_source(session: requests.Session, source: str) -> list[dict]:
+    """
+    Scrape the headlines on one Yahoo Finance page as {'source', 'headline', 'link'} dicts.
+    Returns an empty list if the page cannot be fetched.
+    """
+    try:
+        resp = rate_limited_get(session, source, timeout=10)
+        resp.raise_for_status()
+        soup = BeautifulSoup(resp.text, 'html.parser')
+    except Exception:
+        # ignore errors for a source and continue with others
+        return []
+
+    # Try common headline containers: h3 or h2 elements with links
+    candidates = []
+    candidates += soup.find_all('h3')
+    candidates += soup.find_all('h2')
+    candidates += soup.find_all('a', {'class': 'Fw(600)'})  # sometimes used for headlines
+
+    results: list[dict] = []
+    for el in candidates:
+        # extract link and text
+        link_tag = el.find('a') if el.name != 'a' else el
+        text = el.get_text(strip=True)
+        if not text:
+            continue
+        href = link_tag.get('href') if link_tag is not None else None
+        if href:
+            href = urljoin("https://finance.yahoo.com", href)
+        results.append({'source': source, 'headline': text, 'link': href})
+    return results
 
 def yfinance_general_headlines(max_headlines: int = 200, sources: list[str] | None = None) -> list[dict]:
     """
@@ -75,54 +114,25 @@ def yfinance_general_headlines(max_headlines: int = 200, sources: list[str] | No
         List of dicts: {'source': source_url, 'headline': text, 'link': absolute_url}
     """
     if sources is None:
-        sources = [
-            "https://finance.yahoo.com/",                       # front page / top stories
-            "https://finance.yahoo.com/news",                   # news feed
-            "https://finance.yahoo.com/topic/stock-market-news" # market-focused stories
-        ]
+        sources = GENERAL_SOURCES
 
-    session = requests.Session()
-    session.headers.update({'User-Agent': 'Mozilla/5.0 (compatible; goodfellow-bot/0.1)'})
+    session = make_session()
 
     results: list[dict] = []
     for source in sources:
         if len(results) >= max_headlines:
             break
-        try:
-            resp = session.get(source, timeout=10)
-            resp.raise_for_status()
-            soup = BeautifulSoup(resp.text, 'html.parser')
-
-            # Try common headline containers: h3 or h2 elements with links
-            candidates = []
-            candidates += soup.find_all('h3')
-            candidates += soup.find_all('h2')
-            candidates += soup.find_all('a', {'class': 'Fw(600)'})  # sometimes used for headlines
-
-            seen = set()
-            for el in candidates:
-                if len(results) >= max_headlines:
-                    break
-                # extract link and text
-                link_tag = el.find('a') if el.name != 'a' else el
-                text = el.get_text(strip=True)
-                if not text:
-                    continue
-                href = link_tag.get('href') if link_tag is not None else None
-                if href:
-                    href = urljoin("https://finance.yahoo.com", href)
-                # deduplicate similar headlines
-                key = (text, href)
-                if key in seen:
-                    continue
-                seen.add(key)
-                results.append({'source': source, 'headline': text, 'link': href})
-        except Exception:
-            # ignore errors for a source and continue with others
-            continue
 
-        # polite delay
-        time.sleep(random.uniform(0.3, 1.0))
+        seen = set()
+        for item in scrape_general_source(session, source):
+            if len(results) >= max_headlines:
+                break
+            # deduplicate similar headlines
+            key = (item['headline'], item['link'])
+            if key in seen:
+                continue
+            seen.add(key)
+            results.append(item)
 
     return results[:max_headlines]
 
@@ -1,39 +1,102 @@
 import argparse
-from ingest import yfinance_scrape, yfinance_general_headlines
-from classifier import analyze_sentiment
 
-def run_pipeline(mode: str = "general", max_items: int = 200):
+import backend_path  # noqa: F401  (puts the backend's `app` package on sys.path)
+
+from app.core.config import settings
+from app.services.fast_sentiment import load_fast_classifier
+from app.services.sentiment_router import SentimentRouter
+from pipeline import StreamingPipeline, PrintSink, JsonlSink, FanOutSink, Sink
+
+def _sink(high_confidence: bool, out_path: str | None) -> Sink:
+    sink = PrintSink(high_confidence)
+    if out_path:
+        return FanOutSink([sink, JsonlSink(out_path)])
+    return sink
+
+def run_pipeline(
+    mode: str = "general",
+    max_items: int = 200,
+    workers: int = 8,
+    batch_size: int = 16,
+    queue_size: int = 256,
+    high_sink: Sink | None = None,
+    low_sink: Sink | None = None,
+    router: SentimentRouter | None = None,
+    warmup_model: bool = True,
+) -> dict:
     """
-    Runs the full ingestion and analysis pipeline.
+    Runs the full ingestion and analysis pipeline, streaming headlines from the
+    ingestion workers into the batching classifier as they are scraped.
 
     mode: "general" to use general headlines, "ticker" to use ticker-specific headlines.
     max_items: max number of headlines (for general) or tickers to process (for ticker mode).
+    high_sink / low_sink: where high- and low-confidence results go (printed by default).
+    router: when given, its fast classifier decides confident headlines and only the
+        rest are sent to FinBERT.
+    warmup_model: load the model up front; False loads it on the first uncached headline.
+
+    Returns the run summary (counts, timings and throughput).
     """
+    # Scraping and model code is only imported for a run, so `--help` stays instant
+    from ingest import (
+        get_sp500_tickers, make_session, scrape_ticker_headlines, scrape_general_source, GENERAL_SOURCES
+    )
+    from classifier import analyze_sentiment_batch, sentiment_cache, warmup
+
+    session = make_session()
     if mode == "ticker":
-        articles = yfinance_scrape(max_tickers=max_items)
+        items = get_sp500_tickers()[:max_items]
+        fetch = lambda ticker: scrape_ticker_headlines(session, ticker)
+        max_articles = None
+        dedupe_key = None
     else:
-        articles = yfinance_general_headlines(max_headlines=max_items)
+        items = GENERAL_SOURCES
+        fetch = lambda source: scrape_general_source(session, source)
+        max_articles = max_items
+        # The pages share stories (as yfinance_general_headlines dedupes them)
+        dedupe_key = lambda article: (article['headline'], article['link'])
 
-    if not articles:
-        print("No articles found. Exiting pipeline.")
-        return
+    # Results are tagged with what labelled them, so JSONL outputs used as training data
+    # (train_fast_sentiment.py) can keep FinBERT's labels and drop the fast tier's own
+    if router is not None:
+        label_sources = {"model": "finbert", "fast": f"fast:{getattr(router.fast, 'name', 'classifier')}"}
+
+        def classify(texts: list[str]) -> list[tuple[str, float, str]]:
+            results = router.score_sync(texts, analyze_sentiment_batch, with_source=True)
+            return [
+                (stance, confidence, label_sources.get(source, source))
+                for stance, confidence, source in results
+            ]
+    else:
+        def classify(texts: list[str]) -> list[tuple[str, float, str]]:
+            return [(stance, confidence, "finbert") for stance, confidence in analyze_sentiment_batch(texts)]
+
+    # Load the model before ingestion starts so the first batch does not wait for it
+    if warmup_model:
+        warmup()
 
     print(f"\n--- Starting Analysis Pipeline ({mode}) ---")
-    for article in articles:
-        # unify headline/title keys from different ingest functions
-        text = article.get('headline') or article.get('title')
-        if not text:
-            continue
-
-        stance, confidence = analyze_sentiment(text)
-
-        print(f"\nAnalyzing: '{text}'")
-        if confidence > 0.85:
-            print(f"  High Confidence -> Stance: {stance.upper()} ({confidence:.2f})")
-            # database.save_processed_article(article, stance, confidence)
-        else:
-            print(f" Low Confidence -> Flagged for Review. (Stance: {stance.upper()}, Conf: {confidence:.2f})")
-            # database.save_for_manual_review(article, stance, confidence)
+    pipeline = StreamingPipeline(
+        fetch,
+        classify,
+        high_sink or PrintSink(high_confidence=True),
+        low_sink or PrintSink(high_confidence=False),
+        ingest_workers=workers,
+        queue_size=queue_size,
+        batch_size=batch_size,
+        max_articles=max_articles,
+        dedupe_key=dedupe_key,
+    )
+    summary = pipeline.run(items)
+
+    if not summary["articles_ingested"]:
+        print("No articles found.")
+
+    print(f"\nPipeline summary: {summary}")
+    print(f"Sentiment cache: {sentiment_cache.stats()}")
+    if router is not None:
+        print(f"Sentiment routing: {router.stats()}")
+    return summary
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run ingestion -> sentiment pipeline")
@@ -41,6 +104,39 @@ if __name__ == "__main__":
                         help="Use 'general' for market headlines or 'ticker' for per-ticker headlines.")
     parser.add_argument("--max", type=int, default=200,
                         help="Maximum items to fetch (headlines or tickers).")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="Concurrent ingestion workers.")
+    parser.add_argument("--batch-size", type=int, default=16,
+                        help="Maximum headlines per classifier call.")
+    parser.add_argument("--queue-size", type=int, default=256,
+                        help="Maximum scraped headlines waiting for classification.")
+    parser.add_argument("--high-out", default=None,
+                        help="Also append high-confidence results to this JSON Lines file.")
+    parser.add_argument("--low-out", default=None,
+                        help="Also append low-confidence (review) results to this JSON Lines file.")
+    parser.add_argument("--fast-threshold", type=float, default=settings.SENTIMENT_FAST_MIN_CONFIDENCE,
+                        help="Fast-classifier confidence needed to skip FinBERT.")
+    parser.add_argument("--fast-model", default=settings.SENTIMENT_FAST_MODEL_PATH,
+                        help="Trained hashed n-gram model for the fast tier (default: finance lexicon).")
+    parser.add_argument("--router", action=argparse.BooleanOptionalAction, default=settings.SENTIMENT_ROUTER_ENABLED,
+                        help="Let the fast classifier decide confident headlines (default: SENTIMENT_ROUTER_ENABLED); "
+                             "--no-router sends every headline to FinBERT.")
+    parser.add_argument("--no-warmup", action="store_true",
+                        help="Load the model on the first uncached headline instead of before the run.")
     args = parser.parse_args()
 
-    run_pipeline(mode=args.mode, max_items=args.max)
\ No newline at end of file
+    run_pipeline(
+        mode=args.mode,
+        max_items=args.max,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        queue_size=args.queue_size,
+        high_sink=_sink(True, args.high_out),
+        low_sink=_sink(False, args.low_out),
+        router=None if not args.router else SentimentRouter(
+            load_fast_classifier(args.fast_model),
+            min_confidence=args.fast_threshold,
+            audit_rate=settings.SENTIMENT_ROUTER_AUDIT_RATE,
+        ),
+        warmup_model=not args.no_warmup,
+    )
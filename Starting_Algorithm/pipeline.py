@@ -0,0 +1,342 @@
+import json
+import queue
+import random
+import threading
+import time
+from typing import Callable, Hashable, Iterable
+
+# fetch(item) -> articles for one ticker / source page, each a dict with 'headline' (or 'title')
+Fetcher = Callable[[str], list[dict]]
+# classify(texts) -> one (stance, confidence) tuple per text, optionally with a third item
+# naming what decided it, which is recorded on the article as "label_source"
+BatchClassifier = Callable[[list[str]], list[tuple]]
+# dedupe_key(article) -> identity of an article; later articles with the same key are dropped
+DedupeKey = Callable[[dict], Hashable]
+
+# Marks the end of the article stream on the queue
+_DONE = object()
+
+# --- Sinks ---
+# A sink receives every classified article routed to it; add new ones (database,
+# review queue, ...) by implementing handle() and close().
+
+class Sink:
+    def handle(self, article: dict, stance: str, confidence: float):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class PrintSink(Sink):
+    """
+    Prints each article the way the original pipeline did.
+    """
+
+    def __init__(self, high_confidence: bool):
+        self.high_confidence = high_confidence
+
+    def handle(self, article: dict, stance: str, confidence: float):
+        print(f"\nAnalyzing: '{article['text']}'")
+        if self.high_confidence:
+            print(f"  High Confidence -> Stance: {stance.upper()} ({confidence:.2f})")
+        else:
+            print(f" Low Confidence -> Flagged for Review. (Stance: {stance.upper()}, Conf: {confidence:.2f})")
+
+class JsonlSink(Sink):
+    """
+    Appends each article with its stance and confidence to a JSON Lines file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def handle(self, article: dict, stance: str, confidence: float):
+        self._file.write(json.dumps({**article, "stance": stance, "confidence": confidence}) + "\n")
+
+    def close(self):
+        self._file.close()
+
+class ListSink(Sink):
+    """
+    Keeps results in memory, e.g. for callers that post-process a run.
+    """
+
+    def __init__(self):
+        self.results: list[tuple[dict, str, float]] = []
+
+    def handle(self, article: dict, stance: str, confidence: float):
+        self.results.append((article, stance, confidence))
+
+class FanOutSink(Sink):
+    """
+    Sends every article to several sinks.
+    """
+
+    def __init__(self, sinks: Iterable[Sink]):
+        self.sinks = list(sinks)
+
+    def handle(self, article: dict, stance: str, confidence: float):
+        for sink in self.sinks:
+            sink.handle(article, stance, confidence)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+# --- Metrics ---
+
+class PipelineMetrics:
+    """
+    Thread-safe progress counters for a pipeline run.
+    """
+
+    def __init__(self, total_items: int):
+        self.total_items = total_items
+        self.items_done = 0
+        self.articles_ingested = 0
+        self.articles_classified = 0
+        self.high_confidence = 0
+        self.low_confidence = 0
+        self.batches = 0
+        self.ingest_seconds = 0.0
+        self.inference_seconds = 0.0
+        self.started_at = time.perf_counter()
+        self.ingest_finished_at = None
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def progress_line(self, queued: int) -> str:
+        elapsed = self.elapsed()
+        return (
+            f"[progress {elapsed:6.1f}s] items {self.items_done}/{self.total_items}"
+            f" | ingested {self.articles_ingested} ({self.articles_ingested / elapsed:.1f}/s)"
+            f" | queued {queued}"
+            f" | classified {self.articles_classified} ({self.articles_classified / elapsed:.1f}/s)"
+            f" | high {self.high_confidence} low {self.low_confidence}"
+        )
+
+    def summary(self) -> dict:
+        elapsed = self.elapsed()
+        return {
+            "elapsed_seconds": round(elapsed, 2),
+            "ingest_wall_seconds": round((self.ingest_finished_at or time.perf_counter()) - self.started_at, 2),
+            "ingest_worker_seconds": round(self.ingest_seconds, 2),
+            "inference_seconds": round(self.inference_seconds, 2),
+            "items": self.items_done,
+            "articles_ingested": self.articles_ingested,
+            "articles_classified": self.articles_classified,
+            "high_confidence": self.high_confidence,
+            "low_confidence": self.low_confidence,
+            "batches": self.batches,
+            "articles_per_second": round(self.articles_classified / elapsed, 2) if elapsed else 0.0,
+        }
+
+# --- Pipeline ---
+
+class StreamingPipeline:
+    """
+    Ingestion and classification running at the same time.
+
+    `ingest_workers` threads take tickers / source pages from a shared work list,
+    fetch their articles and put them on a bounded queue (so a slow classifier applies
+    backpressure instead of buffering everything). The classifier stage, in the calling
+    thread, drains the queue into batches of up to `batch_size` articles (waiting at most
+    `max_wait` seconds to fill one), classifies each batch in one call and routes every
+    result to `high_sink` (confidence above `threshold`) or `low_sink`.
+
+    A run therefore takes roughly max(ingest time, inference time), not their sum.
+
+    Args:
+        fetch: Returns the articles for one work item.
+        classify: Classifies a batch of texts.
+        high_sink, low_sink: Where high- and low-confidence results go.
+        threshold: Confidence above which a result counts as high confidence.
+        ingest_workers: Concurrent ingestion threads.
+        queue_size: Maximum articles waiting for classification.
+        batch_size: Maximum texts per classifier call.
+        max_wait: Seconds to wait for a batch to fill before classifying a partial one.
+        polite_delay: (min, max) seconds each worker sleeps after an item; (0, 0) when `fetch` is
+            already paced (e.g. by the shared per-host rate limiter).
+        progress_interval: Seconds between progress lines (0 disables them).
+        max_articles: Stop ingesting once this many articles have been queued (None = no limit).
+        dedupe_key: Drops articles whose key was already queued in this run (None keeps all).
+
+    If classification or a sink raises, the ingestion workers are stopped (no more items are
+    fetched and blocked puts give up) before the error propagates.
+    """
+
+    def __init__(
+        self,
+        fetch: Fetcher,
+        classify: BatchClassifier,
+        high_sink: Sink,
+        low_sink: Sink,
+        threshold: float = 0.85,
+        ingest_workers: int = 4,
+        queue_size: int = 256,
+        batch_size: int = 16,
+        max_wait: float = 0.05,
+        polite_delay: tuple[float, float] = (0.0, 0.0),
+        progress_interval: float = 5.0,
+        max_articles: int | None = None,
+        dedupe_key: DedupeKey | None = None,
+    ):
+        self.fetch = fetch
+        self.classify = classify
+        self.high_sink = high_sink
+        self.low_sink = low_sink
+        self.threshold = threshold
+        self.ingest_workers = ingest_workers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.polite_delay = polite_delay
+        self.progress_interval = progress_interval
+        self.max_articles = max_articles
+        self.dedupe_key = dedupe_key
+        self._admitted = 0
+        self._seen: set = set()
+        self._admit_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _ingest(self, work: "queue.Queue[str]", articles: queue.Queue, metrics: PipelineMetrics):
+        while not self._stop.is_set():
+            try:
+                item = work.get_nowait()
+            except queue.Empty:
+                return
+
+            start = time.perf_counter()
+            try:
+                fetched = self.fetch(item)
+            except Exception as e:
+                print(f"Ingestion failed for {item}: {e}")
+                fetched = []
+            for article in fetched:
+                # unify headline/title keys from different ingest functions
+                text = article.get('headline') or article.get('title')
+                if text and self._admit(article):
+                    # Blocks while the classifier is behind
+                    if not self._put(articles, {**article, "text": text}):
+                        return
+                    metrics.add(articles_ingested=1)
+            metrics.add(items_done=1, ingest_seconds=time.perf_counter() - start)
+
+            # polite rate limiting to avoid hammering the site
+            low, high = self.polite_delay
+            if high > 0:
+                time.sleep(random.uniform(low, high))
+
+    def _admit(self, article: dict) -> bool:
+        with self._admit_lock:
+            if self.max_articles is not None and self._admitted >= self.max_articles:
+                return False
+            if self.dedupe_key is not None:
+                key = self.dedupe_key(article)
+                if key in self._seen:
+                    return False
+                self._seen.add(key)
+            self._admitted += 1
+            return True
+
+    def _put(self, articles: queue.Queue, article) -> bool:
+        """
+        Queue an article (or _DONE), waiting while the queue is full. False if the run was stopped.
+        """
+        while not self._stop.is_set():
+            try:
+                articles.put(article, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _next_batch(self, articles: queue.Queue) -> tuple[list[dict], bool]:
+        """
+        Collect up to batch_size articles. Returns (batch, finished).
+        """
+        batch = []
+        first = articles.get()
+        if first is _DONE:
+            return batch, True
+        batch.append(first)
+
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.batch_size:
+            try:
+                article = articles.get(timeout=max(deadline - time.perf_counter(), 0))
+            except queue.Empty:
+                break
+            if article is _DONE:
+                return batch, True
+            batch.append(article)
+        return batch, False
+
+    def run(self, items: list[str]) -> dict:
+        """
+        Process every work item and return the run summary.
+        """
+        metrics = PipelineMetrics(len(items))
+        self._admitted = 0
+        self._seen = set()
+        self._stop.clear()
+        work: "queue.Queue[str]" = queue.Queue()
+        for item in items:
+            work.put(item)
+        articles: queue.Queue = queue.Queue(maxsize=self.queue_size)
+
+        workers = [
+            threading.Thread(target=self._ingest, args=(work, articles, metrics), name=f"ingest-{i}", daemon=True)
+            for i in range(max(1, min(self.ingest_workers, len(items))))
+        ]
+        for worker in workers:
+            worker.start()
+
+        def close_stream():
+            for worker in workers:
+                worker.join()
+            metrics.ingest_finished_at = time.perf_counter()
+            self._put(articles, _DONE)
+
+        threading.Thread(target=close_stream, name="ingest-closer", daemon=True).start()
+
+        last_report = time.perf_counter()
+        try:
+            finished = False
+            while not finished:
+                batch, finished = self._next_batch(articles)
+                if batch:
+                    start = time.perf_counter()
+                    results = self.classify([article["text"] for article in batch])
+                    metrics.add(inference_seconds=time.perf_counter() - start, batches=1)
+
+                    for article, result in zip(batch, results):
+                        stance, confidence = result[0], result[1]
+                        if len(result) > 2:
+                            article = {**article, "label_source": result[2]}
+                        if confidence > self.threshold:
+                            self.high_sink.handle(article, stance, confidence)
+                            metrics.add(high_confidence=1)
+                        else:
+                            self.low_sink.handle(article, stance, confidence)
+                            metrics.add(low_confidence=1)
+                    metrics.add(articles_classified=len(batch))
+
+                if self.progress_interval and time.perf_counter() - last_report >= self.progress_interval:
+                    print(metrics.progress_line(articles.qsize()))
+                    last_report = time.perf_counter()
+        finally:
+            # Normally a no-op; after an error it releases workers waiting on a full queue
+            self._stop.set()
+            self.high_sink.close()
+            self.low_sink.close()
+
+        return metrics.summary()
@@ -1,23 +1,56 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Any, AsyncIterator, Callable, Dict, List, Literal, Optional, Set, Tuple, Union
+from collections import Counter
 import asyncio
+import orjson
+import time
 from concurrent.futures import ThreadPoolExecutor
 from cachetools import TTLCache
-from app.models.schemas import TickerBrief, AnalyzedArticle, SentimentResult, PricePoint
+from app.core.config import settings
+from app.models.schemas import (
+    TickerBrief, TickerBriefBatch, AnalyzedArticle, SentimentResult, PricePoint, PriceHistoryColumns
+)
 from app.services.ingest import (
     yfinance_scrape, get_sp500_tickers, fetch_news_for_ticker,
-    get_ticker_info, get_options_data, get_price_history
+    get_ticker_info, get_options_data, get_price_history, get_price_history_columns,
+    get_price_history_columns_many, columns_to_rows
 )
-from app.services.classifier import analyze_sentiment
+from app.services.classifier import analyze_sentiment_batch_async, sentiment_cache
+from app.services.sentiment_batcher import SentimentBatcher
+from app.services.sentiment_router import SentimentRouter
+from app.services.fast_sentiment import load_fast_classifier
+from app.core.singleflight import SingleFlight
+from app.core.cache import TieredCache, make_cache_backend
+from app.core.breaker import BREAKERS, yahoo_breaker
 from app.services.sentiment_social import get_retail_sentiment
 from app.services.insider import get_corporate_insiders
-from app.services.politician import get_politician_trades
+from app.services.politician import get_politician_trades, trade_index
+from app.services.prewarm import PrewarmScheduler
+from app.services.datasource import TickerDataSource
+from app.services.universe import sp500_universe
 
 router = APIRouter()
 
 # --- Caching Configuration ---
-# Cache up to 100 tickers for 5 minutes (300 seconds)
-ticker_cache = TTLCache(maxsize=100, ttl=300)
+# Briefs are cached as (brief, stored_at) pairs, stored_at being wall-clock time. Entries are
+# fresh for BRIEF_SOFT_TTL seconds, served stale while refreshing until BRIEF_HARD_TTL,
+# and evicted after that.
+# L1: this process. L2 (BRIEF_L2_URL): serialized briefs shared by every worker and instance.
+ticker_cache = TTLCache(maxsize=settings.BRIEF_L1_MAX_ENTRIES, ttl=settings.BRIEF_HARD_TTL)
+brief_cache: TieredCache[TickerBrief] = TieredCache(
+    ticker_cache,
+    make_cache_backend(settings.BRIEF_L2_URL, timeout=settings.BRIEF_L2_TIMEOUT),
+    ttl=settings.BRIEF_HARD_TTL,
+    serialize=lambda brief: brief.model_dump_json().encode(),
+    deserialize=TickerBrief.model_validate_json,
+    # Bump the version when TickerBrief changes shape
+    namespace="brief:v1",
+    timeout=settings.BRIEF_L2_TIMEOUT,
+)
+brief_cache_stats = Counter()
+upstream_stats = Counter()
 
 # ThreadPool for blocking I/O calls
 executor = ThreadPoolExecutor(max_workers=10)
@@ -27,36 +60,197 @@ async def run_sync(func, *args):
     loop = asyncio.get_event_loop()
     return await loop.run_in_executor(executor, func, *args)
 
+# Headlines from all in-flight briefs share batched inference calls,
+# awaited on the pooled async client rather than occupying executor threads
+sentiment_batcher = SentimentBatcher(
+    lambda texts: analyze_sentiment_batch_async(texts),
+    max_batch_size=settings.SENTIMENT_BATCH_MAX_SIZE,
+    max_wait=settings.SENTIMENT_BATCH_MAX_WAIT_MS / 1000,
+)
+
+# Confident headlines are decided by the fast classifier; only the rest reach the batcher
+sentiment_router = SentimentRouter(
+    load_fast_classifier(settings.SENTIMENT_FAST_MODEL_PATH),
+    min_confidence=settings.SENTIMENT_FAST_MIN_CONFIDENCE,
+    audit_rate=settings.SENTIMENT_ROUTER_AUDIT_RATE,
+    enabled=settings.SENTIMENT_ROUTER_ENABLED,
+    shadow=settings.SENTIMENT_ROUTER_SHADOW,
+)
+
+async def score_headlines(texts: List[str]) -> List[Tuple[str, float]]:
+    return await sentiment_router.score(texts, sentiment_batcher.score)
+
+# Concurrent cache misses for the same symbol share a single rebuild
+brief_flights = SingleFlight()
+
+# Global cap on briefs fetching upstream data at once (single, batch and prewarm builds alike)
+brief_build_slots = asyncio.Semaphore(settings.BRIEF_BUILD_CONCURRENCY)
+
+# Keep references to background refreshes so they are not garbage collected mid-flight
+_background_tasks: Set[asyncio.Task] = set()
+
+def _set_cache_headers(response: Response, status: str, age: float):
+    """
+    Report cache status (HIT, STALE or MISS) and entry age in seconds.
+    """
+    response.headers["X-Cache"] = status
+    response.headers["Age"] = str(int(age))
+
+def _refresh_in_background(symbol: str):
+    """
+    Rebuild a stale brief without making the caller wait.
+    """
+    if brief_flights.in_flight(symbol):
+        return
+
+    async def refresh():
+        try:
+            await refresh_ticker_brief(symbol)
+        except Exception as e:
+            print(f"Background refresh failed for {symbol}: {e}")
+
+    task = asyncio.ensure_future(refresh())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+def brief_age(symbol: str):
+    """
+    Age in seconds of the cached brief for `symbol`, or None if it is not cached.
+    """
+    cached = ticker_cache.get(symbol)
+    if cached is None:
+        return None
+    return time.time() - cached[1]
+
+async def refresh_ticker_brief(symbol: str) -> TickerBrief:
+    """
+    Rebuild and cache the brief for `symbol`, joining any rebuild already in flight.
+    """
+    return await brief_flights.do(symbol, lambda: _build_ticker_brief(symbol))
+
+async def _load_prewarm_universe() -> List[str]:
+    return await run_sync(get_sp500_tickers)
+
+# Keeps the watchlist and most requested symbols warm (started from the app lifespan)
+prewarm_scheduler = PrewarmScheduler(
+    refresh_ticker_brief,
+    brief_age,
+    soft_ttl=settings.BRIEF_SOFT_TTL,
+    watchlist=settings.PREWARM_WATCHLIST,
+    top_n=settings.PREWARM_TOP_N,
+    interval=settings.PREWARM_INTERVAL,
+    budget=settings.PREWARM_BUDGET,
+    concurrency=settings.PREWARM_CONCURRENCY,
+    universe=_load_prewarm_universe if settings.PREWARM_INCLUDE_SP500 else None,
+    enabled=settings.PREWARM_ENABLED,
+    max_tracked=settings.PREWARM_MAX_TRACKED,
+)
+
 @router.get("/ticker/{symbol}", response_model=TickerBrief)
-async def get_ticker_brief(symbol: str):
+async def get_ticker_brief(symbol: str, response: Response):
     """
     Get a balanced brief for a specific ticker.
     Uses caching and parallel execution for sub-30ms hot path.
+    Stale briefs are returned immediately while a background task refreshes them.
     """
     symbol = symbol.upper()
+    prewarm_scheduler.record_request(symbol)
+
+    # Check Cache (this process first, then the shared tier)
+    cached = await brief_cache.get(symbol)
+    if cached is not None:
+        brief, stored_at = cached
+        age = time.time() - stored_at
+
+        if age < settings.BRIEF_SOFT_TTL:
+            brief_cache_stats["hit"] += 1
+            _set_cache_headers(response, "HIT", age)
+        else:
+            brief_cache_stats["stale"] += 1
+            _set_cache_headers(response, "STALE", age)
+            _refresh_in_background(symbol)
+        return brief
+
+    # Join the rebuild already in flight for this symbol, or start it
+    brief_cache_stats["miss"] += 1
+    brief = await refresh_ticker_brief(symbol)
+    _set_cache_headers(response, "MISS", 0)
+    return brief
+
+# Brief sources backed by Yahoo: (upstream calls per helper, value used when it times out)
+YAHOO_SOURCES = {
+    "articles": (1, []),
+    "info": (2, {}),
+    "put_call_ratio": (2, None),
+    "corporate_insiders": (1, []),
+}
+
+async def _fetch_brief_sources(symbol: str, on_ready: Optional[Callable[[str, Any], None]] = None) -> Dict:
+    """
+    Fetch every data source for `symbol` concurrently, holding one of the global build slots.
+    `on_ready(name, value)` is called as each source arrives (names as in the returned dict).
+    """
+    async with brief_build_slots:
+        # --- Parallel Fetching of Data ---
+        # We fetch all independent data points concurrently
+
+        # One shared Yahoo Finance source per build, so each dataset is fetched at most once
+        source = TickerDataSource(symbol)
+
+        async def fetch(name: str, func, *args):
+            if name in YAHOO_SOURCES:
+                # Stop waiting once Yahoo is slower than its adaptive timeout allows
+                calls, fallback = YAHOO_SOURCES[name]
+                try:
+                    value = await asyncio.wait_for(run_sync(func, *args), yahoo_breaker.timeout() * calls)
+                except asyncio.TimeoutError:
+                    upstream_stats["yahoo_timeouts"] += 1
+                    value = fallback
+            else:
+                value = await run_sync(func, *args)
+            if on_ready is not None:
+                on_ready(name, value)
+            return value
+
+        # Define tasks
+        news_task = fetch("articles", fetch_news_for_ticker, symbol, source)
+        info_task = fetch("info", get_ticker_info, symbol, source)
+        options_task = fetch("put_call_ratio", get_options_data, symbol, source)
+        retail_task = fetch("retail_sentiment", get_retail_sentiment, symbol)
+        insider_task = fetch("corporate_insiders", get_corporate_insiders, symbol, source)
+        politician_task = fetch("politician_trades", get_politician_trades, symbol)
+
+        # Execute all tasks
+        results = await asyncio.gather(
+            news_task, info_task, options_task, retail_task, insider_task, politician_task
+        )
+        upstream_stats["yahoo_calls"] += source.upstream_calls
 
-    # Check Cache
-    if symbol in ticker_cache:
-        return ticker_cache[symbol]
-
-    # --- Parallel Fetching of Data ---
-    # We fetch all independent data points concurrently
-    
-    # Define tasks
-    news_task = run_sync(fetch_news_for_ticker, symbol)
-    info_task = run_sync(get_ticker_info, symbol)
-    options_task = run_sync(get_options_data, symbol)
-    retail_task = run_sync(get_retail_sentiment, symbol)
-    insider_task = run_sync(get_corporate_insiders, symbol)
-    politician_task = run_sync(get_politician_trades, symbol)
-
-    # Execute all tasks
-    results = await asyncio.gather(
-        news_task, info_task, options_task, retail_task, insider_task, politician_task
-    )
-    
     # Unpack results
     articles_data, ticker_info, put_call_ratio, retail_sent, corp_insiders, pol_trades = results
+    return {
+        "articles": articles_data or [],
+        "info": ticker_info,
+        "put_call_ratio": put_call_ratio,
+        "retail_sentiment": retail_sent,
+        "corporate_insiders": corp_insiders,
+        "politician_trades": pol_trades,
+    }
+
+def _analyzed_article(symbol: str, art: Dict, stance: str, confidence: float) -> AnalyzedArticle:
+    sentiment = SentimentResult(stance=stance, confidence=confidence)
+    return AnalyzedArticle(
+        headline=art['headline'],
+        ticker=symbol,
+        sentiment=sentiment,
+        link=art.get('link')
+    )
+
+def _assemble_brief(symbol: str, sources: Dict, sentiment_results: List) -> TickerBrief:
+    """
+    Combine fetched sources and headline scores (in article order) into a brief.
+    """
+    ticker_info = sources["info"]
 
     # --- Process News & Sentiment ---
     analyzed_articles = []
@@ -64,29 +258,15 @@ async def get_ticker_brief(symbol: str):
     bearish_count = 0
     neutral_count = 0
 
-    if articles_data:
-        # Create tasks for all sentiment analysis in parallel
-        sentiment_tasks = [run_sync(analyze_sentiment, art['headline']) for art in articles_data]
-        sentiment_results = await asyncio.gather(*sentiment_tasks)
-
-        for art, (stance, confidence) in zip(articles_data, sentiment_results):
-            text = art['headline']
-            
-            sentiment = SentimentResult(stance=stance, confidence=confidence)
-            analyzed_article = AnalyzedArticle(
-                headline=text,
-                ticker=symbol,
-                sentiment=sentiment,
-                link=art.get('link')
-            )
-            analyzed_articles.append(analyzed_article)
-
-            if stance == 'positive':
-                bullish_count += 1
-            elif stance == 'negative':
-                bearish_count += 1
-            else:
-                neutral_count += 1
+    for art, (stance, confidence) in zip(sources["articles"], sentiment_results):
+        analyzed_articles.append(_analyzed_article(symbol, art, stance, confidence))
+
+        if stance == 'positive':
+            bullish_count += 1
+        elif stance == 'negative':
+            bearish_count += 1
+        else:
+            neutral_count += 1
 
     # --- Calculate Safety Score ---
     total = bullish_count + bearish_count + neutral_count
@@ -97,7 +277,7 @@ async def get_ticker_brief(symbol: str):
         safety_score = round(score, 2)
 
     # --- Construct Response ---
-    brief = TickerBrief(
+    return TickerBrief(
         symbol=symbol,
         bullish_count=bullish_count,
         bearish_count=bearish_count,
@@ -111,25 +291,342 @@ async def get_ticker_brief(symbol: str):
         exchange=ticker_info.get("exchange"),
         institutional_holders=ticker_info.get("institutional_holders", []),
         insider_sentiment=ticker_info.get("insider_sentiment"),
-        put_call_ratio=put_call_ratio,
-        retail_sentiment=retail_sent or "Neutral",
-        corporate_insiders=corp_insiders or [],
-        politician_trades=pol_trades or []
+        put_call_ratio=sources["put_call_ratio"],
+        retail_sentiment=sources["retail_sentiment"] or "Neutral",
+        corporate_insiders=sources["corporate_insiders"] or [],
+        politician_trades=sources["politician_trades"] or []
     )
 
-    # Update Cache
-    ticker_cache[symbol] = brief
-    
-    return brief
+async def _briefs_from_peers(symbols: List[str]) -> Tuple[Dict[str, TickerBrief], Set[str]]:
+    """
+    With a shared cache tier, the first worker to miss a brief builds it and the others
+    take its result: returns the fresh briefs already in the shared tier, plus those another
+    worker is building (waited for up to BRIEF_BUILD_LOCK_SECONDS), and the symbols this
+    worker claimed. Symbols left out are built by this worker; it must `brief_cache.set`
+    or `brief_cache.release` every symbol it claimed.
+    """
+    if not brief_cache.shared or not symbols:
+        return {}, set()
+    # Only take briefs newer than the copy this worker has: a refresh (e.g. by the prewarmer)
+    # must not get back the very brief it is replacing
+    fresh_after = time.time() - settings.BRIEF_SOFT_TTL
+    newer_than = {}
+    for symbol in symbols:
+        local = ticker_cache.get(symbol)
+        newer_than[symbol] = max(fresh_after, local[1]) if local is not None else fresh_after
+    briefs = {symbol: entry[0] for symbol, entry in (await brief_cache.get_shared_many(symbols, newer_than)).items()}
 
-@router.get("/ticker/{symbol}/history", response_model=List[PricePoint])
-async def get_ticker_history(symbol: str, period: str = "1mo"):
+    rest = [symbol for symbol in symbols if symbol not in briefs]
+    claims = await asyncio.gather(*[brief_cache.claim(symbol, settings.BRIEF_BUILD_LOCK_SECONDS) for symbol in rest])
+    waiting = [symbol for symbol, claimed in zip(rest, claims) if not claimed]
+    entries = await asyncio.gather(*[
+        brief_cache.wait_for(symbol, settings.BRIEF_BUILD_LOCK_SECONDS, newer_than=newer_than[symbol]) for symbol in waiting
+    ])
+    briefs.update({symbol: entry[0] for symbol, entry in zip(waiting, entries) if entry is not None})
+    return briefs, {symbol for symbol, claimed in zip(rest, claims) if claimed}
+
+async def _build_ticker_briefs(symbols: List[str]) -> Dict[str, Union[TickerBrief, Exception]]:
+    """
+    Build and cache briefs for several symbols together.
+
+    Sources are fetched per symbol (bounded by the global build slots), then the headlines
+    of every symbol are scored in one batched sentiment pass. Returns {symbol: brief or error}.
+    """
+    from_peers, claimed = await _briefs_from_peers(symbols)
+    results: Dict[str, Union[TickerBrief, Exception]] = dict(from_peers)
+    symbols = [symbol for symbol in symbols if symbol not in results]
+
+    try:
+        fetched = await asyncio.gather(*[_fetch_brief_sources(symbol) for symbol in symbols], return_exceptions=True)
+        sources = {}
+        for symbol, outcome in zip(symbols, fetched):
+            if isinstance(outcome, Exception):
+                results[symbol] = outcome
+            else:
+                sources[symbol] = outcome
+
+        # Score all headlines together: the fast tier settles confident ones, and the batcher
+        # merges the rest with other briefs in flight
+        headlines = [art['headline'] for fetched_sources in sources.values() for art in fetched_sources["articles"]]
+        scores = iter(await score_headlines(headlines)) if headlines else iter(())
+
+        for symbol, fetched_sources in sources.items():
+            sentiment_results = [next(scores) for _ in fetched_sources["articles"]]
+            brief = _assemble_brief(symbol, fetched_sources, sentiment_results)
+            # Update Cache (and publish it to the other workers, which releases the claim)
+            brief_cache.set(symbol, brief)
+            results[symbol] = brief
+            claimed.discard(symbol)
+    finally:
+        # Let waiting workers build what this one could not, instead of waiting out the lock
+        if claimed:
+            await asyncio.gather(*[brief_cache.release(symbol) for symbol in claimed])
+
+    return results
+
+async def _build_ticker_brief(symbol: str) -> TickerBrief:
+    """
+    Fetch every data source for `symbol`, score its news and cache the resulting brief.
+    """
+    result = (await _build_ticker_briefs([symbol]))[symbol]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+@router.get("/tickers/brief", response_model=TickerBriefBatch)
+async def get_ticker_briefs(symbols: str, response: Response):
+    """
+    Get balanced briefs for several tickers at once, e.g. /tickers/brief?symbols=AAPL,MSFT,NVDA.
+    Cached briefs (fresh or stale) are served immediately; each missing one is built in its own
+    flight (or joins the rebuild already in flight), their headlines sharing sentiment batches.
+    Briefs are returned in request order; symbols that failed are listed under `errors`.
+    """
+    symbol_list = _parse_symbols(symbols)
+
+    briefs: Dict[str, TickerBrief] = {}
+    missing = []
+    cached_entries = await brief_cache.get_many(symbol_list)
+    for symbol in symbol_list:
+        prewarm_scheduler.record_request(symbol)
+        cached = cached_entries.get(symbol)
+        if cached is None:
+            missing.append(symbol)
+            continue
+
+        brief, stored_at = cached
+        briefs[symbol] = brief
+        if time.time() - stored_at < settings.BRIEF_SOFT_TTL:
+            brief_cache_stats["hit"] += 1
+        else:
+            brief_cache_stats["stale"] += 1
+            _refresh_in_background(symbol)
+    brief_cache_stats["miss"] += len(missing)
+
+    errors: Dict[str, str] = {}
+    if missing:
+        # One flight per symbol, so a request joining a build only waits for the symbol it
+        # asked for; concurrent builds still share sentiment batches through the batcher
+        tasks = [brief_flights.submit(symbol, lambda symbol=symbol: _build_ticker_brief(symbol)) for symbol in missing]
+        outcomes = await asyncio.gather(*[asyncio.shield(task) for task in tasks], return_exceptions=True)
+        for symbol, outcome in zip(missing, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"Brief build failed for {symbol}: {outcome}")
+                errors[symbol] = str(outcome) or type(outcome).__name__
+            else:
+                briefs[symbol] = outcome
+
+    response.headers["X-Cache-Hits"] = str(len(symbol_list) - len(missing))
+    response.headers["X-Cache-Misses"] = str(len(missing))
+    return TickerBriefBatch(
+        briefs=[briefs[symbol] for symbol in symbol_list if symbol in briefs],
+        errors=errors,
+    )
+
+# --- Streaming Briefs ---
+# Each brief section is sent as soon as it is ready, as NDJSON ({"event", "data"} per line)
+# or Server-Sent Events, ending with the counts and safety score.
+
+QUOTE_FIELDS = (
+    "price", "change_percent", "volume", "average_volume", "exchange",
+    "institutional_holders", "insider_sentiment",
+)
+
+# Brief source name -> stream event name
+SECTION_EVENTS = {
+    "info": "quote",
+    "put_call_ratio": "options",
+    "retail_sentiment": "retail_sentiment",
+    "corporate_insiders": "insiders",
+    "politician_trades": "politician_trades",
+}
+
+def _section_payload(name: str, value: Any) -> Dict:
+    if name == "info":
+        return {field: value.get(field, [] if field == "institutional_holders" else None) for field in QUOTE_FIELDS}
+    if name == "retail_sentiment":
+        return {name: value or "Neutral"}
+    if name in ("corporate_insiders", "politician_trades"):
+        return {name: value or []}
+    return {name: value}
+
+def _summary_payload(brief: TickerBrief) -> Dict:
+    return {
+        "symbol": brief.symbol,
+        "bullish_count": brief.bullish_count,
+        "bearish_count": brief.bearish_count,
+        "neutral_count": brief.neutral_count,
+        "safety_score": brief.safety_score,
+    }
+
+def _brief_events(brief: TickerBrief) -> List[Tuple[str, Any]]:
+    """
+    Every stream event for an already built brief.
+    """
+    info = {field: getattr(brief, field) for field in QUOTE_FIELDS}
+    events = [("quote", _section_payload("info", info))]
+    for name in ("put_call_ratio", "retail_sentiment", "corporate_insiders", "politician_trades"):
+        events.append((SECTION_EVENTS[name], _section_payload(name, getattr(brief, name))))
+    events.extend(("article", article) for article in brief.articles)
+    events.append(("summary", _summary_payload(brief)))
+    return events
+
+async def _build_brief_progressively(symbol: str, events: asyncio.Queue) -> TickerBrief:
+    """
+    Build and cache the brief for `symbol` like `_build_ticker_brief`, putting each section
+    on `events` as soon as it is ready. None marks the end of the events.
+    """
+    scoring: List[asyncio.Future] = []
+
+    async def score(art: Dict) -> Tuple[str, float]:
+        (result,) = await score_headlines([art['headline']])
+        events.put_nowait(("article", _analyzed_article(symbol, art, *result)))
+        return result
+
+    def on_ready(name: str, value: Any):
+        if name == "articles":
+            # Score headlines one by one so each article is sent as it lands;
+            # the batcher still merges them into shared inference calls
+            scoring.extend(asyncio.ensure_future(score(art)) for art in value or [])
+        else:
+            events.put_nowait((SECTION_EVENTS[name], _section_payload(name, value)))
+
+    claimed: Set[str] = set()
+    try:
+        # Another worker may have built (or be building) it: send its brief in one go
+        from_peers, claimed = await _briefs_from_peers([symbol])
+        if symbol in from_peers:
+            for event in _brief_events(from_peers[symbol]):
+                events.put_nowait(event)
+            return from_peers[symbol]
+
+        sources = await _fetch_brief_sources(symbol, on_ready)
+        sentiment_results = await asyncio.gather(*scoring)
+        brief = _assemble_brief(symbol, sources, sentiment_results)
+        brief_cache.set(symbol, brief)
+        claimed.discard(symbol)
+        events.put_nowait(("summary", _summary_payload(brief)))
+        return brief
+    except BaseException:
+        for task in scoring:
+            task.cancel()
+        raise
+    finally:
+        events.put_nowait(None)
+        if claimed:
+            await brief_cache.release(symbol)
+
+async def _brief_stream(symbol: str, brief: Optional[TickerBrief]) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Stream events for a cached `brief`, or build the brief progressively.
+    """
+    if brief is None and brief_flights.in_flight(symbol):
+        # Another request is already building it: send its sections once it lands
+        try:
+            brief = await refresh_ticker_brief(symbol)
+        except Exception as e:
+            yield ("error", {"detail": str(e) or type(e).__name__})
+            return
+
+    if brief is not None:
+        for event in _brief_events(brief):
+            yield event
+        return
+
+    events: asyncio.Queue = asyncio.Queue()
+    # Registered like any rebuild, so concurrent requests for the symbol join it;
+    # a client disconnecting mid-stream does not cancel the build
+    task = brief_flights.submit(symbol, lambda: _build_brief_progressively(symbol, events))
+    while True:
+        event = await events.get()
+        if event is None:
+            break
+        yield event
+
+    try:
+        await asyncio.shield(task)
+    except Exception as e:
+        print(f"Streaming brief build failed for {symbol}: {e}")
+        yield ("error", {"detail": str(e) or type(e).__name__})
+
+def _encode_ndjson(name: str, payload: Any) -> bytes:
+    return orjson.dumps({"event": name, "data": jsonable_encoder(payload)}) + b"\n"
+
+def _encode_sse(name: str, payload: Any) -> bytes:
+    return b"event: " + name.encode() + b"\ndata: " + orjson.dumps(jsonable_encoder(payload)) + b"\n\n"
+
+@router.get("/ticker/{symbol}/stream")
+async def stream_ticker_brief(symbol: str, format: Literal["ndjson", "sse"] = "ndjson"):
+    """
+    Stream a balanced brief section by section as soon as each is ready:
+    quote, options, retail_sentiment, insiders, politician_trades, one event per scored
+    article, then summary (counts and safety_score). An error event ends a failed build.
+    format=ndjson sends one {"event", "data"} object per line; format=sse sends Server-Sent Events.
+    Cached briefs are sent in full immediately; stale ones are refreshed in the background.
+    """
+    symbol = symbol.upper()
+    prewarm_scheduler.record_request(symbol)
+
+    brief = None
+    status, age = "MISS", 0.0
+    cached = await brief_cache.get(symbol)
+    if cached is not None:
+        brief, stored_at = cached
+        age = time.time() - stored_at
+        if age < settings.BRIEF_SOFT_TTL:
+            status = "HIT"
+        else:
+            status = "STALE"
+            _refresh_in_background(symbol)
+    brief_cache_stats[status.lower()] += 1
+
+    encode = _encode_sse if format == "sse" else _encode_ndjson
+    body = (encode(name, payload) async for name, payload in _brief_stream(symbol, brief))
+    response = StreamingResponse(
+        body,
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    _set_cache_headers(response, status, age)
+    return response
+
+@router.get("/ticker/{symbol}/history", response_model=Union[List[PricePoint], PriceHistoryColumns])
+async def get_ticker_history(symbol: str, period: str = "1mo", format: Literal["rows", "columnar"] = "rows"):
     """
     Get historical price data.
+    format=columnar returns parallel arrays (time, price, ma50, ...) instead of one object per point.
     """
+    if format == "columnar":
+        # Already plain lists of str/float/None; skip per-point model validation entirely
+        columns = await run_sync(get_price_history_columns, symbol, period)
+        return ORJSONResponse(columns)
+
     # Run in executor to avoid blocking
-    data = await run_sync(get_price_history, symbol, period)
-    return [PricePoint(**item) for item in data]
+    return await run_sync(get_price_history, symbol, period)
+
+def _parse_symbols(symbols: str) -> List[str]:
+    """
+    Parse a comma-separated symbol list (upper-cased, de-duplicated, order kept).
+    """
+    parsed = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))
+    if not parsed:
+        raise HTTPException(status_code=400, detail="No symbols given")
+    if len(parsed) > settings.BULK_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {settings.BULK_MAX_SYMBOLS} symbols per request")
+    return parsed
+
+@router.get("/history", response_model=Dict[str, Union[List[PricePoint], PriceHistoryColumns]])
+async def get_bulk_history(symbols: str, period: str = "1mo", format: Literal["rows", "columnar"] = "rows"):
+    """
+    Get historical price data for several tickers at once, e.g. /history?symbols=AAPL,MSFT&period=1y.
+    All symbols are fetched in one batched download. Returns {symbol: history} in request order.
+    """
+    symbol_list = _parse_symbols(symbols)
+    histories = await run_sync(get_price_history_columns_many, symbol_list, period)
+
+    if format == "columnar":
+        return ORJSONResponse(histories)
+    return {symbol: columns_to_rows(columns) for symbol, columns in histories.items()}
 
 @router.get("/trending", response_model=List[str])
 async def get_trending_tickers():
@@ -137,9 +634,31 @@ async def get_trending_tickers():
     Get trending tickers.
     """
     import random
-    # get_sp500_tickers performs a web scrape? Yes. Should be cached or async.
-    # For now, let's run in executor.
-    
-    # Ideally detailed cache here too
-    all_tickers = await run_sync(get_sp500_tickers)
-    return random.sample(all_tickers, 10)
+    # Memory lookup: the universe is loaded from its snapshot at startup and refreshed in the background
+    all_tickers = get_sp500_tickers(wait=False)
+    return random.sample(all_tickers, min(10, len(all_tickers)))
+
+@router.get("/stats")
+async def get_stats():
+    """
+    Cache and inference counters for monitoring.
+    """
+    return {
+        "sentiment_cache": sentiment_cache.stats(),
+        "sentiment_batcher": {
+            "batches_sent": sentiment_batcher.batches_sent,
+            "texts_scored": sentiment_batcher.texts_scored,
+        },
+        "sentiment_router": sentiment_router.stats(),
+        "brief_cache": dict(brief_cache_stats),
+        "brief_cache_tiers": brief_cache.stats(),
+        "upstream": dict(upstream_stats),
+        "brief_builds": {
+            "started": brief_flights.started,
+            "coalesced": brief_flights.coalesced,
+        },
+        "prewarm": prewarm_scheduler.stats(),
+        "universe": sp500_universe.stats(),
+        "politician_trades": trade_index.stats(),
+        "breakers": {name: breaker.stats() for name, breaker in BREAKERS.items()},
+    }
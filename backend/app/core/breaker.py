@@ -0,0 +1,256 @@
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+from app.core.config import settings
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling an upstream whose circuit is open.
+    """
+
+class CircuitBreaker:
+    """
+    Per-source circuit breaker with latency-derived timeouts.
+
+    - Closed: calls go through. `failure_threshold` consecutive failures open the circuit.
+    - Open: calls fail fast with CircuitOpenError for `recovery_time` seconds.
+    - Half-open: up to `half_open_max` probe calls go through, held to `max_timeout`; a
+      success closes the circuit, a failure re-opens it for another `recovery_time`.
+
+    `timeout()` is `timeout_multiplier` x the `timeout_percentile` of recent latencies of
+    calls that returned, clamped to [min_timeout, max_timeout] (max_timeout until
+    `min_samples` calls have been seen). Calls slower than the timeout count as failures,
+    so a source that has become slow opens the circuit just like one that errors; their
+    latencies are still sampled, so the timeout follows a source that is slower but healthy.
+
+    Args:
+        name: Source name, used in errors and stats.
+        failure_threshold: Consecutive failures that open the circuit.
+        recovery_time: Seconds to stay open before allowing probe calls.
+        half_open_max: Concurrent probe calls allowed while half-open.
+        min_timeout, max_timeout: Bounds for the adaptive timeout in seconds.
+        timeout_percentile: Latency percentile (0-1) the timeout is based on.
+        timeout_multiplier: Headroom over that percentile.
+        window: How many recent latencies to keep.
+        min_samples: Latencies needed before the timeout adapts.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_time: float = 30.0,
+        half_open_max: int = 1,
+        min_timeout: float = 1.0,
+        max_timeout: float = 10.0,
+        timeout_percentile: float = 0.99,
+        timeout_multiplier: float = 2.0,
+        window: int = 200,
+        min_samples: int = 20,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.half_open_max = half_open_max
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_percentile = timeout_percentile
+        self.timeout_multiplier = timeout_multiplier
+        self.min_samples = min_samples
+
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._latencies: deque = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+        # Counters
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        # Called with self._lock held
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_time:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def timeout(self) -> float:
+        """
+        Current adaptive timeout in seconds.
+        """
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return self.max_timeout
+            ordered = sorted(self._latencies)
+        index = min(int(self.timeout_percentile * len(ordered)), len(ordered) - 1)
+        return min(max(ordered[index] * self.timeout_multiplier, self.min_timeout), self.max_timeout)
+
+    def _acquire(self) -> Optional[bool]:
+        """
+        None if a call may not go through now, else whether it is a half-open probe
+        (which claims a probe slot).
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return False
+            if state == HALF_OPEN and self._probes < self.half_open_max:
+                self._probes += 1
+                return True
+            self.rejected += 1
+            return None
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go through now (claims a probe slot while half-open).
+        """
+        return self._acquire() is not None
+
+    def retry_in(self) -> float:
+        """
+        Seconds until an open circuit lets probe calls through (0 unless open).
+        """
+        with self._lock:
+            if self._current_state() != OPEN:
+                return 0.0
+            return max(self.recovery_time - (time.monotonic() - self._opened_at), 0.0)
+
+    def release_probe(self):
+        """
+        Give back a probe slot claimed by a call that ended without an outcome (e.g. cancelled).
+        """
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self.calls += 1
+            self._latencies.append(latency)
+            self._failures = 0
+            self._state = CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self.calls += 1
+            self.failures += 1
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.opened += 1
+                    print(f"Circuit for {self.name} opened after {self._failures} failures")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def _record(self, started: float, timeout: float, error: Exception = None):
+        latency = time.monotonic() - started
+        if error is not None:
+            self.record_failure()
+        elif latency > timeout:
+            # Too slow, but a real response time: sampled so the timeout can adapt to it
+            with self._lock:
+                self._latencies.append(latency)
+            self.record_failure()
+        else:
+            self.record_success(latency)
+
+    def _start(self):
+        """
+        (is_probe, timeout, started) for a call allowed through, or CircuitOpenError.
+        """
+        probe = self._acquire()
+        if probe is None:
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        # Probes get the ceiling, so an upstream that is healthy but slower than the
+        # learned timeout can close the circuit again
+        return probe, self.max_timeout if probe else self.timeout(), time.monotonic()
+
+    def call(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """
+        Run `func(*args, **kwargs)` through the breaker, raising CircuitOpenError while open.
+        """
+        probe, timeout, started = self._start()
+        recorded = False
+        try:
+            result = func(*args, **kwargs)
+            self._record(started, timeout)
+            recorded = True
+            return result
+        except Exception as e:
+            self._record(started, timeout, e)
+            recorded = True
+            raise
+        finally:
+            if probe and not recorded:
+                self.release_probe()
+
+    async def call_async(self, func: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """
+        Async variant of `call`. A cancelled call records no outcome but frees its probe slot.
+        """
+        probe, timeout, started = self._start()
+        recorded = False
+        try:
+            result = await func(*args, **kwargs)
+            self._record(started, timeout)
+            recorded = True
+            return result
+        except Exception as e:
+            self._record(started, timeout, e)
+            recorded = True
+            raise
+        finally:
+            if probe and not recorded:
+                self.release_probe()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            state = self._current_state()
+        return {
+            "state": state,
+            "timeout": round(self.timeout(), 3),
+            "calls": self.calls,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "opened": self.opened,
+        }
+
+def _breaker(name: str, max_timeout: float) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+        recovery_time=settings.BREAKER_RECOVERY_SECONDS,
+        min_timeout=settings.BREAKER_MIN_TIMEOUT,
+        max_timeout=max_timeout,
+        timeout_percentile=settings.BREAKER_TIMEOUT_PERCENTILE,
+        timeout_multiplier=settings.BREAKER_TIMEOUT_MULTIPLIER,
+    )
+
+# One breaker per upstream, shared by every caller in the process
+yahoo_breaker = _breaker("yahoo", settings.YAHOO_MAX_TIMEOUT)
+# Bulk sweeps (yfinance_scrape) get their own, so throttling during a sweep never fails
+# fast the API's requests; the sweep waits out its own open circuit instead
+yahoo_batch_breaker = _breaker("yahoo_batch", settings.YAHOO_MAX_TIMEOUT)
+sentiment_breaker = _breaker("sentiment_api", settings.SENTIMENT_HTTP_TIMEOUT)
+disclosure_breaker = _breaker("disclosure_pdfs", settings.DISCLOSURE_MAX_TIMEOUT)
+
+BREAKERS = {
+    breaker.name: breaker
+    for breaker in (yahoo_breaker, yahoo_batch_breaker, sentiment_breaker, disclosure_breaker)
+}
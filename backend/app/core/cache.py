@@ -0,0 +1,411 @@
+import asyncio
+import os
+import sqlite3
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Generic, Iterable, List, Mapping, MutableMapping, Optional, Tuple, TypeVar, Union
+from urllib.parse import urlsplit
+from app.core.breaker import CircuitBreaker, CircuitOpenError
+
+V = TypeVar("V")
+
+# --- Shared (L2) Backends ---
+# Byte stores with per-key TTLs, shared by every worker and instance pointed at them.
+
+class CacheBackend:
+    """
+    Interface of a shared cache tier. Every method may raise on I/O errors.
+    """
+
+    name = "backend"
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float):
+        raise NotImplementedError
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """
+        Set `key` only if it is absent (or expired). Returns whether it was set.
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def delete_if(self, key: str, value: bytes) -> bool:
+        """
+        Delete `key` only if it still holds `value` (atomically). Returns whether it was deleted.
+        """
+        raise NotImplementedError
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Shared tier in a local SQLite file: workers on one host (or tests) share entries
+    without running a server.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        if not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT key, value FROM cache WHERE key IN ({placeholders}) AND expires_at > ?",
+                (*keys, time.time()),
+            ).fetchall()
+        return {key: bytes(value) for key, value in rows}
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + ttl),
+            )
+            self._purge_now_and_then()
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("DELETE FROM cache WHERE key = ? AND expires_at <= ?", (key, now))
+                added = self._db.execute(
+                    "INSERT OR IGNORE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, now + ttl),
+                ).rowcount == 1
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return added
+
+    def delete(self, key: str):
+        with self._lock:
+            self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def delete_if(self, key: str, value: bytes) -> bool:
+        with self._lock:
+            return self._db.execute("DELETE FROM cache WHERE key = ? AND value = ?", (key, value)).rowcount == 1
+
+    def _purge_now_and_then(self):
+        # Called with self._lock held; drops expired rows every few hundred writes
+        self._writes += 1
+        if self._writes % 500 == 0:
+            self._db.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared tier on any Redis-protocol server (Redis, Valkey, KeyDB, ...).
+    Needs the `redis` package.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, timeout: float = 0.25):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("The redis cache backend needs the redis package: pip install redis") from e
+        self.url = url
+        self._client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._delete_if = self._client.register_script(
+            "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+        )
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        if not keys:
+            return {}
+        values = self._client.mget(keys)
+        return {key: value for key, value in zip(keys, values) if value is not None}
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self._client.set(key, value, px=max(1, int(ttl * 1000)))
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return bool(self._client.set(key, value, px=max(1, int(ttl * 1000)), nx=True))
+
+    def delete(self, key: str):
+        self._client.delete(key)
+
+    def delete_if(self, key: str, value: bytes) -> bool:
+        return bool(self._delete_if(keys=[key], args=[value]))
+
+def make_cache_backend(url: str, timeout: float = 0.25) -> Optional[CacheBackend]:
+    """
+    Shared tier for `url`: redis://, rediss:// or unix:// for a Redis-protocol server,
+    sqlite:///path/to/file (or a plain file path) for SQLite. "" disables the tier.
+    Returns None, keeping the cache in-process only, if the tier cannot be opened.
+    """
+    if not url:
+        return None
+    scheme = urlsplit(url).scheme
+    try:
+        if scheme in ("redis", "rediss", "unix"):
+            return RedisCacheBackend(url, timeout=timeout)
+        if scheme == "sqlite":
+            return SQLiteCacheBackend(url[len("sqlite://"):])
+        if scheme == "":
+            return SQLiteCacheBackend(url)
+        raise ValueError(f"unsupported cache URL scheme {scheme!r}")
+    except (RuntimeError, ValueError, OSError, sqlite3.Error) as e:
+        print(f"Shared cache tier disabled ({url}): {e}")
+        return None
+
+# --- Tiered Cache ---
+
+_STORED_AT = struct.Struct("!d")
+
+class TieredCache(Generic[V]):
+    """
+    (value, stored_at) cache with an in-process L1 mapping in front of an optional
+    shared L2 backend holding serialized values.
+
+    Reads check L1, then L2 (filling L1 on a hit). Writes go to L1 immediately and to
+    L2 in the background. `stored_at` is wall-clock time so ages agree across processes,
+    and no entry is returned once it is `ttl` seconds old, however long it has sat in L1.
+    L2 calls run on a small thread pool behind a circuit breaker and are abandoned after
+    `timeout`: a slow or unreachable L2 degrades to L1-only instead of adding latency.
+
+    `claim` / `release` let the first process that misses a key build it while the
+    others wait for its result to land in L2 (`wait_for`), instead of every worker
+    building the same value.
+
+    Args:
+        l1: In-process mapping (e.g. a TTLCache) of key -> (value, stored_at).
+        l2: Shared backend, or None for L1 only.
+        ttl: Seconds an entry lives in L2.
+        serialize, deserialize: Value <-> bytes.
+        namespace: Prefix for L2 keys; change it when the serialized format changes.
+        timeout: Upper bound in seconds for a single L2 call.
+    """
+
+    def __init__(
+        self,
+        l1: MutableMapping[str, Tuple[V, float]],
+        l2: Optional[CacheBackend],
+        ttl: float,
+        serialize: Callable[[V], bytes],
+        deserialize: Callable[[bytes], V],
+        namespace: str = "cache",
+        timeout: float = 0.25,
+    ):
+        self.l1 = l1
+        self.l2 = l2
+        self.ttl = ttl
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.namespace = namespace
+        self.timeout = timeout
+        self.breaker = CircuitBreaker(f"{namespace}_l2", min_timeout=timeout, max_timeout=timeout)
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix=f"{namespace}-l2") if l2 else None
+        self._pending: set = set()
+        # Token of every build claim this process holds: only the holder's token releases it
+        self._claims: Dict[str, bytes] = {}
+
+        # Counters
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.l2_writes = 0
+        self.l2_errors = 0
+        self.peer_waits = 0
+        self.peer_hits = 0
+
+    @property
+    def shared(self) -> bool:
+        return self.l2 is not None
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _lock_key(self, key: str) -> str:
+        return f"{self.namespace}:building:{key}"
+
+    async def _l2_call(self, func, *args):
+        """
+        Run a blocking L2 call off the event loop; None (after counting the error) on failure.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            call = loop.run_in_executor(self._executor, lambda: self.breaker.call(func, *args))
+            # The breaker only sees the call once it returns; never make a request wait that long
+            return await asyncio.wait_for(call, self.timeout)
+        except CircuitOpenError:
+            return None
+        except asyncio.TimeoutError:
+            self.l2_errors += 1
+            print(f"Shared cache {self.l2.name} call timed out after {self.timeout}s")
+            return None
+        except Exception as e:
+            self.l2_errors += 1
+            print(f"Shared cache {self.l2.name} call failed: {e}")
+            return None
+
+    def _expired(self, entry: Tuple[V, float]) -> bool:
+        return time.time() - entry[1] >= self.ttl
+
+    def get_local(self, key: str) -> Optional[Tuple[V, float]]:
+        """
+        L1 lookup only (never blocks).
+        """
+        entry = self.l1.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry):
+            # Filled from L2 late in its life: L1's own TTL counts from insertion, not stored_at
+            self.l1.pop(key, None)
+            return None
+        self.l1_hits += 1
+        return entry
+
+    def _decode(self, key: str, blob: bytes) -> Optional[Tuple[V, float]]:
+        try:
+            (stored_at,) = _STORED_AT.unpack_from(blob)
+            return (self.deserialize(blob[_STORED_AT.size:]), stored_at)
+        except Exception as e:
+            print(f"Discarding unreadable shared cache entry {key}: {e}")
+            return None
+
+    async def get_shared_many(self, keys: List[str], newer_than: Union[float, Mapping[str, float]] = 0.0) -> Dict[str, Tuple[V, float]]:
+        """
+        L2-only lookup of unexpired entries stored after `newer_than` (one time for every key,
+        or a time per key); L1 is updated with any that are newer than its own copy.
+        """
+        if not keys or self.l2 is None:
+            return {}
+        blobs = await self._l2_call(self.l2.get_many, [self._key(key) for key in keys]) or {}
+        found: Dict[str, Tuple[V, float]] = {}
+        for key in keys:
+            blob = blobs.get(self._key(key))
+            entry = self._decode(key, blob) if blob is not None else None
+            threshold = newer_than.get(key, 0.0) if isinstance(newer_than, Mapping) else newer_than
+            if entry is None or entry[1] <= threshold or self._expired(entry):
+                continue
+            local = self.l1.get(key)
+            if local is None or local[1] < entry[1]:
+                self.l1[key] = entry
+            found[key] = entry
+            self.l2_hits += 1
+        return found
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Tuple[V, float]]:
+        """
+        Entries for `keys` from L1, then L2 for the rest. Missing keys are left out.
+        """
+        keys = list(keys)
+        found: Dict[str, Tuple[V, float]] = {}
+        remote = []
+        for key in keys:
+            entry = self.get_local(key)
+            if entry is not None:
+                found[key] = entry
+            else:
+                remote.append(key)
+
+        found.update(await self.get_shared_many(remote))
+        self.misses += len(keys) - len(found)
+        return found
+
+    async def get(self, key: str) -> Optional[Tuple[V, float]]:
+        return (await self.get_many([key])).get(key)
+
+    def set(self, key: str, value: V, stored_at: Optional[float] = None):
+        """
+        Store in L1 now and publish to L2 in the background.
+        """
+        stored_at = time.time() if stored_at is None else stored_at
+        self.l1[key] = (value, stored_at)
+        if self.l2 is None:
+            return
+        token = self._claims.pop(key, None)
+
+        async def publish():
+            blob = _STORED_AT.pack(stored_at) + self.serialize(value)
+            ttl = self.ttl - (time.time() - stored_at)
+            if ttl > 0 and await self._l2_call(self._write, key, blob, ttl):
+                self.l2_writes += 1
+            if token is not None:
+                await self._l2_call(self.l2.delete_if, self._lock_key(key), token)
+
+        task = asyncio.ensure_future(publish())
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _write(self, key: str, blob: bytes, ttl: float) -> bool:
+        # True once written, telling a successful L2 write apart from _l2_call's None on failure
+        self.l2.set(self._key(key), blob, ttl)
+        return True
+
+    async def claim(self, key: str, ttl: float) -> bool:
+        """
+        Try to become the process that builds `key`. Always True without L2 (or if L2 fails).
+        The claim is released when the value is `set`, or expires after `ttl` seconds.
+        """
+        if self.l2 is None:
+            return True
+        # A token per claim, so a holder whose claim expired cannot release the next one's
+        token = os.urandom(16)
+        claimed = await self._l2_call(self.l2.add, self._lock_key(key), token, ttl)
+        if claimed:
+            self._claims[key] = token
+        return claimed is not False
+
+    async def release(self, key: str):
+        token = self._claims.pop(key, None)
+        if self.l2 is not None and token is not None:
+            await self._l2_call(self.l2.delete_if, self._lock_key(key), token)
+
+    async def wait_for(self, key: str, timeout: float, newer_than: float = 0.0, poll: float = 0.1) -> Optional[Tuple[V, float]]:
+        """
+        Poll L2 until another process publishes `key` (stored after `newer_than`), up to `timeout`.
+        """
+        if self.l2 is None:
+            return None
+        self.peer_waits += 1
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(poll)
+            entry = (await self.get_shared_many([key], newer_than)).get(key)
+            if entry is not None:
+                self.peer_hits += 1
+                return entry
+        return None
+
+    async def flush(self):
+        """
+        Wait for background L2 writes (e.g. before shutdown).
+        """
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def stats(self) -> Dict:
+        return {
+            "l2": self.l2.name if self.l2 is not None else None,
+            "l1_entries": len(self.l1),
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "l2_writes": self.l2_writes,
+            "l2_errors": self.l2_errors,
+            "peer_waits": self.peer_waits,
+            "peer_hits": self.peer_hits,
+            "l2_breaker": self.breaker.stats() if self.l2 is not None else None,
+        }
@@ -1,6 +1,154 @@
+import datetime
+import os
+import tempfile
+
 class Settings:
     PROJECT_NAME: str = "Balanced Alpha"
     VERSION: str = "0.1.0"
     API_V1_STR: str = "/api/v1"
 
+    # --- Sentiment Service ---
+    SENTIMENT_API_URL: str = os.environ.get(
+        "SENTIMENT_API_URL", "https://api-inference.huggingface.co/models/ProsusAI/finbert"
+    )
+    SENTIMENT_HTTP2: bool = os.environ.get("SENTIMENT_HTTP2", "true").lower() in ("1", "true", "yes")
+    SENTIMENT_HTTP_TIMEOUT: float = float(os.environ.get("SENTIMENT_HTTP_TIMEOUT", "10"))
+    SENTIMENT_HTTP_CONNECT_TIMEOUT: float = float(os.environ.get("SENTIMENT_HTTP_CONNECT_TIMEOUT", "3"))
+    SENTIMENT_HTTP_MAX_CONNECTIONS: int = int(os.environ.get("SENTIMENT_HTTP_MAX_CONNECTIONS", "20"))
+    SENTIMENT_HTTP_MAX_KEEPALIVE: int = int(os.environ.get("SENTIMENT_HTTP_MAX_KEEPALIVE", "10"))
+
+    # --- Sentiment Batching ---
+    # Headlines from concurrent briefs are merged into shared inference calls.
+    SENTIMENT_BATCH_MAX_SIZE: int = int(os.environ.get("SENTIMENT_BATCH_MAX_SIZE", "32"))
+    SENTIMENT_BATCH_MAX_WAIT_MS: float = float(os.environ.get("SENTIMENT_BATCH_MAX_WAIT_MS", "10"))
+
+    # --- Sentiment Routing ---
+    # A fast first-stage classifier decides confident headlines; only the rest reach FinBERT.
+    # SENTIMENT_FAST_MODEL_PATH points at a trained hashed n-gram model (train_fast_sentiment.py);
+    # without one the finance lexicon is used. Off by default: while off, the fast tier runs in
+    # shadow (SENTIMENT_ROUTER_SHADOW), scoring every headline FinBERT scores without serving it,
+    # so sentiment_router.audit_agreement and fast_rate in /stats show what enabling it would do.
+    SENTIMENT_ROUTER_ENABLED: bool = os.environ.get("SENTIMENT_ROUTER_ENABLED", "false").lower() in ("1", "true", "yes")
+    SENTIMENT_ROUTER_SHADOW: bool = os.environ.get("SENTIMENT_ROUTER_SHADOW", "true").lower() in ("1", "true", "yes")
+    SENTIMENT_FAST_MODEL_PATH: str = os.environ.get("SENTIMENT_FAST_MODEL_PATH", "")
+    SENTIMENT_FAST_MIN_CONFIDENCE: float = float(os.environ.get("SENTIMENT_FAST_MIN_CONFIDENCE", "0.9"))
+    # Share of fast decisions also scored by FinBERT to track agreement
+    SENTIMENT_ROUTER_AUDIT_RATE: float = float(os.environ.get("SENTIMENT_ROUTER_AUDIT_RATE", "0.05"))
+
+    # --- Local FinBERT (Starting_Algorithm) ---
+    # "torch" runs the full-precision model; "onnx" exports it once to FINBERT_ONNX_DIR
+    # (int8-quantized unless FINBERT_ONNX_QUANTIZE=false) and runs it with onnxruntime.
+    FINBERT_BACKEND: str = os.environ.get("FINBERT_BACKEND", "torch")
+    FINBERT_ONNX_DIR: str = os.environ.get(
+        "FINBERT_ONNX_DIR", os.path.join(tempfile.gettempdir(), "balanced_alpha", "finbert-onnx")
+    )
+    FINBERT_ONNX_QUANTIZE: bool = os.environ.get("FINBERT_ONNX_QUANTIZE", "true").lower() in ("1", "true", "yes")
+    FINBERT_MAX_BATCH: int = int(os.environ.get("FINBERT_MAX_BATCH", "32"))
+    # CPU threads per forward pass (0 = runtime default)
+    FINBERT_THREADS: int = int(os.environ.get("FINBERT_THREADS", "0"))
+
+    # --- Sentiment Cache ---
+    # Scores are keyed by headline content; set SENTIMENT_CACHE_PATH="" to keep them in memory only.
+    SENTIMENT_CACHE_PATH: str = os.environ.get(
+        "SENTIMENT_CACHE_PATH",
+        os.path.join(tempfile.gettempdir(), "balanced_alpha", "sentiment_cache.sqlite3"),
+    )
+    SENTIMENT_CACHE_MAX_ENTRIES: int = int(os.environ.get("SENTIMENT_CACHE_MAX_ENTRIES", "50000"))
+
+    # --- Ticker Brief Cache ---
+    # Fresh until the soft TTL; served stale (with a background refresh) until the hard TTL.
+    BRIEF_SOFT_TTL: float = float(os.environ.get("BRIEF_SOFT_TTL", "300"))
+    BRIEF_HARD_TTL: float = float(os.environ.get("BRIEF_HARD_TTL", "900"))
+    BRIEF_L1_MAX_ENTRIES: int = int(os.environ.get("BRIEF_L1_MAX_ENTRIES", "100"))
+    # Shared tier behind the in-process cache, so workers and instances reuse each other's briefs:
+    # redis://host:6379/0 (any Redis-protocol server) or sqlite:///path/to/briefs.sqlite3. "" disables it.
+    BRIEF_L2_URL: str = os.environ.get("BRIEF_L2_URL", "")
+    BRIEF_L2_TIMEOUT: float = float(os.environ.get("BRIEF_L2_TIMEOUT", "0.25"))
+    # How long other workers wait for the first worker's build of a brief before building it themselves
+    BRIEF_BUILD_LOCK_SECONDS: float = float(os.environ.get("BRIEF_BUILD_LOCK_SECONDS", "15"))
+    # Upper bound on briefs fetching upstream data at once, across all endpoints.
+    BRIEF_BUILD_CONCURRENCY: int = int(os.environ.get("BRIEF_BUILD_CONCURRENCY", "4"))
+
+    # --- Prewarming ---
+    # Optional in-process scheduler that keeps briefs warm (started from the app lifespan).
+    PREWARM_ENABLED: bool = os.environ.get("PREWARM_ENABLED", "false").lower() in ("1", "true", "yes")
+    PREWARM_WATCHLIST: list = [
+        s.strip().upper()
+        for s in os.environ.get("PREWARM_WATCHLIST", "AAPL,MSFT,NVDA,TSLA,AMZN,GOOGL,META").split(",")
+        if s.strip()
+    ]
+    PREWARM_TOP_N: int = int(os.environ.get("PREWARM_TOP_N", "20"))
+    # Symbols whose request counts are kept for ranking (bounds memory with many distinct symbols)
+    PREWARM_MAX_TRACKED: int = int(os.environ.get("PREWARM_MAX_TRACKED", "1000"))
+    PREWARM_INCLUDE_SP500: bool = os.environ.get("PREWARM_INCLUDE_SP500", "false").lower() in ("1", "true", "yes")
+    PREWARM_INTERVAL: float = float(os.environ.get("PREWARM_INTERVAL", "60"))
+    PREWARM_BUDGET: int = int(os.environ.get("PREWARM_BUDGET", "25"))
+    PREWARM_CONCURRENCY: int = int(os.environ.get("PREWARM_CONCURRENCY", "3"))
+
+    # --- Price Bar Store ---
+    # Local daily-bar store read before yfinance; set BAR_STORE_PATH="" to always fetch upstream.
+    BAR_STORE_PATH: str = os.environ.get(
+        "BAR_STORE_PATH", os.path.join(tempfile.gettempdir(), "balanced_alpha", "bars")
+    )
+    BAR_STORE_REFRESH_SECONDS: float = float(os.environ.get("BAR_STORE_REFRESH_SECONDS", "900"))
+
+    # --- Symbol Universe ---
+    # S&P 500 list kept in memory and in a local snapshot, re-scraped in the background after the TTL.
+    UNIVERSE_SNAPSHOT_PATH: str = os.environ.get(
+        "UNIVERSE_SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "balanced_alpha", "sp500.json")
+    )
+    UNIVERSE_TTL: float = float(os.environ.get("UNIVERSE_TTL", "86400"))
+
+    # --- Politician Disclosures ---
+    # Parsed trades are cached per PDF content hash; set PDF_PARSE_CACHE_PATH="" to disable.
+    PDF_PARSE_CACHE_PATH: str = os.environ.get(
+        "PDF_PARSE_CACHE_PATH", os.path.join(tempfile.gettempdir(), "balanced_alpha", "pdf_parse")
+    )
+    # Worker processes for PDF parsing (0 = one per CPU).
+    PDF_PARSE_WORKERS: int = int(os.environ.get("PDF_PARSE_WORKERS", "0"))
+    # Fewest PDFs to parse before using worker processes; smaller batches parse in-process,
+    # since spawning the pool (~0.5s per worker to import the parser) outweighs ~70ms per PDF.
+    PDF_PARSE_POOL_MIN: int = int(os.environ.get("PDF_PARSE_POOL_MIN", "32"))
+    # Incremental crawl of every PTR filing instead of the demo filings.
+    DISCLOSURE_CRAWL_ENABLED: bool = os.environ.get("DISCLOSURE_CRAWL_ENABLED", "false").lower() in ("1", "true", "yes")
+    DISCLOSURE_CRAWL_PATH: str = os.environ.get(
+        "DISCLOSURE_CRAWL_PATH", os.path.join(tempfile.gettempdir(), "balanced_alpha", "disclosures")
+    )
+    DISCLOSURE_CRAWL_YEARS: list = [
+        int(y) for y in os.environ.get("DISCLOSURE_CRAWL_YEARS", str(datetime.date.today().year)).split(",") if y.strip()
+    ]
+    DISCLOSURE_CRAWL_CONCURRENCY: int = int(os.environ.get("DISCLOSURE_CRAWL_CONCURRENCY", "8"))
+    # Seconds between delta crawls; the index is rebuilt in the background once it is this old.
+    DISCLOSURE_CRAWL_TTL: float = float(os.environ.get("DISCLOSURE_CRAWL_TTL", "3600"))
+    DISCLOSURE_BASE_URL: str = os.environ.get(
+        "DISCLOSURE_BASE_URL", "https://disclosures-clerk.house.gov/public_disc"
+    )
+
+    # --- Scraping ---
+    # Shared per-host token bucket for the news scrapers (backend and Starting_Algorithm).
+    SCRAPE_RATE_PER_HOST: float = float(os.environ.get("SCRAPE_RATE_PER_HOST", "2"))
+    SCRAPE_BURST: float = float(os.environ.get("SCRAPE_BURST", "2"))
+    SCRAPE_CONCURRENCY: int = int(os.environ.get("SCRAPE_CONCURRENCY", "8"))
+    SCRAPE_RETRIES: int = int(os.environ.get("SCRAPE_RETRIES", "3"))
+
+    # --- Circuit Breakers ---
+    # Per-upstream breakers (Yahoo, sentiment API, disclosure PDFs): open after consecutive
+    # failures, probe again after the recovery time. Timeouts follow observed latency.
+    BREAKER_FAILURE_THRESHOLD: int = int(os.environ.get("BREAKER_FAILURE_THRESHOLD", "5"))
+    BREAKER_RECOVERY_SECONDS: float = float(os.environ.get("BREAKER_RECOVERY_SECONDS", "30"))
+    BREAKER_TIMEOUT_PERCENTILE: float = float(os.environ.get("BREAKER_TIMEOUT_PERCENTILE", "0.99"))
+    BREAKER_TIMEOUT_MULTIPLIER: float = float(os.environ.get("BREAKER_TIMEOUT_MULTIPLIER", "2"))
+    BREAKER_MIN_TIMEOUT: float = float(os.environ.get("BREAKER_MIN_TIMEOUT", "1"))
+    YAHOO_MAX_TIMEOUT: float = float(os.environ.get("YAHOO_MAX_TIMEOUT", "10"))
+    DISCLOSURE_MAX_TIMEOUT: float = float(os.environ.get("DISCLOSURE_MAX_TIMEOUT", "10"))
+
+    # --- Startup ---
+    # yfinance, pandas and pypdf are imported lazily; by default they are then imported in a
+    # background thread after startup so the first brief does not pay for them either.
+    # Set PRELOAD_MODULES=false where instances mostly serve lightweight endpoints.
+    PRELOAD_MODULES: bool = os.environ.get("PRELOAD_MODULES", "true").lower() in ("1", "true", "yes")
+
+    # --- Bulk Endpoints ---
+    BULK_MAX_SYMBOLS: int = int(os.environ.get("BULK_MAX_SYMBOLS", "50"))
+
 settings = Settings()
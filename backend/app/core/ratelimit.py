@@ -0,0 +1,238 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
+from app.core.config import settings
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Statuses that mean "slow down / try again later"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: at most `burst` requests at once, refilled at `rate` per second.
+
+    Callers reserve a token in order and sleep outside the lock until it is theirs, so
+    concurrent workers together stay at the configured rate instead of far below it.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        # Refills are counted from here; after defer() it lies in the future
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.acquired = 0
+        self.waited_seconds = 0.0
+
+    def _reserve(self) -> float:
+        """
+        Take a token (possibly going into debt) and return how long to wait before using it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now > self._updated:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+            self._tokens -= 1.0
+            # Wait out any pause, then any debt at the refill rate
+            wait = (self._updated - now) + (-self._tokens / self.rate if self._tokens < 0 else 0.0)
+            self.acquired += 1
+            self.waited_seconds += wait
+            return wait
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be sent. Returns the seconds waited.
+        """
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def defer(self, seconds: float):
+        """
+        Hand out no tokens for `seconds` (e.g. after a 429 with Retry-After).
+        """
+        with self._lock:
+            # Resume with a single token so the backlog does not burst the moment the pause ends
+            self._tokens = min(self._tokens, 1.0)
+            self._updated = max(self._updated, time.monotonic() + seconds)
+
+class HostRateLimiter:
+    """
+    One TokenBucket per host, shared by every scraper in the process.
+
+    Args:
+        rate: Default requests per second per host.
+        burst: Default bucket size per host.
+        per_host: Optional {host: (rate, burst)} overrides.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0, per_host: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.rate = rate
+        self.burst = burst
+        self.per_host = per_host or {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+        # Counters
+        self.retries = 0
+        self.throttled = 0
+
+    @staticmethod
+    def host_of(host_or_url: str) -> str:
+        if "://" in host_or_url:
+            return urlsplit(host_or_url).hostname or host_or_url
+        return host_or_url
+
+    def bucket(self, host_or_url: str) -> TokenBucket:
+        host = self.host_of(host_or_url)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self.per_host.get(host, (self.rate, self.burst))
+                bucket = self._buckets[host] = TokenBucket(rate, burst)
+            return bucket
+
+    def acquire(self, host_or_url: str) -> float:
+        return self.bucket(host_or_url).acquire()
+
+    def defer(self, host_or_url: str, seconds: float):
+        self.bucket(host_or_url).defer(seconds)
+
+    def record_retry(self, throttled: bool):
+        with self._lock:
+            self.retries += 1
+            if throttled:
+                self.throttled += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            buckets = dict(self._buckets)
+        return {
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "hosts": {
+                host: {"rate": bucket.rate, "requests": bucket.acquired, "waited_seconds": round(bucket.waited_seconds, 2)}
+                for host, bucket in buckets.items()
+            },
+        }
+
+# Shared by the backend ingest service and Starting_Algorithm's scraper
+scrape_limiter = HostRateLimiter(
+    rate=settings.SCRAPE_RATE_PER_HOST,
+    burst=settings.SCRAPE_BURST,
+)
+
+# --- Retries ---
+
+class RetryableError(Exception):
+    """
+    Raised by an attempt that should be retried, optionally with the server's Retry-After
+    (seconds) and the response that triggered it.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None, throttled: bool = False, response=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.throttled = throttled
+        self.response = response
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """
+    Exponential backoff with full jitter: uniform(0, min(cap, base * 2**attempt)).
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+def call_with_retries(
+    attempt: Callable[[], T],
+    host: str,
+    limiter: Optional[HostRateLimiter] = None,
+    retries: int = settings.SCRAPE_RETRIES,
+    base_delay: float = 0.5,
+) -> T:
+    """
+    Run `attempt()` after taking a token for `host`, retrying when it raises RetryableError.
+
+    Throttling responses (429) pause the whole host, for Retry-After when given or a jittered
+    backoff otherwise, so every worker slows down together; other retryable failures only
+    delay this caller. The last RetryableError is re-raised once retries run out.
+    """
+    limiter = limiter or scrape_limiter
+    for attempt_number in range(retries + 1):
+        limiter.acquire(host)
+        try:
+            return attempt()
+        except RetryableError as e:
+            if attempt_number == retries:
+                raise
+            limiter.record_retry(e.throttled)
+            delay = e.retry_after if e.retry_after is not None else backoff_delay(attempt_number, base_delay)
+            if e.throttled:
+                limiter.defer(host, delay)
+            else:
+                time.sleep(delay)
+    raise AssertionError("unreachable")
+
+def rate_limited_get(session, url: str, limiter: Optional[HostRateLimiter] = None, retries: int = settings.SCRAPE_RETRIES, **kwargs):
+    """
+    `session.get(url, **kwargs)` (requests or httpx) under the per-host limiter, retrying
+    connection errors and 429/5xx responses. Returns the last response if retries run out,
+    and re-raises the last connection error if no response was ever received.
+    """
+    host = HostRateLimiter.host_of(url)
+
+    def attempt():
+        try:
+            response = session.get(url, **kwargs)
+        except Exception as e:
+            raise RetryableError(f"GET {url} failed: {e}") from e
+        if response.status_code in RETRY_STATUSES:
+            raise RetryableError(
+                f"GET {url} returned {response.status_code}",
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+                throttled=response.status_code in (429, 503),
+                response=response,
+            )
+        return response
+
+    try:
+        return call_with_retries(attempt, host, limiter, retries=retries)
+    except RetryableError as e:
+        if e.response is not None:
+            return e.response
+        raise e.__cause__ or e
+
+def map_concurrently(func: Callable[[T], R], items: Iterable[T], max_workers: int) -> List[R]:
+    """
+    `[func(item) for item in items]` on a thread pool, results in input order.
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(func, items))
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Per-key deduplication of concurrent async work.
+
+    The first caller for a key starts the work as a task; every caller that arrives
+    while it is running awaits the same task instead of starting its own.
+
+    - Errors propagate to every waiter, and the key is released so the next call retries.
+    - A cancelled waiter does not cancel the shared task, so the other waiters
+      (and any cache the task fills) still get the result.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+        # Counters
+        self.started = 0
+        self.coalesced = 0
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    def submit(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> "asyncio.Task[T]":
+        """
+        Start `func()` for `key`, or return the run already in progress, without awaiting it.
+        Await the result through `asyncio.shield` so cancelling one waiter leaves the task running.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            self.started += 1
+            task.add_done_callback(lambda done, key=key: self._release(key, done))
+        else:
+            self.coalesced += 1
+        return task
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `func()` for `key`, or join the run already in progress.
+        """
+        return await asyncio.shield(self.submit(key, func))
+
+    def _release(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -1,14 +1,48 @@
+import importlib
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
 from app.core.config import settings
-from app.api.endpoints import router as api_router
+from app.api.endpoints import router as api_router, prewarm_scheduler, brief_cache
+from app.services.classifier import close_clients
+from app.services.universe import sp500_universe
+from app.services.politician import trade_index
+
+# Imported on first use by the services; preloaded off the request path when PRELOAD_MODULES is set
+HEAVY_MODULES = ("numpy", "pandas", "yfinance", "pypdf", "requests")
+
+def preload_heavy_modules():
+    for name in HEAVY_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            print(f"Could not preload {name}: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.PRELOAD_MODULES:
+        threading.Thread(target=preload_heavy_modules, name="preload-modules", daemon=True).start()
+    # Load the S&P 500 snapshot up front; a missing or expired one is refreshed in the background
+    sp500_universe.warm()
+    # Download and parse disclosure PDFs off the request path; briefs show no trades until ready
+    trade_index.start()
+    # Background prewarming is opt-in (PREWARM_ENABLED) since serverless instances are short-lived
+    if settings.PREWARM_ENABLED:
+        prewarm_scheduler.start()
+    yield
+    await prewarm_scheduler.stop()
+    # Let briefs built just before shutdown reach the shared cache tier
+    await brief_cache.flush()
+    await close_clients()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
-    default_response_class=ORJSONResponse
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Set all CORS enabled origins
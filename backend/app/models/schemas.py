@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 class Article(BaseModel):
     headline: str
@@ -38,6 +38,15 @@ class PricePoint(BaseModel):
     ema50: Optional[float] = None
     ema100: Optional[float] = None
 
+class PriceHistoryColumns(BaseModel):
+    # Columnar price history: parallel arrays, one entry per point
+    time: List[str]
+    price: List[float]
+    ma50: List[Optional[float]]
+    ma100: List[Optional[float]]
+    ema50: List[Optional[float]]
+    ema100: List[Optional[float]]
+
 class TickerBrief(BaseModel):
     symbol: str
     bullish_count: int
@@ -60,3 +69,8 @@ class TickerBrief(BaseModel):
     # Tracking
     corporate_insiders: List[InsiderTransaction] = []
     politician_trades: List[PoliticianTrade] = [] # 0.0 to 1.0 (Calculated based on sentiment balance/volatility)
+
+class TickerBriefBatch(BaseModel):
+    briefs: List[TickerBrief]
+    # Symbols whose brief could not be built, with the reason
+    errors: Dict[str, str] = {}
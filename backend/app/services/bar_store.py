@@ -0,0 +1,229 @@
+import json
+import os
+import threading
+import time
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+
+# One fixed-width record per daily bar; `day` is the exchange-local date as days since 1970-01-01.
+BAR_DTYPE = np.dtype([
+    ("day", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+# Fetch periods from shortest to longest history
+COVERAGE_ORDER = ["2y", "5y", "10y", "max"]
+
+# Stored bars re-fetched on each sync to detect retroactive (split/dividend) adjustments
+OVERLAP_BARS = 5
+
+# fetch_many(symbols, period=None, start_day=None) -> {symbol: (bars, timezone name)}
+BarFetcher = Callable[..., Dict[str, Tuple[np.ndarray, Optional[str]]]]
+
+def _coverage_rank(coverage: str) -> int:
+    return COVERAGE_ORDER.index(coverage) if coverage in COVERAGE_ORDER else -1
+
+def empty_bars() -> np.ndarray:
+    return np.empty(0, dtype=BAR_DTYPE)
+
+def _history_revised(stored: np.ndarray, fetched: np.ndarray) -> bool:
+    """
+    True if any completed stored bar has a different close in a fresh download.
+    """
+    if len(stored) == 0 or len(fetched) == 0:
+        return False
+    common, stored_idx, fetched_idx = np.intersect1d(stored["day"], fetched["day"], return_indices=True)
+    if len(common) == 0:
+        return False
+    return not np.allclose(stored["close"][stored_idx], fetched["close"][fetched_idx], rtol=1e-6, atol=0.0)
+
+class BarStore:
+    """
+    Local per-symbol store of daily price bars.
+
+    Bars live in `<root>/<SYMBOL>.bars` as raw BAR_DTYPE records and are read through
+    a read-only memory map, so slicing a period is zero-copy. A JSON sidecar records
+    how much history is stored, its timezone and when it was last synced upstream.
+
+    A sync only fetches the last few stored bars onwards: the last bar may have been a
+    partial session, and the earlier overlap detects split/dividend adjustments, which
+    trigger a full re-download. New bars are appended in place; when the last bar is
+    revised the file is rewritten and atomically replaced, so existing maps stay valid.
+    """
+
+    def __init__(self, root: str, refresh_interval: float = 900.0):
+        self.root = root
+        self.refresh_interval = refresh_interval
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+        # Counters
+        self.full_fetches = 0
+        self.incremental_fetches = 0
+        self.local_reads = 0
+
+        os.makedirs(root, exist_ok=True)
+
+    def _lock(self, symbol: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(symbol, threading.Lock())
+
+    def _paths(self, symbol: str) -> Tuple[str, str]:
+        name = symbol.upper().replace("/", "_")
+        return os.path.join(self.root, f"{name}.bars"), os.path.join(self.root, f"{name}.json")
+
+    def _read_meta(self, symbol: str) -> Dict:
+        _, meta_path = self._paths(symbol)
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, symbol: str, meta: Dict):
+        _, meta_path = self._paths(symbol)
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def read(self, symbol: str) -> np.ndarray:
+        """
+        Memory-mapped view of every stored bar for `symbol` (empty if none).
+        """
+        bars_path, _ = self._paths(symbol)
+        try:
+            count = os.path.getsize(bars_path) // BAR_DTYPE.itemsize
+        except OSError:
+            return empty_bars()
+        if count == 0:
+            return empty_bars()
+        # Ignore any torn trailing record from an interrupted append
+        return np.memmap(bars_path, dtype=BAR_DTYPE, mode="r", shape=(count,))
+
+    def _replace(self, symbol: str, bars: np.ndarray):
+        bars_path, _ = self._paths(symbol)
+        tmp_path = f"{bars_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(np.ascontiguousarray(bars, dtype=BAR_DTYPE).tobytes())
+        os.replace(tmp_path, bars_path)
+
+    def _merge(self, symbol: str, stored: np.ndarray, new: np.ndarray):
+        if len(stored):
+            # Drop re-fetched overlap; keep the last stored day only if that bar was revised
+            last_day = stored["day"][-1]
+            refetched_last = new[new["day"] == last_day]
+            unchanged = len(refetched_last) == 1 and refetched_last.tobytes() == np.asarray(stored[-1:]).tobytes()
+            new = new[new["day"] > last_day] if unchanged else new[new["day"] >= last_day]
+        if len(new) == 0:
+            return
+        if len(stored) == 0 or new["day"][0] > stored["day"][-1]:
+            bars_path, _ = self._paths(symbol)
+            with open(bars_path, "ab") as f:
+                f.write(np.ascontiguousarray(new, dtype=BAR_DTYPE).tobytes())
+        else:
+            # Revised tail: keep stored bars before the first new day, then the new bars
+            keep = np.searchsorted(stored["day"], new["day"][0], side="left")
+            self._replace(symbol, np.concatenate([np.asarray(stored[:keep]), new]))
+
+    def _plan(self, symbol: str, coverage: str) -> Tuple[str, Optional[int]]:
+        """
+        Decide how to sync `symbol`: ("full", None), ("incremental", start_day) or ("local", None).
+        """
+        meta = self._read_meta(symbol)
+        stored = self.read(symbol)
+        stored_coverage = meta.get("coverage", "")
+
+        if len(stored) == 0 or _coverage_rank(stored_coverage) < _coverage_rank(coverage):
+            return ("full", None)
+        if time.time() - meta.get("synced_at", 0) > self.refresh_interval:
+            return ("incremental", int(stored["day"][-min(len(stored), OVERLAP_BARS)]))
+        return ("local", None)
+
+    def _store_full(self, symbol: str, coverage: str, bars: np.ndarray, tz: Optional[str]):
+        if len(bars):
+            self._replace(symbol, bars)
+            tz = tz or self._read_meta(symbol).get("tz")
+            self._write_meta(symbol, {"coverage": coverage, "tz": tz, "synced_at": time.time()})
+
+    def _store_incremental(self, symbol: str, bars: np.ndarray, tz: Optional[str]) -> bool:
+        """
+        Merge freshly fetched bars. Returns False if past closes were revised and a full re-download is needed.
+        """
+        stored = self.read(symbol)
+        overlap = np.asarray(stored[-OVERLAP_BARS:])
+        if _history_revised(overlap[:-1], bars):
+            return False
+        self._merge(symbol, stored, bars)
+        meta = self._read_meta(symbol)
+        meta.update({"tz": tz or meta.get("tz"), "synced_at": time.time()})
+        self._write_meta(symbol, meta)
+        return True
+
+    def get_bars_many(self, symbols: List[str], coverage: str, fetch_many: BarFetcher) -> Dict[str, Tuple[np.ndarray, Optional[str]]]:
+        """
+        Return {symbol: (bars, timezone)} with at least `coverage` of history for each symbol.
+
+        Symbols that need syncing are fetched together: one `fetch_many(symbols, start_day=...)`
+        call for stale ones and one `fetch_many(symbols, period=...)` call per period for those
+        needing a full download. Upstream failures fall back to whatever is stored locally.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        # Lock in a fixed order so concurrent batches cannot deadlock
+        locks = [self._lock(symbol) for symbol in sorted(symbols)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            plans = {symbol: self._plan(symbol, coverage) for symbol in symbols}
+            incremental = [symbol for symbol, (kind, _) in plans.items() if kind == "incremental"]
+            # Full downloads grouped by period, one batch each
+            full: Dict[str, List[str]] = {}
+            for symbol, (kind, _) in plans.items():
+                if kind == "full":
+                    full.setdefault(coverage, []).append(symbol)
+            self.local_reads += sum(1 for kind, _ in plans.values() if kind == "local")
+
+            if incremental:
+                try:
+                    start_day = min(plans[symbol][1] for symbol in incremental)
+                    fetched = fetch_many(incremental, start_day=start_day)
+                    self.incremental_fetches += 1
+                    for symbol in incremental:
+                        bars, tz = fetched.get(symbol, (empty_bars(), None))
+                        if not self._store_incremental(symbol, bars, tz):
+                            # Split/dividend adjustment rewrote past closes: re-download all stored history
+                            full.setdefault(self._read_meta(symbol)["coverage"], []).append(symbol)
+                except Exception as e:
+                    print(f"Bar store sync failed for {incremental}, serving local bars: {e}")
+
+            for period, period_symbols in full.items():
+                try:
+                    fetched = fetch_many(period_symbols, period=period)
+                    self.full_fetches += 1
+                    for symbol in period_symbols:
+                        bars, tz = fetched.get(symbol, (empty_bars(), None))
+                        self._store_full(symbol, period, bars, tz)
+                except Exception as e:
+                    print(f"Bar store download failed for {period_symbols}, serving local bars: {e}")
+
+            return {symbol: (self.read(symbol), self._read_meta(symbol).get("tz")) for symbol in symbols}
+        finally:
+            for lock in locks:
+                lock.release()
+
+    def get_bars(self, symbol: str, coverage: str, fetch_many: BarFetcher) -> Tuple[np.ndarray, Optional[str]]:
+        """
+        Single-symbol form of `get_bars_many`.
+        """
+        return self.get_bars_many([symbol], coverage, fetch_many)[symbol]
+
+    def stats(self) -> Dict:
+        return {
+            "full_fetches": self.full_fetches,
+            "incremental_fetches": self.incremental_fetches,
+            "local_reads": self.local_reads,
+        }
@@ -1,54 +1,246 @@
-import requests
+import asyncio
+import httpx
 import os
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
+from app.core.breaker import sentiment_breaker
+from app.core.config import settings
+from app.services.sentiment_cache import SentimentCache
 
-# Use Hugging Face Inference API
-API_URL = "https://api-inference.huggingface.co/models/ProsusAI/finbert"
+# Use Hugging Face Inference API (SENTIMENT_API_URL can point at a local stub server)
+MODEL_NAME = "ProsusAI/finbert"
+API_URL = settings.SENTIMENT_API_URL
 # In a real app, use an env var: os.environ.get("HF_API_KEY")
 # For this demo, we'll use the public free tier which doesn't strictly require a key but is rate limited.
-HEADERS = {"Authorization": f"Bearer {os.environ.get('HF_API_KEY', '')}"}
+HF_API_KEY = os.environ.get('HF_API_KEY', '')
+HEADERS = {"Authorization": f"Bearer {HF_API_KEY}"} if HF_API_KEY else {}
 
-def analyze_sentiment(text: str) -> Tuple[str, float]:
+# Content-addressed score cache, shared with the local classifier in Starting_Algorithm
+sentiment_cache = SentimentCache(
+    settings.SENTIMENT_CACHE_PATH,
+    max_entries=settings.SENTIMENT_CACHE_MAX_ENTRIES,
+    namespace=MODEL_NAME,
+)
+
+# --- HTTP Clients ---
+# Pooled keep-alive clients so headlines don't pay a new TCP+TLS handshake per call.
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _client_options() -> Dict:
+    return {
+        "headers": HEADERS,
+        "http2": settings.SENTIMENT_HTTP2 and _http2_available(),
+        "limits": httpx.Limits(
+            max_connections=settings.SENTIMENT_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SENTIMENT_HTTP_MAX_KEEPALIVE,
+        ),
+        "timeout": httpx.Timeout(
+            settings.SENTIMENT_HTTP_TIMEOUT,
+            connect=settings.SENTIMENT_HTTP_CONNECT_TIMEOUT,
+        ),
+    }
+
+_async_client: Optional[httpx.AsyncClient] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_client: Optional[httpx.Client] = None
+
+def get_async_client() -> httpx.AsyncClient:
     """
-    Analyzes the sentiment of a given financial text using Hugging Face API.
+    Shared async client for the running event loop.
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    # Connections are bound to the loop that opened them
+    if _async_client is None or _async_client.is_closed or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(**_client_options())
+        _async_client_loop = loop
+    return _async_client
 
-    Args:
-        text: The financial news article or headline to analyze.
+def get_sync_client() -> httpx.Client:
+    """
+    Shared blocking client for callers outside the event loop.
+    """
+    global _sync_client
+    if _sync_client is None or _sync_client.is_closed:
+        _sync_client = httpx.Client(**_client_options())
+    return _sync_client
 
-    Returns:
-        A tuple containing the predicted sentiment ('positive', 'negative', 'neutral')
-        and the confidence score (a float between 0 and 1).
+async def close_clients():
     """
-    if not text or not isinstance(text, str):
-        return ("invalid_input", 0.0)
+    Close the pooled clients (called on app shutdown).
+    """
+    global _async_client, _sync_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
 
-    try:
-        payload = {"inputs": text}
-        response = requests.post(API_URL, headers=HEADERS, json=payload, timeout=5)
-        
+# --- Batch Scoring ---
+
+def _best_label(scores) -> Tuple[str, float]:
+    """
+    Pick the highest scoring label from a single FinBERT prediction set.
+    """
+    if isinstance(scores, list) and len(scores) > 0:
+        best_score = max(scores, key=lambda x: x['score'])
+        return (best_score['label'], best_score['score'])
+    return ("neutral", 0.0)
+
+class _Batch:
+    """
+    Bookkeeping shared by the sync and async batch paths: validates and de-duplicates
+    the input, takes what the caller found in the cache and maps model output back to
+    positions. Cache I/O is left to the callers, so the async path can keep it off the loop.
+    """
+
+    def __init__(self, texts: List[str]):
+        self.results: List[Tuple[str, float]] = [("invalid_input", 0.0)] * len(texts)
+
+        # Only send valid, de-duplicated texts to the model
+        self.positions: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if text and isinstance(text, str):
+                self.positions.setdefault(text, []).append(i)
+        self.to_query = list(self.positions)
+
+    def use_cached(self, cached: Dict[str, Tuple[str, float]]):
+        # Previously scored headlines never reach the model
+        for text, result in cached.items():
+            self.fill(text, result)
+        self.to_query = [text for text in self.positions if text not in cached]
+
+    def fill(self, text: str, result: Tuple[str, float]):
+        for i in self.positions[text]:
+            self.results[i] = result
+
+    def apply(self, response: httpx.Response) -> List[Tuple[str, Tuple[str, float]]]:
+        """
+        Fill in the model's scores and return the (text, score) pairs worth caching.
+        """
         # Check if model is loading
         if response.status_code == 503:
-             # Fallback if model is cold/loading
-             print("Model is loading, returning neutral fallback")
-             return ("neutral", 0.5)
+            # Fallback if model is cold/loading
+            print("Model is loading, returning neutral fallback")
+            for text in self.to_query:
+                self.fill(text, ("neutral", 0.5))
+            return []
 
         response.raise_for_status()
         data = response.json()
 
-        # API returns a list of lists of dicts: [[{'label': 'positive', 'score': 0.9}, ...]]
-        # or sometimes just a list of dicts depending on the model pipeline.
-        # FinBERT usually returns: [[{'label': 'positive', 'score': 0.95}, {'label': 'negative', 'score': 0.02}, ...]]
-        
-        if isinstance(data, list) and len(data) > 0:
-            scores = data[0] # Get the first prediction set
-            if isinstance(scores, list):
-                # Find the label with the highest score
-                best_score = max(scores, key=lambda x: x['score'])
-                return (best_score['label'], best_score['score'])
-                
-        return ("neutral", 0.0)
+        # For a list of inputs the API returns one prediction set per input:
+        # [[{'label': 'positive', 'score': 0.95}, {'label': 'negative', 'score': 0.02}, ...], ...]
+        if not isinstance(data, list) or len(data) != len(self.to_query):
+            raise ValueError(f"Unexpected response shape for {len(self.to_query)} inputs")
 
-    except Exception as e:
-        print(f"Sentiment analysis failed: {e}")
+        scored = [(text, _best_label(scores)) for text, scores in zip(self.to_query, data)]
+        for text, result in scored:
+            self.fill(text, result)
+
+        # Only genuine model output is cached; fallbacks are not
+        return scored
+
+    def fail(self, error: Exception):
+        print(f"Batch sentiment analysis failed: {error}")
         # Fail gracefully to neutral
-        return ("neutral", 0.0)
+        for text in self.to_query:
+            self.fill(text, ("neutral", 0.0))
+
+def _request_timeout() -> httpx.Timeout:
+    # Adaptive read timeout from recent inference latency
+    return httpx.Timeout(sentiment_breaker.timeout(), connect=settings.SENTIMENT_HTTP_CONNECT_TIMEOUT)
+
+def _check_status(response: httpx.Response) -> httpx.Response:
+    # Server errors and rate limiting (429) count against the circuit, so a sustained limit
+    # stops every batch hitting the API; 503 means the model is loading and is handled by the batch
+    if response.status_code == 429 or (response.status_code >= 500 and response.status_code != 503):
+        response.raise_for_status()
+    return response
+
+async def _post_async(texts: List[str]) -> httpx.Response:
+    response = await get_async_client().post(API_URL, json={"inputs": texts}, timeout=_request_timeout())
+    return _check_status(response)
+
+def _post_sync(texts: List[str]) -> httpx.Response:
+    response = get_sync_client().post(API_URL, json={"inputs": texts}, timeout=_request_timeout())
+    return _check_status(response)
+
+async def analyze_sentiment_batch_async(texts: List[str]) -> List[Tuple[str, float]]:
+    """
+    Analyzes the sentiment of a list of financial texts with a single Hugging Face API call,
+    awaiting the pooled async client instead of blocking a thread.
+
+    Args:
+        texts: The financial news articles or headlines to analyze.
+
+    Returns:
+        A list of (stance, confidence) tuples in the same order as `texts`,
+        with the same semantics as `analyze_sentiment`.
+    """
+    batch = _Batch(texts)
+    if not batch.positions:
+        return batch.results
+    # The cache's SQLite tier reads and commits synchronously; keep that off the event loop
+    batch.use_cached(await asyncio.to_thread(sentiment_cache.get_many, list(batch.positions)))
+    if not batch.to_query:
+        return batch.results
+
+    scored = []
+    try:
+        # Fails fast (neutral fallback) while the inference API's circuit is open
+        response = await sentiment_breaker.call_async(_post_async, batch.to_query)
+        scored = batch.apply(response)
+    except Exception as e:
+        batch.fail(e)
+
+    if scored:
+        await asyncio.to_thread(sentiment_cache.set_many, scored)
+    return batch.results
+
+def analyze_sentiment_batch(texts: List[str]) -> List[Tuple[str, float]]:
+    """
+    Blocking variant of `analyze_sentiment_batch_async` using the pooled sync client.
+    """
+    batch = _Batch(texts)
+    if not batch.positions:
+        return batch.results
+    batch.use_cached(sentiment_cache.get_many(batch.positions))
+    if not batch.to_query:
+        return batch.results
+
+    scored = []
+    try:
+        response = sentiment_breaker.call(_post_sync, batch.to_query)
+        scored = batch.apply(response)
+    except Exception as e:
+        batch.fail(e)
+
+    if scored:
+        sentiment_cache.set_many(scored)
+    return batch.results
+
+async def analyze_sentiment_async(text: str) -> Tuple[str, float]:
+    """
+    Async variant of `analyze_sentiment`.
+    """
+    return (await analyze_sentiment_batch_async([text]))[0]
+
+def analyze_sentiment(text: str) -> Tuple[str, float]:
+    """
+    Analyzes the sentiment of a given financial text using Hugging Face API.
+
+    Args:
+        text: The financial news article or headline to analyze.
+
+    Returns:
+        A tuple containing the predicted sentiment ('positive', 'negative', 'neutral')
+        and the confidence score (a float between 0 and 1).
+    """
+    return analyze_sentiment_batch([text])[0]
@@ -0,0 +1,93 @@
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+from app.core.breaker import CircuitBreaker, yahoo_breaker
+
+if TYPE_CHECKING:
+    import yfinance as yf
+
+# Datasets that yfinance loads through the same upstream request share a lock,
+# so concurrent readers wait for the first fetch instead of racing it.
+_LOCK_GROUPS = {
+    "insider_transactions": "holders",
+    "institutional_holders": "holders",
+}
+
+class TickerDataSource:
+    """
+    Shared view of one symbol's Yahoo Finance data for the duration of a brief build.
+
+    All services in a build read from the same `yf.Ticker`, and each dataset
+    (info, news, options, holders, ...) is fetched at most once and memoized,
+    including failures. Upstream calls go through a shared Yahoo circuit breaker (the
+    API's by default), so they fail fast while Yahoo is down. Safe to use from several
+    executor threads at once.
+    """
+
+    def __init__(self, symbol: str, breaker: CircuitBreaker = yahoo_breaker):
+        self.symbol = symbol
+        self.breaker = breaker
+        self.upstream_calls = 0
+
+        self._ticker: Optional["yf.Ticker"] = None
+        self._values: Dict[str, Any] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    @property
+    def ticker(self) -> "yf.Ticker":
+        with self._guard:
+            if self._ticker is None:
+                # Imported on first use so app startup does not pay for yfinance and pandas
+                import yfinance as yf
+                self._ticker = yf.Ticker(self.symbol)
+            return self._ticker
+
+    def _memoize(self, name: str, fetch: Callable[[], Any]) -> Any:
+        """
+        Return the dataset `name`, calling `fetch` only if it has not been loaded yet.
+        """
+        with self._guard:
+            lock = self._locks.setdefault(_LOCK_GROUPS.get(name, name), threading.Lock())
+
+        with lock:
+            if name in self._values:
+                return self._values[name]
+            if name in self._errors:
+                raise self._errors[name]
+
+            with self._guard:
+                self.upstream_calls += 1
+            try:
+                value = self.breaker.call(fetch)
+            except Exception as e:
+                self._errors[name] = e
+                raise
+            self._values[name] = value
+            return value
+
+    @property
+    def info(self) -> Dict:
+        return self._memoize("info", lambda: self.ticker.info)
+
+    @property
+    def news(self) -> List[Dict]:
+        return self._memoize("news", lambda: self.ticker.news)
+
+    @property
+    def options(self) -> tuple:
+        """
+        Available option expiration dates.
+        """
+        return self._memoize("options", lambda: self.ticker.options)
+
+    def option_chain(self, expiration: str):
+        return self._memoize(f"option_chain:{expiration}", lambda: self.ticker.option_chain(expiration))
+
+    @property
+    def insider_transactions(self):
+        return self._memoize("insider_transactions", lambda: self.ticker.insider_transactions)
+
+    @property
+    def institutional_holders(self):
+        return self._memoize("institutional_holders", lambda: self.ticker.institutional_holders)
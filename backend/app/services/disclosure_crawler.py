@@ -0,0 +1,287 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+import httpx
+from app.core.breaker import disclosure_breaker
+from app.models.schemas import PoliticianTrade
+from app.services.politician import parse_cache, parse_pdfs_parallel, records_to_trades
+
+HOUSE_BASE_URL = "https://disclosures-clerk.house.gov/public_disc"
+
+# Periodic Transaction Reports (the filings that list individual trades)
+PTR_FILING_TYPE = "P"
+
+# The filing index does not record party affiliation
+UNKNOWN_PARTY = "Unknown"
+
+# Filings parsed per batch when loading trades, bounding how many PDFs are held in memory
+LOAD_BATCH_SIZE = 64
+
+def filing_index_url(base_url: str, year: int) -> str:
+    """
+    The yearly filing index: a zip holding `<year>FD.xml` with one <Member> per filing.
+    """
+    return f"{base_url}/financial-pdfs/{year}FD.zip"
+
+def ptr_pdf_url(base_url: str, year: int, doc_id: str) -> str:
+    return f"{base_url}/ptr-pdfs/{year}/{doc_id}.pdf"
+
+def _iso_date(filing_date: str) -> str:
+    # The index uses M/D/YYYY
+    try:
+        return datetime.strptime(filing_date, "%m/%d/%Y").strftime("%Y-%m-%d")
+    except ValueError:
+        return filing_date
+
+def parse_filing_index(content: bytes, base_url: str, year: int) -> List[Dict]:
+    """
+    Extract every PTR filing from a yearly index zip as {doc_id, politician, party, date, url}.
+    """
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        name = next(n for n in archive.namelist() if n.lower().endswith(".xml"))
+        root = ET.fromstring(archive.read(name))
+
+    filings = []
+    for member in root.iter("Member"):
+        if (member.findtext("FilingType") or "").strip() != PTR_FILING_TYPE:
+            continue
+        doc_id = (member.findtext("DocID") or "").strip()
+        if not doc_id:
+            continue
+        first = (member.findtext("First") or "").strip()
+        last = (member.findtext("Last") or "").strip()
+        filing_year = int((member.findtext("Year") or "").strip() or year)
+        filings.append({
+            "doc_id": doc_id,
+            "politician": f"{first} {last}".strip(),
+            "party": UNKNOWN_PARTY,
+            "date": _iso_date((member.findtext("FilingDate") or "").strip()),
+            "url": ptr_pdf_url(base_url, filing_year, doc_id),
+        })
+    return filings
+
+class DisclosureCrawler:
+    """
+    Incremental crawler for House Periodic Transaction Report PDFs.
+
+    Each run re-reads the yearly filing indexes with conditional GETs, then downloads
+    only filings that are new since the last run (or failed last time) with at most
+    `max_concurrency` requests in flight. A JSON manifest under `root` records every
+    filing with its ETag / Last-Modified validators and content hash; with
+    `revalidate=True` known PDFs are re-checked too, and unchanged ones cost a 304.
+
+    Layout under `root`: manifest.json, index/<year>FD.zip, pdfs/<doc_id>.pdf.
+
+    Args:
+        root: Directory for the manifest, index copies and PDFs.
+        years: Filing years to crawl.
+        base_url: Clerk site root; point it at a local stand-in for testing.
+        max_concurrency: Maximum concurrent PDF downloads.
+        timeout: Per-request timeout in seconds.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        years: List[int],
+        base_url: str = HOUSE_BASE_URL,
+        max_concurrency: int = 8,
+        timeout: float = 20.0,
+    ):
+        self.root = root
+        self.years = years
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+        self._manifest_path = os.path.join(root, "manifest.json")
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "index"), exist_ok=True)
+        os.makedirs(os.path.join(root, "pdfs"), exist_ok=True)
+        self.manifest = self._read_manifest()
+
+    # --- Manifest ---
+
+    def _read_manifest(self) -> Dict:
+        try:
+            with open(self._manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        manifest.setdefault("indexes", {})
+        manifest.setdefault("filings", {})
+        return manifest
+
+    def _write_manifest(self):
+        tmp_path = f"{self._manifest_path}.tmp"
+        with self._lock:
+            with open(tmp_path, "w") as f:
+                json.dump(self.manifest, f)
+        os.replace(tmp_path, self._manifest_path)
+
+    def _pdf_path(self, doc_id: str) -> str:
+        return os.path.join(self.root, "pdfs", f"{doc_id}.pdf")
+
+    # --- HTTP ---
+
+    @staticmethod
+    def _conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    @staticmethod
+    def _validators(response: httpx.Response) -> Dict[str, Optional[str]]:
+        return {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+
+    def _fetch_index(self, client: httpx.Client, year: int) -> List[Dict]:
+        url = filing_index_url(self.base_url, year)
+        local_path = os.path.join(self.root, "index", f"{year}FD.zip")
+        entry = self.manifest["indexes"].get(url)
+        if entry and not os.path.exists(local_path):
+            entry = None
+
+        response = client.get(url, headers=self._conditional_headers(entry))
+        if response.status_code == 304:
+            with open(local_path, "rb") as f:
+                content = f.read()
+        else:
+            response.raise_for_status()
+            content = response.content
+            with open(local_path, "wb") as f:
+                f.write(content)
+            self.manifest["indexes"][url] = self._validators(response)
+
+        return parse_filing_index(content, self.base_url, year)
+
+    def _download(self, client: httpx.Client, filing: Dict) -> str:
+        """
+        Fetch one PDF. Returns "downloaded", "not_modified" or "failed"; a failed re-check of
+        a good copy leaves its manifest entry as it was.
+        """
+        doc_id = filing["doc_id"]
+        path = self._pdf_path(doc_id)
+        with self._lock:
+            entry = self.manifest["filings"].get(doc_id)
+        if (entry and entry.get("status") != "ok") or not os.path.exists(path):
+            entry = None
+
+        try:
+            # Fails fast while the clerk site's circuit is open; the filing is retried next crawl
+            response = disclosure_breaker.call(
+                client.get, filing["url"], headers=self._conditional_headers(entry), timeout=disclosure_breaker.timeout()
+            )
+            if response.status_code == 304:
+                return "not_modified"
+            response.raise_for_status()
+        except Exception as e:
+            print(f"Failed to download disclosure {doc_id}: {e}")
+            # A failed revalidation keeps the good copy on disk (and its validators and hash)
+            # in the index; only a filing with no usable copy is marked failed
+            if entry is None:
+                with self._lock:
+                    self.manifest["filings"][doc_id] = {**filing, "status": "failed"}
+            return "failed"
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(response.content)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.manifest["filings"][doc_id] = {
+                **filing,
+                **self._validators(response),
+                "sha256": hashlib.sha256(response.content).hexdigest(),
+                "status": "ok",
+            }
+        return "downloaded"
+
+    # --- Crawl ---
+
+    def crawl(self, revalidate: bool = False) -> Dict:
+        """
+        Run one incremental crawl and save the manifest.
+
+        Returns counts of discovered / downloaded / not_modified / failed / skipped filings
+        and `changed`, the doc ids whose PDF was (re-)downloaded this run.
+        """
+        result = {"discovered": 0, "downloaded": 0, "not_modified": 0, "failed": 0, "skipped": 0, "changed": []}
+
+        with httpx.Client(
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.max_concurrency),
+        ) as client:
+            filings: Dict[str, Dict] = {}
+            for year in self.years:
+                try:
+                    for filing in self._fetch_index(client, year):
+                        filings[filing["doc_id"]] = filing
+                except Exception as e:
+                    print(f"Failed to read filing index for {year}: {e}")
+            result["discovered"] = len(filings)
+
+            # Delta: new filings and earlier failures, plus everything when revalidating
+            to_fetch = []
+            for doc_id, filing in filings.items():
+                entry = self.manifest["filings"].get(doc_id)
+                known = entry is not None and entry.get("status") == "ok" and os.path.exists(self._pdf_path(doc_id))
+                if known and not revalidate:
+                    result["skipped"] += 1
+                else:
+                    to_fetch.append(filing)
+
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                outcomes = list(pool.map(lambda filing: self._download(client, filing), to_fetch))
+
+        for filing, outcome in zip(to_fetch, outcomes):
+            result[outcome] += 1
+            if outcome == "downloaded":
+                result["changed"].append(filing["doc_id"])
+
+        self._write_manifest()
+        return result
+
+    def filings(self) -> List[Dict]:
+        """
+        Every successfully downloaded filing in the manifest.
+        """
+        return [entry for entry in self.manifest["filings"].values() if entry.get("status") == "ok"]
+
+    def load_trades(self) -> List[PoliticianTrade]:
+        """
+        Trades from every downloaded filing. PDFs already in the parse cache are not read
+        from disk; the rest are parsed in batches of LOAD_BATCH_SIZE.
+        """
+        trades: List[PoliticianTrade] = []
+        pending = []
+        for entry in self.filings():
+            records = parse_cache.get(entry["sha256"]) if entry.get("sha256") else None
+            if records is not None:
+                trades.extend(records_to_trades(records, entry))
+            else:
+                pending.append(entry)
+
+        for start in range(0, len(pending), LOAD_BATCH_SIZE):
+            batch = []
+            for entry in pending[start:start + LOAD_BATCH_SIZE]:
+                try:
+                    with open(self._pdf_path(entry["doc_id"]), "rb") as f:
+                        batch.append((f.read(), entry))
+                except OSError as e:
+                    print(f"Missing disclosure PDF {entry['doc_id']}: {e}")
+            for parsed in parse_pdfs_parallel(batch):
+                trades.extend(parsed)
+        return trades
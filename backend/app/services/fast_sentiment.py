@@ -0,0 +1,193 @@
+import json
+import math
+import random
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# First-stage sentiment classifiers: cheap enough to run on every headline in
+# microseconds, so FinBERT only sees the headlines they are unsure about.
+# Both return (stance, confidence) with the same labels as FinBERT.
+
+LABELS = ("positive", "negative", "neutral")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.casefold())
+
+# --- Lexicon ---
+
+POSITIVE_WORDS = frozenset("""
+    beat beats beating surge surges surged soar soars soared jump jumps jumped rally rallies rallied
+    gain gains gained record upgrade upgrades upgraded outperform outperforms outperformed growth
+    profit profits profitable strong stronger strongest raise raises raised higher rise rises rose
+    boost boosts boosted bullish exceed exceeds exceeded top tops topped expand expands expansion
+    rebound rebounds rebounded win wins won approval approved dividend buyback buybacks upbeat
+    optimism optimistic recovery recovers recovered climbs climbed accelerates breakthrough
+""".split())
+
+NEGATIVE_WORDS = frozenset("""
+    miss misses missed plunge plunges plunged fall falls fell drop drops dropped slump slumps slumped
+    tumble tumbles tumbled sink sinks sank downgrade downgrades downgraded underperform underperforms
+    loss losses weak weaker weakest cut cuts lower lowers lowered decline declines declined bearish
+    lawsuit sued probe investigation recall recalls layoffs layoff bankruptcy bankrupt default fraud
+    warning warns warned recession slowdown fears fear concern concerns crash crashes selloff sell-off
+    slides slid shortfall halts halted delisted plummets plummeted downturn pessimism
+""".split())
+
+NEGATORS = frozenset("not no never without fails failed fail didn't doesn't don't isn't wasn't won't can't".split())
+
+class LexiconClassifier:
+    """
+    Finance word-list classifier.
+
+    Counts positive and negative terms (a negator within `negation_window` words
+    before a term flips it). Confidence grows with the net count and shrinks when
+    both polarities appear, so only clearly one-sided headlines are confident;
+    headlines without any sentiment terms come back as low-confidence neutral.
+    """
+
+    name = "lexicon"
+
+    def __init__(self, positive: Iterable[str] = POSITIVE_WORDS, negative: Iterable[str] = NEGATIVE_WORDS, negation_window: int = 3):
+        self.positive = frozenset(positive)
+        self.negative = frozenset(negative)
+        self.negation_window = negation_window
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        tokens = tokenize(text)
+        positive = negative = 0
+        for i, token in enumerate(tokens):
+            polarity = 1 if token in self.positive else -1 if token in self.negative else 0
+            if not polarity:
+                continue
+            if any(t in NEGATORS for t in tokens[max(0, i - self.negation_window):i]):
+                polarity = -polarity
+            if polarity > 0:
+                positive += 1
+            else:
+                negative += 1
+
+        net = positive - negative
+        if net == 0:
+            return ("neutral", 0.4 if positive else 0.5)
+        purity = abs(net) / (positive + negative)
+        confidence = (1.0 - 0.5 * math.exp(-abs(net))) * purity
+        return ("positive" if net > 0 else "negative", confidence)
+
+    def predict_many(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        return [self.predict(text) for text in texts]
+
+# --- Hashed n-gram linear model ---
+
+class HashedNgramClassifier:
+    """
+    Multinomial logistic regression over hashed word n-grams, trained offline on
+    FinBERT labels (see train_fast_sentiment.py). Unlike the lexicon it can also be
+    confident about neutral headlines.
+
+    Args:
+        weights: {feature index: [positive, negative, neutral] weights}.
+        bias: Per-label bias.
+        n_features: Hash space size.
+        ngrams: Largest n-gram length.
+    """
+
+    name = "hashed_ngram"
+
+    def __init__(self, weights: Dict[int, List[float]], bias: List[float], n_features: int = 2 ** 18, ngrams: int = 2):
+        self.weights = weights
+        self.bias = bias
+        self.n_features = n_features
+        self.ngrams = ngrams
+
+    def features(self, text: str) -> List[int]:
+        tokens = tokenize(text)
+        grams = []
+        for n in range(1, self.ngrams + 1):
+            grams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        # crc32 rather than hash(): stable across processes, so trained weights stay valid
+        return sorted({zlib.crc32(gram.encode("utf-8")) % self.n_features for gram in grams})
+
+    def probabilities(self, features: List[int]) -> List[float]:
+        logits = list(self.bias)
+        for index in features:
+            row = self.weights.get(index)
+            if row is not None:
+                for label in range(len(LABELS)):
+                    logits[label] += row[label]
+        top = max(logits)
+        exps = [math.exp(logit - top) for logit in logits]
+        total = sum(exps)
+        return [e / total for e in exps]
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        probabilities = self.probabilities(self.features(text))
+        best = max(range(len(LABELS)), key=probabilities.__getitem__)
+        return (LABELS[best], probabilities[best])
+
+    def predict_many(self, texts: Sequence[str]) -> List[Tuple[str, float]]:
+        return [self.predict(text) for text in texts]
+
+    @classmethod
+    def fit(
+        cls,
+        examples: Sequence[Tuple[str, str]],
+        n_features: int = 2 ** 18,
+        ngrams: int = 2,
+        epochs: int = 5,
+        learning_rate: float = 0.5,
+        l2: float = 1e-5,
+        seed: int = 0,
+    ) -> "HashedNgramClassifier":
+        """
+        Train on (text, FinBERT stance) pairs with plain SGD on the sparse features.
+        """
+        model = cls({}, [0.0] * len(LABELS), n_features=n_features, ngrams=ngrams)
+        data = [(model.features(text), LABELS.index(stance)) for text, stance in examples if stance in LABELS]
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            rate = learning_rate / (1 + epoch)
+            for features, target in data:
+                probabilities = model.probabilities(features)
+                gradient = [p - (1.0 if label == target else 0.0) for label, p in enumerate(probabilities)]
+                for label in range(len(LABELS)):
+                    model.bias[label] -= rate * gradient[label]
+                for index in features:
+                    row = model.weights.setdefault(index, [0.0] * len(LABELS))
+                    for label in range(len(LABELS)):
+                        row[label] -= rate * (gradient[label] + l2 * row[label])
+        return model
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({
+                "n_features": self.n_features,
+                "ngrams": self.ngrams,
+                "bias": self.bias,
+                "weights": {str(index): [round(w, 5) for w in row] for index, row in self.weights.items()},
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> "HashedNgramClassifier":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            {int(index): row for index, row in data["weights"].items()},
+            data["bias"],
+            n_features=data["n_features"],
+            ngrams=data["ngrams"],
+        )
+
+def load_fast_classifier(model_path: Optional[str] = None):
+    """
+    The trained n-gram model at `model_path` when it loads, the lexicon otherwise.
+    """
+    if model_path:
+        try:
+            return HashedNgramClassifier.load(model_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Fast sentiment model unavailable ({model_path}), using the lexicon: {e}")
+    return LexiconClassifier()
@@ -0,0 +1,271 @@
+import math
+import threading
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Hashable, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+# --- Indicator Registry ---
+# New indicators (RSI, Bollinger, VWAP, ...) subclass Indicator and register under a name;
+# series are then configured as {output name: (indicator name, parameter)}.
+
+INDICATORS: Dict[str, Callable[..., "Indicator"]] = {}
+
+def register_indicator(name: str):
+    """
+    Class decorator adding an Indicator to the registry under `name`.
+    """
+    def decorator(cls):
+        INDICATORS[name] = cls
+        return cls
+    return decorator
+
+def create_indicator(name: str, *args) -> "Indicator":
+    try:
+        return INDICATORS[name](*args)
+    except KeyError:
+        raise ValueError(f"Unknown indicator '{name}'. Registered: {sorted(INDICATORS)}")
+
+class Indicator:
+    """
+    Streaming indicator contract.
+
+    - update(bar): consume the next bar (a BAR_DTYPE record) in O(1); returns the value, NaN while warming up.
+    - revert(): undo the most recent update in O(1), used when the latest (partial) bar is revised.
+    - seed(bars): consume a whole array at once and return every value; override to vectorize.
+    - rebase(values, bars, start): values for bars[start:] as if the series began at bars[start],
+      derived from `values` (computed from bars[0]) without touching the state; None if it
+      cannot be derived, in which case the engine recomputes bars[start:].
+    """
+
+    def update(self, bar) -> float:
+        raise NotImplementedError
+
+    def revert(self):
+        raise NotImplementedError
+
+    def seed(self, bars: np.ndarray) -> np.ndarray:
+        return np.array([self.update(bar) for bar in bars], dtype=float)
+
+    def rebase(self, values: np.ndarray, bars: np.ndarray, start: int) -> Optional[np.ndarray]:
+        return None
+
+@register_indicator("sma")
+class SMA(Indicator):
+    """
+    Simple moving average of the close over `window` bars (matches pandas rolling(window).mean()).
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._values: deque = deque()
+        self._sum = 0.0
+        self._updates = 0
+        self._undo: Optional[Tuple[float, Optional[float]]] = None
+
+    def _value(self) -> float:
+        return self._sum / self.window if len(self._values) == self.window else math.nan
+
+    def update(self, bar) -> float:
+        x = float(bar["close"])
+        evicted = self._values.popleft() if len(self._values) == self.window else None
+        self._values.append(x)
+        self._sum += x - (evicted if evicted is not None else 0.0)
+        self._undo = (x, evicted)
+
+        # Re-sum exactly once per window to bound floating-point drift (amortized O(1))
+        self._updates += 1
+        if self._updates % self.window == 0:
+            self._sum = math.fsum(self._values)
+        return self._value()
+
+    def revert(self):
+        x, evicted = self._undo
+        self._values.pop()
+        self._sum -= x
+        if evicted is not None:
+            self._values.appendleft(evicted)
+            self._sum += evicted
+        self._undo = None
+
+    def seed(self, bars: np.ndarray) -> np.ndarray:
+        closes = np.asarray(bars["close"], dtype=float)
+        if len(closes) == 0:
+            return np.empty(0)
+        self._values = deque(closes[-self.window:].tolist())
+        self._sum = math.fsum(self._values)
+        evicted = float(closes[-self.window - 1]) if len(closes) > self.window else None
+        self._undo = (float(closes[-1]), evicted)
+        return pd.Series(closes).rolling(window=self.window).mean().to_numpy()
+
+    def rebase(self, values: np.ndarray, bars: np.ndarray, start: int) -> np.ndarray:
+        # Same means, but none until `window` bars of the new series have been seen
+        rebased = values[start:].copy()
+        rebased[:self.window - 1] = math.nan
+        return rebased
+
+@register_indicator("ema")
+class EMA(Indicator):
+    """
+    Exponential moving average of the close (matches pandas ewm(span=span, adjust=False).mean()).
+    """
+
+    def __init__(self, span: int):
+        self.span = span
+        self.alpha = 2.0 / (span + 1.0)
+        self._current = math.nan
+        self._previous = math.nan
+
+    def update(self, bar) -> float:
+        x = float(bar["close"])
+        self._previous = self._current
+        if math.isnan(self._current):
+            self._current = x
+        else:
+            self._current = (1.0 - self.alpha) * self._current + self.alpha * x
+        return self._current
+
+    def revert(self):
+        self._current = self._previous
+
+    def seed(self, bars: np.ndarray) -> np.ndarray:
+        closes = np.asarray(bars["close"], dtype=float)
+        if len(closes) == 0:
+            return np.empty(0)
+        values = pd.Series(closes).ewm(span=self.span, adjust=False).mean().to_numpy()
+        self._current = float(values[-1])
+        self._previous = float(values[-2]) if len(values) > 1 else math.nan
+        return values
+
+    def rebase(self, values: np.ndarray, bars: np.ndarray, start: int) -> np.ndarray:
+        # The recurrence is linear, so restarting at `start` (value = close) shifts every later
+        # value by the difference at `start`, decayed by (1 - alpha) per bar
+        rebased = values[start:]
+        offset = float(bars["close"][start]) - rebased[0]
+        return rebased + offset * (1.0 - self.alpha) ** np.arange(len(rebased))
+
+# --- Engine ---
+
+class _SeriesState:
+    """
+    Indicator state and output buffers for one symbol and window anchor.
+    """
+
+    def __init__(self, specs: Dict[str, Tuple[str, int]]):
+        self.indicators = {name: create_indicator(kind, param) for name, (kind, param) in specs.items()}
+        self.outputs: Dict[str, np.ndarray] = {}
+        self.count = 0
+        self.last_day = None
+        self.last_bar = b""
+        self.previous_bar = b""
+
+    def _remember(self, bars: np.ndarray):
+        self.last_day = int(bars["day"][self.count - 1])
+        self.last_bar = np.asarray(bars[self.count - 1:self.count]).tobytes()
+        self.previous_bar = np.asarray(bars[max(self.count - 2, 0):self.count - 1]).tobytes()
+
+    def seed(self, bars: np.ndarray):
+        self.outputs = {name: indicator.seed(bars) for name, indicator in self.indicators.items()}
+        self.count = len(bars)
+        self._remember(bars)
+
+    def extends(self, bars: np.ndarray) -> bool:
+        """
+        True if `bars` continues the consumed series (only the last consumed bar may differ).
+        """
+        if len(bars) < self.count or self.count < 2:
+            return False
+        return (
+            np.asarray(bars[self.count - 2:self.count - 1]).tobytes() == self.previous_bar
+            and int(bars["day"][self.count - 1]) == self.last_day
+        )
+
+    def extend(self, bars: np.ndarray):
+        # The last consumed bar may have been a partial session that has since been revised
+        if np.asarray(bars[self.count - 1:self.count]).tobytes() != self.last_bar:
+            for indicator in self.indicators.values():
+                indicator.revert()
+            self.count -= 1
+
+        new_bars = bars[self.count:]
+        if len(new_bars) == 0:
+            return
+
+        needed = len(bars)
+        for name, indicator in self.indicators.items():
+            output = self.outputs[name]
+            if len(output) < needed:
+                # Grow geometrically so appends stay amortized O(1)
+                grown = np.empty(max(needed, 2 * len(output)))
+                grown[:self.count] = output[:self.count]
+                self.outputs[name] = output = grown
+            for i, bar in enumerate(new_bars, start=self.count):
+                output[i] = indicator.update(bar)
+
+        self.count = needed
+        self._remember(bars)
+
+class IndicatorEngine:
+    """
+    Keeps indicator series per (symbol, first bar) and updates them incrementally.
+
+    The first request for a series seeds every indicator with a vectorized pass; later
+    requests only feed the bars that arrived since (O(1) each), and a revised last bar
+    is handled by reverting one step. Results match the pandas computation over the
+    same bars.
+
+    For a trailing window, pass the whole stored history, whose first bar stays put,
+    with `start` at the window's first bar: state stays anchored at the history's first
+    bar (a window's own first bar moves every day, which would reseed), and the values
+    returned are rebased to start at the window, exactly as if computed over it alone.
+
+    Args:
+        specs: {output name: (registered indicator name, parameter)}.
+        max_series: How many (symbol, anchor) states to keep (LRU).
+    """
+
+    def __init__(self, specs: Dict[str, Tuple[str, int]], max_series: int = 512):
+        self.specs = specs
+        self.max_series = max_series
+        self._series: "OrderedDict[Hashable, _SeriesState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Counters
+        self.seeded = 0
+        self.extended = 0
+
+    def compute(self, symbol: str, bars: np.ndarray, start: int = 0) -> Dict[str, np.ndarray]:
+        """
+        Indicator values for bars[start:] (BAR_DTYPE records, oldest first), anchored at
+        bars[start] exactly as if computed over bars[start:] from scratch.
+        """
+        if len(bars) == 0 or start >= len(bars):
+            return {name: np.empty(0) for name in self.specs}
+
+        key = (symbol, int(bars["day"][0]))
+        with self._lock:
+            state = self._series.get(key)
+            if state is not None and state.extends(bars):
+                state.extend(bars)
+                self.extended += 1
+            else:
+                state = _SeriesState(self.specs)
+                state.seed(bars)
+                self.seeded += 1
+
+            self._series[key] = state
+            self._series.move_to_end(key)
+            while len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+
+            # Copy out so later in-place updates never race with the caller
+            if start == 0:
+                return {name: output[:len(bars)].copy() for name, output in state.outputs.items()}
+            results = {}
+            for name, indicator in state.indicators.items():
+                rebased = indicator.rebase(state.outputs[name][:len(bars)], bars, start)
+                if rebased is None:
+                    kind, param = self.specs[name]
+                    rebased = create_indicator(kind, param).seed(bars[start:])
+                results[name] = rebased
+            return results
@@ -1,36 +1,38 @@
-import yfinance as yf
-import pandas as pd
-import time
-import random
-from typing import List, Dict, Optional
+import threading
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple
+from app.core.breaker import CircuitOpenError, yahoo_batch_breaker
+from app.core.config import settings
+from app.core.ratelimit import RetryableError, call_with_retries, map_concurrently
+from app.services.datasource import TickerDataSource
+from app.services.universe import sp500_universe
+
+# yfinance, pandas and numpy (with the bar store and indicator engine built on them) are
+# imported by the price history functions on first use, keeping app startup light.
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from app.services.bar_store import BarStore
+    from app.services.indicators import IndicatorEngine
 
 # --- Caching handled at Endpoint level for now, but yfinance has internal cache too ---
 
-def get_sp500_tickers() -> List[str]:
+def get_sp500_tickers(wait: bool = True) -> List[str]:
     """
-    Scrape the current list of S&P 500 tickers from Wikipedia.
-    Returns a list of symbols with '.' replaced by '-' (e.g., BRK.B -> BRK-B).
-    Falls back to a small default list on error.
+    Current list of S&P 500 tickers (e.g. BRK-B), served from the cached, snapshot-backed universe.
+    Only a cold start without a snapshot scrapes Wikipedia (`wait=True`) or serves the fallback list.
     """
-    url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
-    try:
-        # Quick timeout to avoid hanging if wiki is slow
-        df = pd.read_html(url, header=0)[0]
-        tickers = df['Symbol'].astype(str).str.replace('.', '-', regex=False).tolist()
-        return tickers
-    except Exception:
-        # fallback to a few major tickers if scraping fails
-        return ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'BRK-B', 'JNJ', 'V', 'WMT', 'JPM', 'META', 'NVDA', 'UNH', 'HD', 'PG', 'DIS', 'MA', 'PYPL', 'BAC']
+    return sp500_universe.get(wait=wait)
 
-def fetch_news_for_ticker(symbol: str) -> List[Dict]:
+def fetch_news_for_ticker(symbol: str, source: Optional[TickerDataSource] = None) -> List[Dict]:
     """
     Fetch news for a single ticker.
+    Pass `source` to share upstream data with the other services building the same brief.
     """
     print(f"Scraping news for {symbol}...")
     headlines = []
     try:
-        ticker = yf.Ticker(symbol)
-        news = ticker.news
+        source = source or TickerDataSource(symbol)
+        news = source.news
         
         for item in news:
             content = item.get('content', {})
@@ -42,7 +44,7 @@ def fetch_news_for_ticker(symbol: str) -> List[Dict]:
             link = click_through_url.get('url') if click_through_url else None
             
             provider = content.get('provider', {})
-            source = provider.get('displayName')
+            publisher = provider.get('displayName')
             
             pub_date = content.get('pubDate')
 
@@ -50,7 +52,7 @@ def fetch_news_for_ticker(symbol: str) -> List[Dict]:
                 'ticker': symbol, 
                 'headline': title,
                 'link': link,
-                'source': source,
+                'source': publisher,
                 'published_at': pub_date
             })
     except Exception as e:
@@ -58,9 +60,44 @@ def fetch_news_for_ticker(symbol: str) -> List[Dict]:
     
     return headlines
 
+# yfinance sends its requests to Yahoo's query API host
+YAHOO_API_HOST = "query2.finance.yahoo.com"
+
+def _is_rate_limited(error: Exception) -> bool:
+    return type(error).__name__ == "YFRateLimitError" or "Too Many Requests" in str(error)
+
+def _scrape_ticker_news(symbol: str) -> List[Dict]:
+    """
+    Fetch one ticker's news under the shared Yahoo rate limit, retrying when throttled.
+    """
+    def attempt() -> List[Dict]:
+        # Fresh source per attempt, since failures are memoized
+        source = TickerDataSource(symbol, breaker=yahoo_batch_breaker)
+        try:
+            source.news
+        except Exception as e:
+            if isinstance(e, CircuitOpenError):
+                # Pause the sweep until the circuit lets a probe through, rather than dropping the ticker
+                raise RetryableError(
+                    f"Yahoo circuit open fetching news for {symbol}",
+                    retry_after=yahoo_batch_breaker.retry_in() or None,
+                    throttled=True,
+                ) from e
+            if _is_rate_limited(e):
+                raise RetryableError(f"Rate limited fetching news for {symbol}", throttled=True) from e
+            # Other errors are reported by fetch_news_for_ticker
+        return fetch_news_for_ticker(symbol, source)
+
+    try:
+        return call_with_retries(attempt, YAHOO_API_HOST)
+    except RetryableError as e:
+        print(f"Giving up on news for {symbol}: {e}")
+        return []
+
 def yfinance_scrape(tickers: Optional[List[str]] = None, max_tickers: Optional[int] = 500) -> List[Dict]:
     """
     Legacy bulk scraper. Now wraps fetch_news_for_ticker.
+    Tickers are fetched concurrently, paced by the shared per-host rate limiter.
     """
     if tickers is None:
         tickers = get_sp500_tickers()
@@ -68,29 +105,24 @@ def yfinance_scrape(tickers: Optional[List[str]] = None, max_tickers: Optional[i
     if max_tickers is not None:
         tickers = tickers[:max_tickers]
 
-    all_headlines = []
-    for ticker_symbol in tickers:
-        all_headlines.extend(fetch_news_for_ticker(ticker_symbol))
-        # polite rate limiting
-        time.sleep(random.uniform(0.1, 0.3))
-
-    return all_headlines
+    results = map_concurrently(_scrape_ticker_news, tickers, settings.SCRAPE_CONCURRENCY)
+    return [headline for headlines in results for headline in headlines]
 
 def yfinance_general_headlines(max_headlines: int = 200, sources: Optional[List[str]] = None) -> List[Dict]:
     return yfinance_scrape(tickers=['SPY', 'QQQ', 'DIA'], max_tickers=3)
 
-def get_ticker_info(symbol: str) -> Dict:
+def get_ticker_info(symbol: str, source: Optional[TickerDataSource] = None) -> Dict:
     """
     Fetch detailed ticker info including volume, exchange, and institutional holders.
     """
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
+        source = source or TickerDataSource(symbol)
+        info = source.info
         
         # Get institutional holders
-        # Note: calling institutional_holders property triggers a network request
+        # Note: holders are fetched once per source and shared with the insider service
         try:
-            holders = ticker.institutional_holders
+            holders = source.institutional_holders
             if holders is not None and not holders.empty:
                 top_holders = holders.head(3)['Holder'].tolist()
             else:
@@ -111,100 +143,269 @@ def get_ticker_info(symbol: str) -> Dict:
         print(f"Error fetching info for {symbol}: {e}")
         return {}
 
-def get_options_data(symbol: str) -> Optional[float]:
+def get_options_data(symbol: str, source: Optional[TickerDataSource] = None) -> Optional[float]:
     """
     Calculate Put/Call Ratio from the nearest expiration option chain.
     """
     try:
-        ticker = yf.Ticker(symbol)
-        expirations = ticker.options
+        source = source or TickerDataSource(symbol)
+        expirations = source.options
         if not expirations:
             return None
             
-        chain = ticker.option_chain(expirations[0])
+        chain = source.option_chain(expirations[0])
         calls_vol = chain.calls['volume'].sum()
         puts_vol = chain.puts['volume'].sum()
         
         if calls_vol == 0:
             return None
             
-        return round(puts_vol / calls_vol, 2)
+        # Plain float: the volume sums are numpy scalars, which orjson cannot encode
+        return round(float(puts_vol / calls_vol), 2)
     except Exception as e:
         print(f"Error fetching options for {symbol}: {e}")
         return None
 
-def get_price_history(symbol: str, period: str = "1mo") -> List[Dict]:
-    from datetime import datetime, timedelta
+HISTORY_COLUMNS = ["time", "price", "ma50", "ma100", "ema50", "ema100"]
+
+def _round_column(values) -> List[Optional[float]]:
+    """
+    Round a numeric column to cents and map NaN to None in one vectorized pass.
+    """
+    import numpy as np
+
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, 2).astype(object)
+    rounded[np.isnan(values)] = None
+    return rounded.tolist()
+
+# Indicator series served alongside the price, keyed by response column
+PRICE_INDICATORS = {
+    "ma50": ("sma", 50),
+    "ma100": ("sma", 100),
+    "ema50": ("ema", 50),
+    "ema100": ("ema", 100),
+}
+_indicator_engine: Optional["IndicatorEngine"] = None
+_indicator_engine_lock = threading.Lock()
+
+def _get_indicator_engine() -> "IndicatorEngine":
+    global _indicator_engine
+    with _indicator_engine_lock:
+        if _indicator_engine is None:
+            from app.services.indicators import IndicatorEngine
+            _indicator_engine = IndicatorEngine(PRICE_INDICATORS)
+        return _indicator_engine
+
+def _empty_columns() -> Dict[str, List]:
+    return {column: [] for column in HISTORY_COLUMNS}
+
+# --- Daily Bars ---
+# Daily history is served from a local bar store and synced incrementally from yfinance.
+
+# Timezone assumed for daily bars whose source does not report one (US listings)
+DEFAULT_EXCHANGE_TZ = "America/New_York"
+
+_bar_store: Optional["BarStore"] = None
+# Set once opening the store failed, so later calls go straight to yfinance
+_bar_store_unavailable = False
+_bar_store_lock = threading.Lock()
+
+def _get_bar_store() -> Optional["BarStore"]:
+    """
+    Lazily open the local bar store; None if disabled or not writable (e.g. read-only serverless).
+    """
+    global _bar_store, _bar_store_unavailable
+    if not settings.BAR_STORE_PATH or _bar_store_unavailable:
+        return None
+    with _bar_store_lock:
+        if _bar_store is None and not _bar_store_unavailable:
+            from app.services.bar_store import BarStore
+            try:
+                _bar_store = BarStore(settings.BAR_STORE_PATH, refresh_interval=settings.BAR_STORE_REFRESH_SECONDS)
+            except OSError as e:
+                print(f"Bar store unavailable ({settings.BAR_STORE_PATH}): {e}")
+                _bar_store_unavailable = True
+                return None
+        return _bar_store
+
+def _day_number(ts: "pd.Timestamp") -> int:
+    """
+    Exchange-local calendar date of `ts` as days since 1970-01-01.
+    """
+    import numpy as np
+
+    return int(np.datetime64(ts.date(), "D").astype(np.int64))
+
+def _history_to_bars(history: "pd.DataFrame") -> Tuple["np.ndarray", Optional[str]]:
+    """
+    Convert a yfinance daily history frame into BAR_DTYPE records and its timezone name.
+    """
+    import numpy as np
+    from app.services.bar_store import BAR_DTYPE
+
+    history = history[history['Close'].notna()]
+    index = history.index
+    if getattr(index, "tz", None) is not None:
+        tz = str(index.tz)
+        local = index.tz_localize(None)
+    else:
+        # Batched yf.download drops the timezone; its dates are already exchange-local
+        tz = DEFAULT_EXCHANGE_TZ
+        local = index
+
+    bars = np.empty(len(history), dtype=BAR_DTYPE)
+    bars["day"] = local.normalize().values.astype("datetime64[D]").astype(np.int64)
+    for field, column in [("open", "Open"), ("high", "High"), ("low", "Low"), ("close", "Close"), ("volume", "Volume")]:
+        bars[field] = history[column].to_numpy(dtype=float) if column in history else np.nan
+    return bars, tz
+
+def _fetch_daily_bars_many(symbols: List[str], period: Optional[str] = None, start_day: Optional[int] = None) -> Dict[str, Tuple["np.ndarray", Optional[str]]]:
+    """
+    Download daily bars from yfinance, either for a whole `period` or from `start_day` onwards.
+    Several symbols share one batched `yf.download` request.
+    """
+    import numpy as np
+    import yfinance as yf
+
+    kwargs = {"interval": "1d"}
+    if start_day is not None:
+        kwargs["start"] = str(np.datetime64(start_day, "D"))
+    else:
+        kwargs["period"] = period
+
+    if len(symbols) == 1:
+        return {symbols[0]: _history_to_bars(yf.Ticker(symbols[0]).history(**kwargs))}
+
+    data = yf.download(symbols, group_by="ticker", auto_adjust=True, threads=True, progress=False, **kwargs)
+    downloaded = set(data.columns.get_level_values(0))
+    return {symbol: _history_to_bars(data[symbol]) for symbol in symbols if symbol in downloaded}
+
+def _daily_bars_many(symbols: List[str], fetch_period: str) -> Dict[str, Tuple["np.ndarray", Optional[str]]]:
+    store = _get_bar_store()
+    if store is None:
+        return _fetch_daily_bars_many(symbols, period=fetch_period)
+    return store.get_bars_many(symbols, fetch_period, _fetch_daily_bars_many)
+
+def _fetch_intraday_many(symbols: List[str], period: str, interval: str) -> Dict[str, "pd.DataFrame"]:
+    import yfinance as yf
+
+    if len(symbols) == 1:
+        return {symbols[0]: yf.Ticker(symbols[0]).history(period=period, interval=interval)}
+
+    data = yf.download(symbols, period=period, interval=interval, group_by="ticker", auto_adjust=True, threads=True, progress=False)
+    downloaded = set(data.columns.get_level_values(0))
+    return {symbol: data[symbol] for symbol in symbols if symbol in downloaded}
+
+def _intraday_columns(history: "pd.DataFrame") -> Dict[str, List]:
+    history = history[history['Close'].notna()]
+    
+    size = len(history)
+    return {
+        "time": history.index.strftime("%Y-%m-%d %H:%M").tolist(),
+        "price": _round_column(history['Close'].to_numpy()),
+        "ma50": [None] * size,
+        "ma100": [None] * size,
+        "ema50": [None] * size,
+        "ema100": [None] * size
+    }
+
+def _daily_columns(symbol: str, period: str, fetch_period: str, bars: "np.ndarray", tz: Optional[str]) -> Dict[str, List]:
+    from datetime import timedelta
+    import numpy as np
+    import pandas as pd
+    
+    now = pd.Timestamp.now(tz=tz)
+    
+    # First bar of the window served for this period
+    window = 0
+    if fetch_period != "max":
+        window_start = now - pd.DateOffset(years=int(fetch_period[:-1]))
+        window = int(np.searchsorted(bars["day"], _day_number(window_start)))
+    
+    # Calculate MAs over the window (seeded at its first bar). The engine keeps its state on
+    # the store's first bar, which stays put while the window's moves every day, so only bars
+    # new since the last call are processed.
+    indicators = _get_indicator_engine().compute(symbol, bars, start=window)
+    # Zero-copy slice of the stored bars to the window
+    bars = bars[window:]
+    
+    # Filter: keep bars whose session starts at or after the cutoff
+    cutoff_date = None
+    if period == "1mo":
+        cutoff_date = now - timedelta(days=30)
+    elif period == "3mo":
+        cutoff_date = now - timedelta(days=90)
+    elif period == "6mo":
+        cutoff_date = now - timedelta(days=180)
+    elif period == "1y":
+        cutoff_date = now - timedelta(days=365)
+    elif period == "ytd":
+        cutoff_date = pd.Timestamp(year=now.year, month=1, day=1, tz=tz)
+
+    start = 0
+    if cutoff_date is not None and period not in ["2y", "5y", "10y", "max"]:
+        cutoff_day = _day_number(cutoff_date)
+        if cutoff_date != cutoff_date.normalize():
+            cutoff_day += 1
+        start = int(np.searchsorted(bars["day"], cutoff_day))
+    
+    return {
+        "time": bars["day"][start:].astype("datetime64[D]").astype(str).tolist(),
+        "price": _round_column(bars["close"][start:]),
+        "ma50": _round_column(indicators["ma50"][start:]),
+        "ma100": _round_column(indicators["ma100"][start:]),
+        "ema50": _round_column(indicators["ema50"][start:]),
+        "ema100": _round_column(indicators["ema100"][start:])
+    }
+
+def get_price_history_columns_many(symbols: List[str], period: str = "1mo") -> Dict[str, Dict[str, List]]:
+    """
+    Fetch historical prices for several symbols at once, keyed by upper-cased symbol.
+    Upstream data for all symbols is fetched in one batched download (see `get_price_history_columns`).
+    """
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
     
     try:
-        ticker = yf.Ticker(symbol)
-        
         if period in ["1d", "5d"]:
             interval = "15m" if period == "5d" else "5m"
-            history = ticker.history(period=period, interval=interval)
-            
-            prices = []
-            for index, row in history.iterrows():
-                if interval in ["1m", "5m", "15m", "30m", "60m", "90m", "1h"]:
-                    time_str = index.strftime("%Y-%m-%d %H:%M")
-                else:
-                    time_str = index.strftime("%Y-%m-%d")
-                    
-                prices.append({
-                    "time": time_str,
-                    "price": round(row['Close'], 2),
-                    "ma50": None,
-                    "ma100": None,
-                    "ema50": None,
-                    "ema100": None
-                })
-            return prices
-            
+            histories = _fetch_intraday_many(symbols, period, interval)
+            build = lambda symbol: _intraday_columns(histories[symbol])
         else:
             fetch_period = "2y"
             if period in ["5y", "10y", "max"]:
                 fetch_period = period
             
-            history = ticker.history(period=fetch_period, interval="1d")
-            
-            # Calculate MAs
-            history['MA50'] = history['Close'].rolling(window=50).mean()
-            history['MA100'] = history['Close'].rolling(window=100).mean()
-            history['EMA50'] = history['Close'].ewm(span=50, adjust=False).mean()
-            history['EMA100'] = history['Close'].ewm(span=100, adjust=False).mean()
-            
-            # Filter
-            cutoff_date = None
-            if not history.empty:
-                now = datetime.now().astimezone(history.index.tz)
-                
-                if period == "1mo":
-                    cutoff_date = now - timedelta(days=30)
-                elif period == "3mo":
-                    cutoff_date = now - timedelta(days=90)
-                elif period == "6mo":
-                    cutoff_date = now - timedelta(days=180)
-                elif period == "1y":
-                    cutoff_date = now - timedelta(days=365)
-                elif period == "ytd":
-                    cutoff_date = datetime(now.year, 1, 1).astimezone(history.index.tz)
-
-                if cutoff_date and period not in ["2y", "5y", "10y", "max"]:
-                    history = history[history.index >= cutoff_date]
-            
-            prices = []
-            for index, row in history.iterrows():
-                prices.append({
-                    "time": index.strftime("%Y-%m-%d"),
-                    "price": round(row['Close'], 2),
-                    "ma50": round(row['MA50'], 2) if pd.notna(row['MA50']) else None,
-                    "ma100": round(row['MA100'], 2) if pd.notna(row['MA100']) else None,
-                    "ema50": round(row['EMA50'], 2) if pd.notna(row['EMA50']) else None,
-                    "ema100": round(row['EMA100'], 2) if pd.notna(row['EMA100']) else None
-                })
-                
-            return prices
-
+            daily = _daily_bars_many(symbols, fetch_period)
+            build = lambda symbol: _daily_columns(symbol, period, fetch_period, *daily[symbol])
     except Exception as e:
-        print(f"Error fetching history for {symbol}: {e}")
-        return []
+        print(f"Error fetching history for {', '.join(symbols)}: {e}")
+        return {symbol: _empty_columns() for symbol in symbols}
+
+    results = {}
+    for symbol in symbols:
+        try:
+            results[symbol] = build(symbol)
+        except Exception as e:
+            print(f"Error fetching history for {symbol}: {e}")
+            results[symbol] = _empty_columns()
+    return results
+
+def get_price_history_columns(symbol: str, period: str = "1mo") -> Dict[str, List]:
+    """
+    Fetch historical prices as parallel arrays: time, price, ma50, ma100, ema50, ema100.
+    Moving averages are None where there is not enough history (and for intraday periods).
+    """
+    return get_price_history_columns_many([symbol], period)[symbol.upper()]
+
+def columns_to_rows(columns: Dict[str, List]) -> List[Dict]:
+    """
+    Convert parallel history arrays into one dict per point.
+    """
+    return [dict(zip(HISTORY_COLUMNS, row)) for row in zip(*(columns[c] for c in HISTORY_COLUMNS))]
+
+def get_price_history(symbol: str, period: str = "1mo") -> List[Dict]:
+    """
+    Fetch historical prices as one dict per point (see `get_price_history_columns`).
+    """
+    return columns_to_rows(get_price_history_columns(symbol, period))
@@ -1,14 +1,14 @@
-import yfinance as yf
-from typing import List
+from typing import List, Optional
 from app.models.schemas import InsiderTransaction
+from app.services.datasource import TickerDataSource
 
-def get_corporate_insiders(symbol: str) -> List[InsiderTransaction]:
+def get_corporate_insiders(symbol: str, source: Optional[TickerDataSource] = None) -> List[InsiderTransaction]:
     """
     Fetch recent corporate insider transactions using yfinance.
     """
     try:
-        ticker = yf.Ticker(symbol)
-        insider = ticker.insider_transactions
+        source = source or TickerDataSource(symbol)
+        insider = source.insider_transactions
         
         transactions = []
         if insider is not None and not insider.empty:
@@ -1,10 +1,20 @@
-import requests
+import hashlib
 import io
+import json
+import os
 import re
-from typing import List, Dict
-from pypdf import PdfReader
+import threading
+import time
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+from app.core.breaker import disclosure_breaker
+from app.core.config import settings
 from app.models.schemas import PoliticianTrade
 
+# pypdf and requests are imported where PDFs are fetched and parsed, off the startup path
+if TYPE_CHECKING:
+    from pypdf import PdfReader
+
 # Hardcoded list of recent PDF URLs for "Whales" to ensure demo works reliably
 # In a full production app, we would scrape the search results page periodically.
 # These are real 2024 filings for Pelosi, Crenshaw, etc.
@@ -23,87 +33,352 @@ DEMO_PDF_URLS = [
     }
 ]
 
-# Cache parsed trades to avoid re-downloading PDFs on every request
-_TRADE_CACHE: Dict[str, List[PoliticianTrade]] = {}
+# --- PDF Parsing ---
+# Parsing runs in worker processes (pypdf extraction is CPU-bound and holds the GIL)
+# and each PDF's raw records are cached on disk by content hash, so no PDF is parsed twice.
+
+# Bump when the parsing heuristics change so cached records are re-parsed
+PARSER_VERSION = 1
+
+# Ticker in parentheses, e.g. (AAPL)
+_TICKER_RE = re.compile(r'\(([A-Z]+)\)')
+# Amount range, e.g. $1,001 - $15,000
+_AMOUNT_RE = re.compile(r'\$[\d,]+ - \$[\d,]+')
+
+def pdf_content_hash(pdf_content: bytes) -> str:
+    return hashlib.sha256(pdf_content).hexdigest()
+
+def _iter_lines(reader: "PdfReader") -> Iterator[str]:
+    """
+    Yield the text of every page line by line, without joining pages into one string.
+    """
+    for page in reader.pages:
+        yield from (page.extract_text() or "").splitlines()
+
+def _parse_line(line: str) -> Optional[Dict[str, str]]:
+    """
+    Extract a raw trade record (ticker, type, amount) from one line, if it looks like a trade.
+    """
+    # Look for Ticker pattern: (SYMBOL)
+    ticker_match = _TICKER_RE.search(line)
+    if not ticker_match:
+        return None
+
+    # Determine type
+    type_ = "Purchase" if " P " in line or "Purchase" in line else "Sale"
+    if " S " in line or "Sale" in line:
+        type_ = "Sale"
+
+    # Extract Amount (rough heuristic looking for $ ranges)
+    amount_match = _AMOUNT_RE.search(line)
+    amount = amount_match.group(0) if amount_match else "Unknown"
+
+    return {"ticker": ticker_match.group(1), "type": type_, "amount": amount}
+
+def parse_pdf_records(pdf_content: bytes) -> List[Dict[str, str]]:
+    """
+    Parse the text content of a House Disclosure PDF into raw trade records.
+    This is a heuristic parser based on the standard form layout: lines containing a
+    ticker symbol in parentheses, e.g. (AAPL), with "Purchase"/"Sale" and a $ range.
+    Raises if the PDF cannot be read. Runs in parser worker processes.
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(pdf_content))
+    records = []
+    for line in _iter_lines(reader):
+        record = _parse_line(line)
+        if record is not None:
+            records.append(record)
+    return records
+
+class ParseCache:
+    """
+    On-disk cache of parsed records, one JSON file per PDF content hash.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+        if root:
+            try:
+                os.makedirs(root, exist_ok=True)
+            except OSError as e:
+                print(f"PDF parse cache disabled ({root}): {e}")
+                self.root = ""
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, f"v{PARSER_VERSION}-{digest}.json")
+
+    def get(self, digest: str) -> Optional[List[Dict[str, str]]]:
+        if self.root:
+            try:
+                with open(self._path(digest)) as f:
+                    records = json.load(f)
+                self.hits += 1
+                return records
+            except (OSError, ValueError):
+                pass
+        self.misses += 1
+        return None
+
+    def set(self, digest: str, records: List[Dict[str, str]]):
+        if not self.root:
+            return
+        path = self._path(digest)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(records, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Could not cache parsed PDF {digest}: {e}")
+
+parse_cache = ParseCache(settings.PDF_PARSE_CACHE_PATH)
+
+def records_to_trades(records: List[Dict[str, str]], politician_info: Dict) -> List[PoliticianTrade]:
+    return [
+        PoliticianTrade(
+            politician=politician_info['politician'],
+            party=politician_info['party'],
+            date=politician_info['date'], # Using filing date as proxy if transaction date parse fails
+            type=record['type'],
+            amount=record['amount'],
+            ticker=record['ticker']
+        )
+        for record in records
+    ]
 
 def parse_pdf_trades(pdf_content: bytes, politician_info: Dict) -> List[PoliticianTrade]:
     """
-    Parse the text content of a House Disclosure PDF to extract trades.
-    This is a heuristic parser based on the standard form layout.
-    """
-    trades = []
-    try:
-        reader = PdfReader(io.BytesIO(pdf_content))
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text()
-            
-        # Debug: Print text to see what we're working with
-        # print(text)
-        
-        # Regex to find lines that look like trades.
-        # Structure often involves: [Ticker] ... [Date] ... [Amount]
-        # This is tricky because the text extraction might not preserve table layout perfectly.
-        # We'll look for known tickers or patterns.
-        
-        # Simple heuristic: Look for lines containing "$" and "Purchase" or "Sale"
-        # and try to extract a ticker symbol in parentheses e.g. (AAPL)
-        
-        lines = text.split('\n')
-        for line in lines:
-            # Look for Ticker pattern: (SYMBOL)
-            ticker_match = re.search(r'\(([A-Z]+)\)', line)
-            if ticker_match:
-                ticker = ticker_match.group(1)
-                
-                # Determine type
-                type_ = "Purchase" if " P " in line or "Purchase" in line else "Sale"
-                if " S " in line or "Sale" in line:
-                    type_ = "Sale"
-                    
-                # Extract Amount (rough heuristic looking for $ ranges)
-                amount_match = re.search(r'\$[\d,]+ - \$[\d,]+', line)
-                amount = amount_match.group(0) if amount_match else "Unknown"
-                
-                trade = PoliticianTrade(
-                    politician=politician_info['politician'],
-                    party=politician_info['party'],
-                    date=politician_info['date'], # Using filing date as proxy if transaction date parse fails
-                    type=type_,
-                    amount=amount,
-                    ticker=ticker
-                )
-                trades.append(trade)
-                
-    except Exception as e:
-        print(f"Error parsing PDF for {politician_info['politician']}: {e}")
-        
-    return trades
+    Parse the text content of a House Disclosure PDF to extract trades (in this process).
+    """
+    digest = pdf_content_hash(pdf_content)
+    records = parse_cache.get(digest)
+    if records is None:
+        try:
+            records = parse_pdf_records(pdf_content)
+        except Exception as e:
+            print(f"Error parsing PDF for {politician_info['politician']}: {e}")
+            return []
+        parse_cache.set(digest, records)
+    return records_to_trades(records, politician_info)
 
-def get_politician_trades(symbol: str) -> List[PoliticianTrade]:
+def parse_pdfs_parallel(
+    filings: List[Tuple[bytes, Dict]],
+    max_workers: Optional[int] = None,
+    min_pool_batch: Optional[int] = None,
+) -> List[List[PoliticianTrade]]:
     """
-    Get politician trades for a specific symbol.
+    Parse several (pdf_content, politician_info) filings, returning their trades in order.
+
+    Cached PDFs are answered from the parse cache; the rest are de-duplicated by content
+    hash and parsed in a process pool once at least `min_pool_batch` need parsing
+    (default PDF_PARSE_POOL_MIN), otherwise in this process: starting spawned workers
+    costs more than parsing a small batch serially.
     """
-    global _TRADE_CACHE
-    
-    # If cache is empty, populate it
-    if not _TRADE_CACHE:
-        print("Hydrating politician trade cache...")
-        all_trades = []
-        for item in DEMO_PDF_URLS:
+    digests = [pdf_content_hash(content) for content, _ in filings]
+    records: Dict[str, List[Dict[str, str]]] = {}
+    pending: Dict[str, bytes] = {}
+    for digest, (content, _) in zip(digests, filings):
+        if digest in records or digest in pending:
+            continue
+        cached = parse_cache.get(digest)
+        if cached is not None:
+            records[digest] = cached
+        else:
+            pending[digest] = content
+
+    workers = min(max_workers or settings.PDF_PARSE_WORKERS or os.cpu_count() or 1, len(pending))
+    if min_pool_batch is None:
+        min_pool_batch = settings.PDF_PARSE_POOL_MIN
+    if workers > 1 and len(pending) >= min_pool_batch:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Spawned workers: forking a multi-threaded server process is not safe
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {digest: pool.submit(parse_pdf_records, content) for digest, content in pending.items()}
+            outcomes = {}
+            for digest, future in futures.items():
+                try:
+                    outcomes[digest] = future.result()
+                except Exception as e:
+                    outcomes[digest] = e
+    else:
+        outcomes = {}
+        for digest, content in pending.items():
             try:
-                print(f"Fetching PDF for {item['politician']}...")
-                response = requests.get(item['url'], timeout=10)
-                if response.status_code == 200:
-                    trades = parse_pdf_trades(response.content, item)
-                    all_trades.extend(trades)
+                outcomes[digest] = parse_pdf_records(content)
             except Exception as e:
-                print(f"Failed to fetch/parse PDF for {item['politician']}: {e}")
-        
+                outcomes[digest] = e
+
+    for digest, outcome in outcomes.items():
+        if isinstance(outcome, Exception):
+            print(f"Error parsing PDF {digest[:12]}: {outcome}")
+            # Not cached, so the next hydration retries
+            records[digest] = []
+        else:
+            parse_cache.set(digest, outcome)
+            records[digest] = outcome
+
+    return [records_to_trades(records[digest], info) for digest, (_, info) in zip(digests, filings)]
+
+# --- Trade Index ---
+
+def _load_demo_trades() -> List[PoliticianTrade]:
+    """
+    Download the demo filings and parse them. Raises if none could be downloaded.
+    """
+    import requests
+
+    filings = []
+    for item in DEMO_PDF_URLS:
+        try:
+            print(f"Fetching PDF for {item['politician']}...")
+            response = disclosure_breaker.call(requests.get, item['url'], timeout=disclosure_breaker.timeout())
+            if response.status_code == 200:
+                filings.append((response.content, item))
+        except Exception as e:
+            print(f"Failed to fetch PDF for {item['politician']}: {e}")
+
+    if not filings:
+        raise RuntimeError("No disclosure PDFs could be downloaded")
+
+    # Parse every downloaded filing together (cached or in worker processes)
+    return [trade for trades in parse_pdfs_parallel(filings) for trade in trades]
+
+class TradeIndex:
+    """
+    Politician trades grouped by ticker, hydrated in a background thread.
+
+    Readers never block: until hydration finishes they see an empty index. The new
+    index is built off to the side and published with a single reference swap, and a
+    published index is read-only, so readers need no lock. A failed hydration can be
+    started again after `retry_interval` seconds. With a `ttl`, an index that old is
+    rebuilt in the background on the next lookup while readers keep the current one.
+
+    Args:
+        load: Downloads and parses the filings, returning every trade (raises on failure).
+        retry_interval: Seconds to wait after a failed hydration before allowing another.
+        ttl: Seconds before a hydrated index is rebuilt (None hydrates once).
+    """
+
+    def __init__(
+        self,
+        load: Callable[[], List[PoliticianTrade]],
+        retry_interval: float = 300.0,
+        ttl: Optional[float] = None,
+    ):
+        self.load = load
+        self.retry_interval = retry_interval
+        self.ttl = ttl
+
+        self._index: Mapping[str, Tuple[PoliticianTrade, ...]] = MappingProxyType({})
+        self._lock = threading.Lock()
+        self._running = False
+        self._hydrated_at: Optional[float] = None
+        self._retry_at = 0.0
+
+        # Counters
+        self.hydrations = 0
+        self.failures = 0
+
+    def start(self) -> bool:
+        """
+        Start hydrating in the background unless it is running, still fresh, or recently failed.
+        """
+        with self._lock:
+            if self._running or not self._expired() or time.monotonic() < self._retry_at:
+                return False
+            self._running = True
+
+        threading.Thread(target=self.hydrate, name="trade-index-hydration", daemon=True).start()
+        return True
+
+    def _expired(self) -> bool:
+        if self._hydrated_at is None:
+            return True
+        return self.ttl is not None and time.time() - self._hydrated_at >= self.ttl
+
+    def hydrate(self):
+        """
+        Load every trade and publish the index (blocking; normally run through `start`).
+        """
+        print("Hydrating politician trade index...")
+        try:
+            trades = self.load()
+        except Exception as e:
+            print(f"Politician trade index hydration failed: {e}")
+            with self._lock:
+                self.failures += 1
+                self._retry_at = time.monotonic() + self.retry_interval
+                self._running = False
+            return
+
         # Group by ticker
-        for trade in all_trades:
-            if trade.ticker not in _TRADE_CACHE:
-                _TRADE_CACHE[trade.ticker] = []
-            _TRADE_CACHE[trade.ticker].append(trade)
-            
-    return _TRADE_CACHE.get(symbol, [])
+        grouped: Dict[str, List[PoliticianTrade]] = {}
+        for trade in trades:
+            grouped.setdefault(trade.ticker, []).append(trade)
+        index = MappingProxyType({ticker: tuple(items) for ticker, items in grouped.items()})
+
+        with self._lock:
+            self._index = index
+            self._hydrated_at = time.time()
+            self.hydrations += 1
+            self._running = False
+        print(f"Politician trade index ready: {len(trades)} trades across {len(index)} tickers")
+
+    def get(self, symbol: str) -> List[PoliticianTrade]:
+        # Single attribute read of an immutable mapping: safe without the lock
+        return list(self._index.get(symbol, ()))
+
+    def stats(self) -> Dict:
+        index = self._index
+        return {
+            "ready": self._hydrated_at is not None,
+            "hydrating": self._running,
+            "age_seconds": round(time.time() - self._hydrated_at, 1) if self._hydrated_at is not None else None,
+            "tickers": len(index),
+            "trades": sum(len(trades) for trades in index.values()),
+            "hydrations": self.hydrations,
+            "failures": self.failures,
+            "parse_cache_hits": parse_cache.hits,
+            "parse_cache_misses": parse_cache.misses,
+        }
+
+def _load_crawled_trades() -> List[PoliticianTrade]:
+    """
+    Crawl new filings from the House filing index, then load trades from every downloaded filing.
+    """
+    from app.services.disclosure_crawler import DisclosureCrawler
+
+    crawler = DisclosureCrawler(
+        settings.DISCLOSURE_CRAWL_PATH,
+        years=settings.DISCLOSURE_CRAWL_YEARS,
+        base_url=settings.DISCLOSURE_BASE_URL,
+        max_concurrency=settings.DISCLOSURE_CRAWL_CONCURRENCY,
+    )
+    result = crawler.crawl()
+    print(f"Disclosure crawl: {result['downloaded']} new, {result['skipped']} known, {result['failed']} failed")
+    trades = crawler.load_trades()
+    if not trades and not crawler.filings():
+        raise RuntimeError("No disclosure filings have been downloaded")
+    return trades
+
+# Hydrated at app startup; the first lookup starts it if startup did not.
+# DISCLOSURE_CRAWL_ENABLED switches from the demo filings to crawling every PTR filing,
+# re-crawled for new filings every DISCLOSURE_CRAWL_TTL seconds.
+if settings.DISCLOSURE_CRAWL_ENABLED:
+    trade_index = TradeIndex(_load_crawled_trades, ttl=settings.DISCLOSURE_CRAWL_TTL)
+else:
+    trade_index = TradeIndex(_load_demo_trades)
+
+def get_politician_trades(symbol: str) -> List[PoliticianTrade]:
+    """
+    Get politician trades for a specific symbol.
+    Never waits for hydration: returns no trades until the index is ready.
+    """
+    trade_index.start()
+    return trade_index.get(symbol)
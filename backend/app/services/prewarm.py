@@ -0,0 +1,173 @@
+import asyncio
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional
+
+class PrewarmScheduler:
+    """
+    Keeps ticker briefs warm for a watchlist and the most requested symbols.
+
+    Every `interval` seconds the scheduler picks the symbols whose cached brief is
+    missing or will go stale before the next cycle, orders them by (decayed) request
+    frequency, and refreshes at most `budget` of them with at most `concurrency`
+    rebuilds running at once.
+
+    Args:
+        refresh: Coroutine function that rebuilds and caches the brief for a symbol.
+        brief_age: Returns the age in seconds of the cached brief for a symbol, or None.
+        soft_ttl: Age after which a cached brief counts as stale.
+        watchlist: Symbols that are always kept warm.
+        top_n: How many of the most requested symbols to keep warm.
+        universe: Optional loader for extra symbols (e.g. the S&P 500) warmed with spare budget.
+        enabled: Whether requests are counted; off when the loop is not started, so nothing accumulates.
+        max_tracked: Most symbols whose request counts are kept; past it counts are decayed early
+            and, if still too many, only the most requested half is kept.
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[[str], Awaitable],
+        brief_age: Callable[[str], Optional[float]],
+        soft_ttl: float,
+        watchlist: Optional[List[str]] = None,
+        top_n: int = 20,
+        interval: float = 60.0,
+        budget: int = 25,
+        concurrency: int = 3,
+        decay: float = 0.8,
+        universe: Optional[Callable[[], Awaitable[List[str]]]] = None,
+        enabled: bool = True,
+        max_tracked: int = 1000,
+    ):
+        self.refresh = refresh
+        self.brief_age = brief_age
+        self.soft_ttl = soft_ttl
+        self.watchlist = [s.upper() for s in (watchlist or [])]
+        self.top_n = top_n
+        self.interval = interval
+        self.budget = budget
+        self.concurrency = max(1, concurrency)
+        self.decay = decay
+        self.universe = universe
+        self.enabled = enabled
+        self.max_tracked = max(max_tracked, 2 * top_n)
+
+        self._frequency: Counter = Counter()
+        self._universe_symbols: List[str] = []
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.cycles = 0
+        self.refreshed = 0
+        self.failed = 0
+
+    def record_request(self, symbol: str):
+        """
+        Count a user-facing request for `symbol`; frequent symbols are refreshed first.
+        """
+        if not self.enabled:
+            return
+        self._frequency[symbol.upper()] += 1
+        if len(self._frequency) > self.max_tracked:
+            self._fade()
+            if len(self._frequency) > self.max_tracked:
+                # Trim to half so a stream of one-off symbols does not trim on every request
+                self._frequency = Counter(dict(self._frequency.most_common(self.max_tracked // 2)))
+
+    def _fade(self):
+        """
+        Let old popularity fade so the warm set follows current traffic.
+        """
+        for symbol in list(self._frequency):
+            self._frequency[symbol] *= self.decay
+            if self._frequency[symbol] < 0.5:
+                del self._frequency[symbol]
+
+    def _needs_refresh(self, symbol: str) -> bool:
+        age = self.brief_age(symbol)
+        # Refresh anything that would otherwise go stale before the next cycle
+        return age is None or age + self.interval >= self.soft_ttl
+
+    def candidates(self) -> List[str]:
+        """
+        Symbols to refresh this cycle, highest priority first, limited by the budget.
+        """
+        popular = [symbol for symbol, _ in self._frequency.most_common(self.top_n)]
+
+        ordered: Dict[str, None] = {}
+        for symbol in popular + self.watchlist + self._universe_symbols:
+            ordered.setdefault(symbol)
+
+        # Priority by request frequency; watchlist before the rest of the universe on ties
+        watch = set(self.watchlist)
+        ranked = sorted(ordered, key=lambda s: (-self._frequency.get(s, 0), s not in watch))
+
+        due = [symbol for symbol in ranked if self._needs_refresh(symbol)]
+        return due[:self.budget]
+
+    async def run_cycle(self) -> int:
+        """
+        Refresh the due symbols once. Returns the number of successful refreshes.
+        """
+        if self.universe is not None and not self._universe_symbols:
+            try:
+                self._universe_symbols = [s.upper() for s in await self.universe()]
+            except Exception as e:
+                print(f"Prewarm universe load failed: {e}")
+
+        symbols = self.candidates()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def warm(symbol: str) -> bool:
+            async with semaphore:
+                try:
+                    await self.refresh(symbol)
+                    return True
+                except Exception as e:
+                    print(f"Prewarm failed for {symbol}: {e}")
+                    return False
+
+        results = await asyncio.gather(*[warm(symbol) for symbol in symbols])
+        succeeded = sum(results)
+
+        self.cycles += 1
+        self.refreshed += succeeded
+        self.failed += len(results) - succeeded
+
+        self._fade()
+        return succeeded
+
+    async def _run_forever(self):
+        while True:
+            try:
+                await self.run_cycle()
+            except Exception as e:
+                print(f"Prewarm cycle failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """
+        Start the background loop on the running event loop.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run_forever())
+
+    async def stop(self):
+        """
+        Cancel the background loop and wait for it to exit.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "cycles": self.cycles,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "tracked_symbols": len(self._frequency),
+        }
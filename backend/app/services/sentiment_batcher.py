@@ -0,0 +1,94 @@
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Set, Tuple
+
+SentimentScores = List[Tuple[str, float]]
+
+class SentimentBatcher:
+    """
+    Micro-batching queue for sentiment inference.
+
+    Headlines submitted by concurrent callers (e.g. several cold ticker briefs)
+    are merged into shared batches of at most `max_batch_size` texts. A partial
+    batch is flushed once its oldest headline has waited `max_wait` seconds.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[List[str]], Awaitable[SentimentScores]],
+        max_batch_size: int = 32,
+        max_wait: float = 0.01,
+    ):
+        self.score_batch = score_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait)
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+        # Counters for monitoring
+        self.batches_sent = 0
+        self.texts_scored = 0
+
+    async def score(self, texts: List[str]) -> SentimentScores:
+        """
+        Queue `texts` for scoring and wait for their (stance, confidence) results.
+        """
+        if not texts:
+            return []
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._pending.append((text, future))
+            futures.append(future)
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush(force=False)
+
+        if self._pending and self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush, True)
+
+        return list(await asyncio.gather(*futures))
+
+    def _flush(self, force: bool):
+        """
+        Dispatch full batches; with `force`, also dispatch the trailing partial batch.
+        """
+        while len(self._pending) >= self.max_batch_size or (force and self._pending):
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+
+            task = asyncio.ensure_future(self._run(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+        if self._timer is not None and not self._pending:
+            self._timer.cancel()
+            self._timer = None
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future]]):
+        # Skip headlines whose callers were cancelled while waiting
+        batch = [(text, future) for text, future in batch if not future.done()]
+        if not batch:
+            return
+
+        self.batches_sent += 1
+        self.texts_scored += len(batch)
+
+        try:
+            results = await self.score_batch([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+        for _, future in batch[len(results):]:
+            if not future.done():
+                future.set_exception(RuntimeError("Sentiment batch returned too few results"))
@@ -0,0 +1,163 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# FinBERT output for a fixed string never changes, so scores are cached by content:
+# an in-memory LRU in front of a SQLite file that survives restarts.
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize a headline for cache lookups: collapse whitespace and case-fold.
+    FinBERT is an uncased model, so case never changes its prediction.
+    """
+    return " ".join(text.split()).casefold()
+
+def cache_key(text: str, namespace: str = "") -> str:
+    """
+    Content-addressed key for a headline, scoped to the model that scored it.
+    """
+    return hashlib.sha256(f"{namespace}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+class SentimentCache:
+    """
+    Two-tier (stance, confidence) cache keyed by a hash of the normalized text.
+
+    Args:
+        path: SQLite file for the persistent tier. None or "" keeps the cache in memory only.
+        max_entries: Size of the in-memory LRU tier.
+        namespace: Model identity mixed into every key so different models never share scores.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 50000, namespace: str = ""):
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.namespace = namespace
+
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        # Counters
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if path:
+            try:
+                directory = os.path.dirname(os.path.abspath(path))
+                os.makedirs(directory, exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False, timeout=5)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS sentiment ("
+                    "key TEXT PRIMARY KEY, stance TEXT NOT NULL, confidence REAL NOT NULL)"
+                )
+                self._db.commit()
+            except (sqlite3.Error, OSError) as e:
+                print(f"Sentiment cache disk tier disabled ({path}): {e}")
+                self._db = None
+
+    def _remember(self, key: str, value: Tuple[str, float]):
+        # Caller holds the lock
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, texts: Iterable[str]) -> Dict[str, Tuple[str, float]]:
+        """
+        Look up several texts at once. Returns a dict of text -> (stance, confidence)
+        for the texts that were cached; missing texts are simply absent.
+        """
+        found: Dict[str, Tuple[str, float]] = {}
+        missing: Dict[str, List[str]] = {}
+
+        with self._lock:
+            for text in texts:
+                if text in found:
+                    continue
+                key = cache_key(text, self.namespace)
+                value = self._memory.get(key)
+                if value is not None:
+                    self._memory.move_to_end(key)
+                    found[text] = value
+                    self.hits += 1
+                else:
+                    missing.setdefault(key, []).append(text)
+
+            if missing and self._db is not None:
+                keys = list(missing)
+                try:
+                    # Stay well under SQLite's bound-parameter limit
+                    for start in range(0, len(keys), 500):
+                        chunk = keys[start:start + 500]
+                        placeholders = ",".join("?" * len(chunk))
+                        rows = self._db.execute(
+                            f"SELECT key, stance, confidence FROM sentiment WHERE key IN ({placeholders})",
+                            chunk,
+                        ).fetchall()
+                        for key, stance, confidence in rows:
+                            value = (stance, confidence)
+                            self._remember(key, value)
+                            for text in missing.pop(key):
+                                found[text] = value
+                                self.hits += 1
+                                self.disk_hits += 1
+                except sqlite3.Error as e:
+                    print(f"Sentiment cache read failed: {e}")
+
+            self.misses += sum(len(pending) for pending in missing.values())
+
+        return found
+
+    def get(self, text: str) -> Optional[Tuple[str, float]]:
+        """
+        Look up a single text. Returns None on a miss.
+        """
+        return self.get_many([text]).get(text)
+
+    def set_many(self, items: Iterable[Tuple[str, Tuple[str, float]]]):
+        """
+        Store (text, (stance, confidence)) pairs in both tiers.
+        """
+        rows = []
+        with self._lock:
+            for text, (stance, confidence) in items:
+                key = cache_key(text, self.namespace)
+                value = (stance, float(confidence))
+                self._remember(key, value)
+                rows.append((key, stance, value[1]))
+
+            if rows and self._db is not None:
+                try:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO sentiment (key, stance, confidence) VALUES (?, ?, ?)",
+                        rows,
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"Sentiment cache write failed: {e}")
+
+    def set(self, text: str, result: Tuple[str, float]):
+        """
+        Store a single (stance, confidence) result.
+        """
+        self.set_many([(text, result)])
+
+    def stats(self) -> Dict:
+        """
+        Hit/miss counters for monitoring.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "persistent": self._db is not None,
+            }
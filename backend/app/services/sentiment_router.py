@@ -0,0 +1,168 @@
+import random
+import threading
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+SentimentScores = List[Tuple[str, float]]
+
+class _Route:
+    """
+    One routed call: fast results plus the texts (and positions) that need the model.
+    """
+
+    def __init__(self, texts: List[str]):
+        self.results: SentimentScores = [("invalid_input", 0.0)] * len(texts)
+        self.fast: Dict[int, Tuple[str, float]] = {}
+        # Positions sent to the model, and whether each one is an audit of a fast decision
+        self.model_positions: List[int] = []
+        self.audited: List[bool] = []
+        self.texts = texts
+
+    @property
+    def model_texts(self) -> List[str]:
+        return [self.texts[i] for i in self.model_positions]
+
+class SentimentRouter:
+    """
+    Two-tier sentiment routing: a fast classifier (lexicon or hashed n-gram model)
+    decides every headline it is confident about, and only low-confidence ones go
+    to FinBERT.
+
+    A random `audit_rate` share of fast decisions is also sent to FinBERT (whose
+    answer is then used) to measure how often the fast tier agrees with it, so
+    `min_confidence` can be tuned from live traffic.
+
+    Disabled with `shadow`, every headline still goes to the model and the model's
+    answer is served, but the fast tier scores it too: the counters then show what
+    routing would have done (every confident decision counts as audited).
+
+    Args:
+        fast: Object with `predict_many(texts) -> [(stance, confidence)]`.
+        min_confidence: Fast confidence needed to skip the model.
+        audit_rate: Share of fast decisions double-checked by the model.
+        enabled: When False every headline goes to the model.
+        shadow: When disabled, still run the fast tier to measure its agreement.
+    """
+
+    def __init__(
+        self,
+        fast,
+        min_confidence: float = 0.9,
+        audit_rate: float = 0.05,
+        enabled: bool = True,
+        shadow: bool = False,
+    ):
+        self.fast = fast
+        self.min_confidence = min_confidence
+        self.audit_rate = audit_rate
+        self.enabled = enabled
+        self.shadow = shadow and not enabled
+        self._lock = threading.Lock()
+
+        # Counters
+        self.texts = 0
+        self.fast_decided = 0
+        self.escalated = 0
+        self.audited = 0
+        self.audit_agreed = 0
+        self.escalated_compared = 0
+        self.escalated_agreed = 0
+
+    def _plan(self, texts: List[str]) -> _Route:
+        route = _Route(texts)
+        valid = [i for i, text in enumerate(texts) if text and isinstance(text, str)]
+        predictions = []
+        if self.enabled:
+            predictions = self.fast.predict_many([texts[i] for i in valid])
+        elif self.shadow:
+            try:
+                predictions = self.fast.predict_many([texts[i] for i in valid])
+            except Exception as e:
+                # Shadow scoring must never affect what is served
+                print(f"Shadow fast sentiment failed: {e}")
+
+        fast_decided = 0
+        for i, prediction in zip(valid, predictions):
+            route.fast[i] = prediction
+            confident = prediction[1] >= self.min_confidence
+            fast_decided += confident
+            if self.enabled and confident and random.random() >= self.audit_rate:
+                route.results[i] = prediction
+                continue
+            route.model_positions.append(i)
+            route.audited.append(confident)
+        if not predictions:
+            route.model_positions = valid
+            route.audited = [False] * len(valid)
+
+        with self._lock:
+            self.texts += len(valid)
+            self.fast_decided += fast_decided
+            self.escalated += len(valid) - fast_decided
+        return route
+
+    def _merge(self, route: _Route, model_results: SentimentScores, with_source: bool = False) -> List[tuple]:
+        audited = audit_agreed = compared = agreed = 0
+        for i, audit, result in zip(route.model_positions, route.audited, model_results):
+            route.results[i] = result
+            fast = route.fast.get(i)
+            # ("neutral", 0.0) is the model's failure fallback, not a real label
+            if fast is None or result == ("neutral", 0.0):
+                continue
+            same = fast[0] == result[0]
+            if audit:
+                audited += 1
+                audit_agreed += same
+            else:
+                compared += 1
+                agreed += same
+
+        with self._lock:
+            self.audited += audited
+            self.audit_agreed += audit_agreed
+            self.escalated_compared += compared
+            self.escalated_agreed += agreed
+        if with_source:
+            # Which tier decided each result, e.g. so model-labelled data can be told apart;
+            # empty or non-string inputs were decided by neither
+            model_positions = set(route.model_positions)
+            return [
+                (*result, "model" if i in model_positions else "fast" if i in route.fast else "invalid")
+                for i, result in enumerate(route.results)
+            ]
+        return route.results
+
+    async def score(self, texts: List[str], model: Callable[[List[str]], Awaitable[SentimentScores]], with_source: bool = False) -> List[tuple]:
+        """
+        Score `texts`, awaiting `model` (e.g. the sentiment batcher) only for the routed subset.
+        With `with_source`, each result is (stance, confidence, "fast", "model" or "invalid").
+        """
+        route = self._plan(texts)
+        model_results = await model(route.model_texts) if route.model_positions else []
+        return self._merge(route, model_results, with_source)
+
+    def score_sync(self, texts: List[str], model: Callable[[List[str]], SentimentScores], with_source: bool = False) -> List[tuple]:
+        """
+        Blocking variant of `score`.
+        """
+        route = self._plan(texts)
+        model_results = model(route.model_texts) if route.model_positions else []
+        return self._merge(route, model_results, with_source)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "classifier": getattr(self.fast, "name", type(self.fast).__name__),
+                "enabled": self.enabled,
+                # In shadow mode the counts below are what routing would have done
+                "shadow": self.shadow,
+                "min_confidence": self.min_confidence,
+                "texts": self.texts,
+                "fast_decided": self.fast_decided,
+                "escalated": self.escalated,
+                "fast_rate": round(self.fast_decided / self.texts, 4) if self.texts else None,
+                "audited": self.audited,
+                # Agreement with FinBERT on confident fast decisions (the ones actually served)
+                "audit_agreement": round(self.audit_agreed / self.audited, 4) if self.audited else None,
+                # Agreement on low-confidence headlines the model decided anyway
+                "escalated_agreement": round(self.escalated_agreed / self.escalated_compared, 4) if self.escalated_compared else None,
+            }
@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from app.core.config import settings
+
+SP500_URL = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+
+# Only served when no snapshot has ever been saved
+FALLBACK_SP500 = ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA', 'BRK-B', 'JNJ', 'V', 'WMT', 'JPM', 'META', 'NVDA', 'UNH', 'HD', 'PG', 'DIS', 'MA', 'PYPL', 'BAC']
+
+def scrape_sp500_tickers() -> List[str]:
+    """
+    Scrape the current list of S&P 500 tickers from Wikipedia.
+    Returns a list of symbols with '.' replaced by '-' (e.g., BRK.B -> BRK-B). Raises on failure.
+    """
+    import pandas as pd
+
+    df = pd.read_html(SP500_URL, header=0)[0]
+    return df['Symbol'].astype(str).str.replace('.', '-', regex=False).tolist()
+
+class UniverseLoader:
+    """
+    Symbol universe served from memory, backed by a local snapshot file.
+
+    The snapshot is loaded on first use (or `warm()` at startup) and lists older than
+    `ttl` are still served while a background thread re-scrapes and rewrites the
+    snapshot. Only a cold start with no snapshot at all has nothing to serve: it either
+    scrapes synchronously (`wait=True`) or serves the fallback list until the
+    background refresh lands.
+
+    Args:
+        snapshot_path: JSON snapshot file; "" keeps the universe in memory only.
+        ttl: Seconds before the list is refreshed in the background.
+        fetch: Returns the current universe, raising on failure.
+        fallback: Served when neither memory nor a snapshot has a list.
+        retry_interval: Seconds to wait after a failed refresh before trying again.
+    """
+
+    def __init__(
+        self,
+        snapshot_path: str,
+        ttl: float = 86400.0,
+        fetch: Callable[[], List[str]] = scrape_sp500_tickers,
+        fallback: Optional[List[str]] = None,
+        retry_interval: float = 300.0,
+    ):
+        self.snapshot_path = snapshot_path
+        self.ttl = ttl
+        self.fetch = fetch
+        self.fallback = list(fallback if fallback is not None else FALLBACK_SP500)
+        self.retry_interval = retry_interval
+
+        self._tickers: Optional[List[str]] = None
+        self._fetched_at = 0.0
+        self._snapshot_checked = False
+        self._refreshing = False
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+        # Counters
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.fallback_served = 0
+
+    def _load_snapshot(self):
+        # Called with self._lock held
+        self._snapshot_checked = True
+        if not self.snapshot_path:
+            return
+        try:
+            with open(self.snapshot_path) as f:
+                snapshot = json.load(f)
+            tickers = snapshot["tickers"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        if tickers:
+            self._tickers = list(tickers)
+            self._fetched_at = float(snapshot.get("fetched_at", 0))
+
+    def _save_snapshot(self, tickers: List[str], fetched_at: float):
+        if not self.snapshot_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            tmp_path = f"{self.snapshot_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"fetched_at": fetched_at, "tickers": tickers}, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            print(f"Could not save universe snapshot to {self.snapshot_path}: {e}")
+
+    def refresh(self) -> bool:
+        """
+        Re-fetch the universe and persist it. Returns False (keeping the current list) on failure.
+        """
+        with self._refresh_lock:
+            try:
+                tickers = self.fetch()
+            except Exception as e:
+                print(f"Universe refresh failed, keeping current list: {e}")
+                tickers = None
+            if not tickers:
+                with self._lock:
+                    self.refresh_failures += 1
+                    self._retry_at = time.time() + self.retry_interval
+                return False
+
+            fetched_at = time.time()
+            self._save_snapshot(tickers, fetched_at)
+            with self._lock:
+                self._tickers = list(tickers)
+                self._fetched_at = fetched_at
+                self.refreshes += 1
+            return True
+
+    def refresh_in_background(self):
+        """
+        Start a refresh thread unless one is already running.
+        """
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+        self._retry_at = 0.0
+
+        threading.Thread(target=run, name="universe-refresh", daemon=True).start()
+
+    def warm(self):
+        """
+        Load the snapshot now and refresh in the background if it is missing or expired.
+        """
+        self.get(wait=False)
+
+    def get(self, wait: bool = False) -> List[str]:
+        """
+        Current universe. Never touches the network when a list is in memory or on disk.
+
+        Args:
+            wait: With nothing cached, scrape synchronously instead of serving the fallback list.
+        """
+        with self._lock:
+            if not self._snapshot_checked:
+                self._load_snapshot()
+            tickers = self._tickers
+            now = time.time()
+            expired = now - self._fetched_at > self.ttl and now >= self._retry_at
+
+        if tickers is None and wait:
+            self.refresh()
+            with self._lock:
+                tickers = self._tickers
+        elif expired:
+            self.refresh_in_background()
+
+        if tickers is None:
+            self.fallback_served += 1
+            return list(self.fallback)
+        return list(tickers)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            age = time.time() - self._fetched_at if self._tickers is not None else None
+            size = len(self._tickers) if self._tickers is not None else 0
+        return {
+            "size": size,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "fallback_served": self.fallback_served,
+        }
+
+sp500_universe = UniverseLoader(settings.UNIVERSE_SNAPSHOT_PATH, ttl=settings.UNIVERSE_TTL)
@@ -0,0 +1,93 @@
+"""
+Measure cold-start import cost: what a fresh process pays before it can serve its
+first request (the backend app, as loaded by api/index.py) or print CLI help.
+
+Usage:
+    cd backend
+    python bench_import_time.py [--runs 5] [--top 10] [--json results.json]
+
+Each target runs in a fresh interpreter with `python -X importtime`. The report shows
+the median wall time, the cumulative import time of the target module, its heaviest
+imports and which heavy optional dependencies were imported eagerly (there should be
+none). --json writes the same numbers in machine-readable form.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BACKEND)
+
+# Should only be imported when a request or a run needs them
+HEAVY = ("yfinance", "pandas", "numpy", "pypdf", "requests", "bs4", "torch", "transformers", "onnxruntime")
+
+TARGETS = [
+    # name, command, working directory, module whose cumulative time is reported
+    ("backend app", [sys.executable, "-X", "importtime", "-c", "import app.main"], BACKEND, "app.main"),
+    ("vercel entrypoint", [sys.executable, "-X", "importtime", "-c", "import index"], os.path.join(ROOT, "api"), "index"),
+    ("Starting_Algorithm --help", [sys.executable, "-X", "importtime", "main.py", "--help"], os.path.join(ROOT, "Starting_Algorithm"), None),
+]
+
+def parse_importtime(stderr: str):
+    """
+    [(module, self_us, cumulative_us)] from `-X importtime` output.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def measure(command, cwd, module, runs, top):
+    walls, rows = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(command, cwd=cwd, capture_output=True, text=True)
+        walls.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise RuntimeError(f"{' '.join(command)} failed:\n{result.stderr[-2000:]}")
+        rows = parse_importtime(result.stderr)
+
+    imported = {name for name, _, _ in rows}
+    # Top-level packages only, by cumulative time
+    packages = sorted((row for row in rows if "." not in row[0]), key=lambda row: row[2], reverse=True)
+    target_us = next((cumulative for name, _, cumulative in rows if name == module), None)
+    return {
+        "wall_ms_median": round(statistics.median(walls) * 1000, 1),
+        "wall_ms_min": round(min(walls) * 1000, 1),
+        "target_import_ms": round(target_us / 1000, 1) if target_us is not None else None,
+        "modules_imported": len(imported),
+        "heavy_imported": [name for name in HEAVY if name in imported],
+        "top_packages_ms": {name: round(cumulative / 1000, 1) for name, _, cumulative in packages[:top]},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", default=None, help="Also write results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for name, command, cwd, module in TARGETS:
+        result = measure(command, cwd, module, args.runs, args.top)
+        results[name] = result
+        print(f"\n{name}: {result['wall_ms_median']:.0f} ms wall (median of {args.runs})"
+              + (f", {result['target_import_ms']:.0f} ms importing {module}" if result["target_import_ms"] is not None else ""))
+        print(f"  heavy modules imported eagerly: {', '.join(result['heavy_imported']) or 'none'}")
+        for package, ms in result["top_packages_ms"].items():
+            print(f"  {package:<28} {ms:>8.1f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+if __name__ == "__main__":
+    main()
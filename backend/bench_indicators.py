@@ -0,0 +1,108 @@
+"""
+Benchmark the streaming IndicatorEngine against the pandas rolling/ewm computation.
+
+Usage:
+    cd backend
+    python bench_indicators.py [--bars 2520] [--window 504] [--updates 250]
+
+Serves a trailing window (2y by default) over a stored history that grows by one bar
+per update, the way the endpoint does, so the window's first bar moves every day.
+Checks that every MA/EMA value matches pandas over the window alone to the cent and
+compares the cost of that pandas recompute with the engine's incremental update.
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from app.services.bar_store import BAR_DTYPE
+from app.services.indicators import IndicatorEngine
+from app.services.ingest import PRICE_INDICATORS
+
+def make_bars(count: int, seed: int = 7) -> np.ndarray:
+    """
+    Synthetic daily bars: a random walk around $150 on consecutive days.
+    """
+    rng = np.random.default_rng(seed)
+    bars = np.zeros(count, dtype=BAR_DTYPE)
+    bars["day"] = np.arange(count) + 10000
+    bars["close"] = 150 + np.cumsum(rng.normal(0, 2, count))
+    return bars
+
+def pandas_indicators(bars: np.ndarray) -> dict:
+    close = pd.Series(bars["close"])
+    return {
+        "ma50": close.rolling(window=50).mean().to_numpy(),
+        "ma100": close.rolling(window=100).mean().to_numpy(),
+        "ema50": close.ewm(span=50, adjust=False).mean().to_numpy(),
+        "ema100": close.ewm(span=100, adjust=False).mean().to_numpy(),
+    }
+
+def cents_mismatches(expected: np.ndarray, actual: np.ndarray) -> int:
+    same_nan = np.isnan(expected) == np.isnan(actual)
+    valid = ~np.isnan(expected) & ~np.isnan(actual)
+    differ = np.round(expected[valid], 2) != np.round(actual[valid], 2)
+    return int((~same_nan).sum() + differ.sum())
+
+def run(total_bars: int, window_bars: int, updates: int):
+    bars = make_bars(total_bars + updates)
+    engine = IndicatorEngine(PRICE_INDICATORS)
+    window_bars = min(window_bars, total_bars)
+
+    print(f"--- Indicator benchmark: {total_bars} bars + {updates} streamed updates, "
+          f"sliding {window_bars}-bar window ---")
+
+    # Cold: seed the engine over the initial history
+    start = time.perf_counter()
+    engine.compute("BENCH", bars[:total_bars], start=total_bars - window_bars)
+    seed_ms = (time.perf_counter() - start) * 1000
+
+    mismatches = 0
+    max_abs_diff = 0.0
+    engine_time = 0.0
+    pandas_time = 0.0
+
+    # Warm: one new bar per call, plus a revision of the partial last bar
+    for n in range(total_bars + 1, total_bars + updates + 1):
+        stored = bars[:n].copy()
+        window_start = n - window_bars
+        for revise in (False, True):
+            if revise:
+                stored["close"][-1] += 0.37
+
+            start = time.perf_counter()
+            streamed = engine.compute("BENCH", stored, start=window_start)
+            engine_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            expected = pandas_indicators(stored[window_start:])
+            pandas_time += time.perf_counter() - start
+
+            for name in PRICE_INDICATORS:
+                mismatches += cents_mismatches(expected[name], streamed[name])
+                diff = np.abs(expected[name] - streamed[name])
+                if np.any(~np.isnan(diff)):
+                    max_abs_diff = max(max_abs_diff, float(np.nanmax(diff)))
+
+    calls = updates * 2
+    print(f"Engine seed (vectorized):       {seed_ms:8.2f} ms")
+    print(f"pandas full recompute per call: {pandas_time / calls * 1000:8.3f} ms")
+    print(f"Engine incremental per call:    {engine_time / calls * 1000:8.3f} ms")
+    print(f"Speedup:                        {pandas_time / engine_time:8.1f}x")
+    print(f"Max |engine - pandas|:          {max_abs_diff:.2e}")
+    print(f"Values differing at the cent:   {mismatches}")
+    print(f"Engine seeds / extensions:      {engine.seeded} / {engine.extended}")
+
+    if mismatches:
+        print("FAIL: engine output does not match pandas to the cent")
+    else:
+        print("PASS: engine output matches pandas to the cent")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark incremental indicators against pandas")
+    parser.add_argument("--bars", type=int, default=2520, help="Initial history length (default ~10y).")
+    parser.add_argument("--window", type=int, default=504, help="Trailing bars served per call (default ~2y).")
+    parser.add_argument("--updates", type=int, default=250, help="Bars streamed one at a time.")
+    args = parser.parse_args()
+
+    run(args.bars, args.window, args.updates)
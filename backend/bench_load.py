@@ -0,0 +1,546 @@
+"""
+Offline concurrent load test for the brief endpoints: the real FastAPI app runs in-process
+(httpx ASGITransport, no server, no network) with Yahoo Finance and the inference API
+replaced by stubs of configurable latency, driven by many concurrent clients.
+
+Usage:
+    cd backend
+    python bench_load.py [--scenarios cold,warm,herd,mixed] [--requests 1000] [--clients 50]
+                         [--universe 200] [--yahoo-latency 80] [--sentiment-latency 120]
+                         [--jitter 0.5] [--yahoo-error-rate 0] [--seed 7]
+                         [--out results.json] [--compare baseline.json] [--max-regression 0.2]
+                         [--min-regression-ms 5] [--verbose]
+
+Scenarios (caches are emptied before each one):
+    cold   every request is for a different, uncached symbol
+    warm   every symbol is cached first (up to the brief cache size), then read concurrently
+    herd   all clients ask for the same uncached symbol at once, one symbol per round
+    mixed  Zipf-distributed symbols over the universe, mixing single briefs, batch briefs
+           and streamed briefs
+
+Only the upstream calls are stubbed: data source memoization, circuit breakers, the
+sentiment router, batcher and cache, single-flight and the brief cache all run for real.
+Yahoo stubs block an executor thread like yfinance does; the inference stub is awaited
+like the pooled HTTP client. Latencies are log-normal around the given medians (--jitter is
+the sigma), so runs have a tail. Everything is seeded, so runs with the same flags issue
+the same requests.
+
+The shared brief cache tier is off by default; set BRIEF_L2_URL (e.g. sqlite:///tmp/l2.db)
+to include it. Each scenario uses its own key namespace, so runs never read each other's briefs.
+
+The report shows latency percentiles, throughput, brief cache hit rate and upstream call
+counts per scenario. --out writes them as JSON; --compare prints the change against an
+earlier --out file and exits with status 1 if a p95 or p99 got slower by more than
+--max-regression (a fraction) and at least --min-regression-ms.
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import warnings
+from collections import Counter
+
+# Benchmark settings, applied before the app reads its config: no shared cache tier unless
+# asked for, no persistent sentiment scores from earlier runs and no background imports
+os.environ.setdefault("BRIEF_L2_URL", "")
+os.environ.setdefault("SENTIMENT_CACHE_PATH", "")
+os.environ.setdefault("PRELOAD_MODULES", "false")
+
+SCENARIOS = ("cold", "warm", "herd", "mixed")
+
+# Share of requests per endpoint in the mixed scenario
+MIXED_ENDPOINTS = (("ticker", 0.7), ("batch", 0.2), ("stream", 0.1))
+
+# Large caps first, so the most requested symbols of the Zipf mix look familiar
+LARGE_CAPS = [
+    "AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "AVGO", "JPM", "LLY",
+    "V", "UNH", "XOM", "MA", "COST", "HD", "PG", "JNJ", "NFLX", "ABBV",
+    "BAC", "CRM", "AMD", "KO", "CVX", "MRK", "PEP", "ADBE", "WMT", "TMO",
+    "ORCL", "CSCO", "ACN", "MCD", "LIN", "ABT", "DIS", "WFC", "INTC", "QCOM",
+]
+
+HEADLINES = [
+    "{s} beats earnings estimates as revenue surges",
+    "{s} shares plunge after guidance cut",
+    "{s} announces date of annual shareholder meeting",
+    "Analysts upgrade {s} on strong cloud growth",
+    "{s} faces probe over accounting practices",
+    "{s} to present at industry conference next week",
+    "{s} raises dividend and expands buyback",
+    "{s} misses revenue forecast, shares fall",
+    "What investors should watch in {s} this quarter",
+    "{s} completes acquisition of software startup",
+    "{s} stock rallies to record high",
+    "{s} warns of slowdown in consumer demand",
+]
+
+def universe(size: int) -> list[str]:
+    """
+    `size` ticker symbols: the large caps, then made-up ones.
+    """
+    symbols = LARGE_CAPS[:size]
+    symbols += [f"Z{i:03d}" for i in range(size - len(symbols))]
+    return symbols
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """
+    Nearest-rank percentile of an ascending list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def latency_summary(latencies: list[float]) -> dict:
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+    }
+
+# --- Upstream Stubs ---
+
+class Upstream:
+    """
+    Stand-in for Yahoo Finance and the inference API: seeded latencies, optional Yahoo
+    failures and thread-safe call counters.
+    """
+
+    def __init__(self, yahoo_latency: float, sentiment_latency: float, jitter: float, yahoo_error_rate: float, seed: int, headlines: int):
+        self.yahoo_latency = yahoo_latency
+        self.sentiment_latency = sentiment_latency
+        self.jitter = jitter
+        self.yahoo_error_rate = yahoo_error_rate
+        self.headlines = headlines
+        self.calls = Counter()
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _delay(self, median: float) -> float:
+        with self._lock:
+            return median * self._rng.lognormvariate(0, self.jitter) if self.jitter else median
+
+    def _fails(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.yahoo_error_rate
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.calls[name] += n
+
+    def yahoo(self, dataset: str):
+        """
+        One blocking Yahoo request.
+        """
+        self.count("yahoo_requests")
+        time.sleep(self._delay(self.yahoo_latency))
+        if self._fails():
+            self.count("yahoo_errors")
+            raise RuntimeError(f"Stubbed Yahoo failure fetching {dataset}")
+
+    async def inference(self, texts: list[str]):
+        self.count("inference_requests")
+        self.count("inference_texts", len(texts))
+        await asyncio.sleep(self._delay(self.sentiment_latency))
+
+class FakeTicker:
+    """
+    The parts of `yf.Ticker` the brief services read, with deterministic per-symbol data.
+    """
+
+    def __init__(self, symbol: str, upstream: Upstream):
+        self.symbol = symbol
+        self.upstream = upstream
+        self._seed = int(hashlib.md5(symbol.encode()).hexdigest()[:8], 16)
+
+    @property
+    def news(self):
+        self.upstream.yahoo("news")
+        rng = random.Random(self._seed)
+        titles = rng.sample(HEADLINES, min(self.upstream.headlines, len(HEADLINES)))
+        return [
+            {"content": {
+                "title": title.format(s=self.symbol),
+                "clickThroughUrl": {"url": f"https://example.com/{self.symbol}/{i}"},
+                "provider": {"displayName": "Bench Wire"},
+                "pubDate": "2026-01-02T14:30:00Z",
+            }}
+            for i, title in enumerate(titles)
+        ]
+
+    @property
+    def info(self):
+        self.upstream.yahoo("info")
+        rng = random.Random(self._seed)
+        return {
+            "currentPrice": round(rng.uniform(10, 900), 2),
+            "regularMarketChangePercent": round(rng.uniform(-4, 4), 2),
+            "volume": rng.randint(10**5, 10**8),
+            "averageVolume": rng.randint(10**5, 10**8),
+            "exchange": "NMS",
+        }
+
+    @property
+    def options(self):
+        self.upstream.yahoo("options")
+        return ("2026-01-16", "2026-02-20")
+
+    def option_chain(self, expiration: str):
+        import pandas as pd
+
+        self.upstream.yahoo("option_chain")
+        rng = random.Random(self._seed)
+
+        class Chain:
+            calls = pd.DataFrame({"volume": [rng.randint(100, 5000) for _ in range(5)]})
+            puts = pd.DataFrame({"volume": [rng.randint(100, 5000) for _ in range(5)]})
+        return Chain()
+
+    @property
+    def institutional_holders(self):
+        import pandas as pd
+
+        self.upstream.yahoo("holders")
+        return pd.DataFrame({"Holder": ["Vanguard Group Inc", "Blackrock Inc.", "State Street Corp"]})
+
+    @property
+    def insider_transactions(self):
+        import pandas as pd
+
+        self.upstream.yahoo("insider_transactions")
+        return pd.DataFrame([
+            {"Insider": "Jane Doe", "Shares": 1200, "Ownership": "D", "Start Date": "2025-12-01", "Text": "Sale at price 101.20"},
+            {"Insider": "John Roe", "Shares": 800, "Ownership": "I", "Start Date": "2025-11-14", "Text": "Stock Award"},
+        ])
+
+def install_stubs(upstream: Upstream):
+    """
+    Replace the network-facing calls under the app with stubs; everything above them is real.
+    """
+    import httpx
+    from app.api import endpoints
+    from app.services import classifier
+    from app.services.datasource import TickerDataSource
+
+    def ticker(self) -> FakeTicker:
+        with self._guard:
+            if self._ticker is None:
+                self._ticker = FakeTicker(self.symbol, upstream)
+            return self._ticker
+
+    async def post(texts: list[str]) -> httpx.Response:
+        await upstream.inference(texts)
+        predictions = []
+        for text in texts:
+            digest = hashlib.md5(text.encode()).digest()
+            label = ("positive", "negative", "neutral")[digest[0] % 3]
+            score = 0.6 + digest[1] / 255 * 0.39
+            predictions.append([{"label": label, "score": score}, {"label": "neutral", "score": 1 - score}])
+        return httpx.Response(200, json=predictions, request=httpx.Request("POST", classifier.API_URL))
+
+    TickerDataSource.ticker = property(ticker)
+    classifier._post_async = post
+    # The disclosure index downloads PDFs when started; briefs read it from memory, so an empty one stands in
+    endpoints.get_politician_trades = lambda symbol: []
+
+def reset_caches(namespace: str):
+    """
+    Start a scenario with empty brief and sentiment caches. Briefs go to a fresh namespace,
+    which also isolates scenarios (and runs) sharing an L2 tier.
+    """
+    from app.api import endpoints
+    from app.core.config import settings
+    from app.services import classifier
+    from app.services.sentiment_cache import SentimentCache
+
+    endpoints.ticker_cache.clear()
+    endpoints.brief_cache.namespace = namespace
+    scores = SentimentCache(path="", max_entries=settings.SENTIMENT_CACHE_MAX_ENTRIES, namespace=classifier.sentiment_cache.namespace)
+    classifier.sentiment_cache = scores
+    endpoints.sentiment_cache = scores
+
+# --- Request Plans ---
+
+def zipf_weights(n: int, s: float) -> list[float]:
+    return [1 / (rank ** s) for rank in range(1, n + 1)]
+
+def plan_scenario(name: str, args, symbols: list[str], rng: random.Random) -> tuple[list[str], list[list[tuple[str, str]]]]:
+    """
+    (symbols to cache beforehand, request rounds). Each round is a list of (kind, path),
+    and a round starts once the previous one has finished.
+    """
+    if name == "cold":
+        count = min(args.requests, len(symbols))
+        if count < args.requests:
+            print(f"  cold: capped at {count} requests, one per symbol (raise --universe for more)")
+        return [], [[("ticker", f"/ticker/{symbol}") for symbol in rng.sample(symbols, count)]]
+
+    if name == "warm":
+        from app.api.endpoints import ticker_cache
+
+        # Only as many symbols as this process can hold, or evictions turn hits into rebuilds
+        cached = symbols[:int(ticker_cache.maxsize)]
+        if len(cached) < len(symbols):
+            print(f"  warm: reading {len(cached)} symbols, the brief cache size (BRIEF_L1_MAX_ENTRIES)")
+        return cached, [[("ticker", f"/ticker/{rng.choice(cached)}") for _ in range(args.requests)]]
+
+    if name == "herd":
+        rounds = max(1, args.requests // args.clients)
+        herd_symbols = rng.sample(symbols, min(rounds, len(symbols)))
+        return [], [[("ticker", f"/ticker/{symbol}")] * args.clients for symbol in herd_symbols]
+
+    if name == "mixed":
+        weights = zipf_weights(len(symbols), args.zipf)
+        kinds, kind_weights = zip(*MIXED_ENDPOINTS)
+        requests = []
+        for _ in range(args.requests):
+            kind = rng.choices(kinds, kind_weights)[0]
+            if kind == "batch":
+                picked = rng.choices(symbols, weights, k=rng.randint(2, args.batch_size))
+                requests.append((kind, f"/tickers/brief?symbols={','.join(dict.fromkeys(picked))}"))
+            elif kind == "stream":
+                requests.append((kind, f"/ticker/{rng.choices(symbols, weights)[0]}/stream?format=ndjson"))
+            else:
+                requests.append((kind, f"/ticker/{rng.choices(symbols, weights)[0]}"))
+        return [], [requests]
+
+    raise ValueError(f"Unknown scenario {name!r}; expected one of {', '.join(SCENARIOS)}")
+
+# --- Running ---
+
+async def drive(client, requests: list[tuple[str, str]], clients: int, latencies: dict, outcomes: Counter, failures: Counter):
+    """
+    Issue `requests` from `clients` concurrent clients, each sending its next request as
+    soon as the previous one completes. Failed requests are counted in `failures` by reason.
+    """
+    pending = iter(requests)
+
+    async def run_client():
+        for kind, path in pending:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                # Streamed briefs count once the whole body has arrived
+                body = response.content
+                if response.status_code != 200:
+                    raise RuntimeError(f"HTTP {response.status_code}")
+                if kind == "stream" and b'"event":"error"' in body:
+                    # The error event is the last line of the stream
+                    raise RuntimeError(f"error event {body.strip().splitlines()[-1].decode()[:200]}")
+                if kind == "batch":
+                    outcomes["batch_briefs_failed"] += len(response.json()["errors"])
+                outcomes["ok"] += 1
+            except Exception as e:
+                outcomes["error"] += 1
+                failures[f"{kind}: {e}"] += 1
+            latencies[kind].append(time.perf_counter() - start)
+
+    await asyncio.gather(*[run_client() for _ in range(clients)])
+
+def stats_delta(before: dict, after: dict) -> dict:
+    """
+    Change in the /stats counters the report uses.
+    """
+    def diff(section: str, key: str) -> int:
+        return (after[section].get(key) or 0) - (before[section].get(key) or 0)
+
+    lookups = {key: diff("brief_cache", key) for key in ("hit", "stale", "miss")}
+    total = sum(lookups.values())
+    router_texts = diff("sentiment_router", "texts")
+    return {
+        "brief_lookups": lookups,
+        "cache_hit_rate": round((lookups["hit"] + lookups["stale"]) / total, 4) if total else None,
+        "builds_started": diff("brief_builds", "started"),
+        "builds_coalesced": diff("brief_builds", "coalesced"),
+        "yahoo_calls": diff("upstream", "yahoo_calls"),
+        "yahoo_timeouts": diff("upstream", "yahoo_timeouts"),
+        "sentiment_batches": diff("sentiment_batcher", "batches_sent"),
+        "sentiment_texts_batched": diff("sentiment_batcher", "texts_scored"),
+        "router_fast_rate": round(diff("sentiment_router", "fast_decided") / router_texts, 4) if router_texts else None,
+    }
+
+async def run_scenario(name: str, client, upstream: Upstream, args, symbols: list[str], run_id: str) -> dict:
+    from app.api import endpoints
+
+    rng = random.Random(f"{args.seed}:{name}")
+    reset_caches(f"bench:{run_id}:{name}")
+    cached, rounds = plan_scenario(name, args, symbols, rng)
+
+    # The services log every fetch; keep that out of the report unless asked for
+    with contextlib.redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+        if cached:
+            # Not measured: build every brief the scenario reads, then let refreshes settle
+            await endpoints._build_ticker_briefs(cached)
+            await endpoints.brief_cache.flush()
+
+        before_stats = (await client.get("/stats")).json()
+        before_calls = Counter(upstream.calls)
+        latencies = {kind: [] for kind, _ in MIXED_ENDPOINTS}
+        outcomes, failures = Counter(), Counter()
+
+        start = time.perf_counter()
+        for requests in rounds:
+            await drive(client, requests, args.clients, latencies, outcomes, failures)
+        elapsed = time.perf_counter() - start
+
+        await endpoints.brief_cache.flush()
+        after_stats = (await client.get("/stats")).json()
+    calls = Counter(upstream.calls)
+    calls.subtract(before_calls)
+
+    everything = [value for values in latencies.values() for value in values]
+    return {
+        "requests": len(everything),
+        "errors": outcomes["error"],
+        "batch_briefs_failed": outcomes["batch_briefs_failed"],
+        "failures": dict(failures.most_common(5)),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(everything) / elapsed, 1) if elapsed else None,
+        "latency": latency_summary(everything),
+        "latency_by_endpoint": {kind: latency_summary(values) for kind, values in latencies.items() if values},
+        **stats_delta(before_stats, after_stats),
+        "upstream_requests": {key: calls[key] for key in ("yahoo_requests", "yahoo_errors", "inference_requests", "inference_texts")},
+    }
+
+async def run(args) -> dict:
+    import httpx
+    from app.main import app
+    from app.core.config import settings
+
+    upstream = Upstream(
+        args.yahoo_latency / 1000, args.sentiment_latency / 1000, args.jitter,
+        args.yahoo_error_rate, args.seed, args.headlines,
+    )
+    install_stubs(upstream)
+    # Retail sentiment is mocked with the global RNG
+    random.seed(args.seed)
+
+    symbols = universe(args.universe)
+    run_id = f"{os.getpid()}-{int(time.time())}"
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url=f"http://bench{settings.API_V1_STR}", timeout=120) as client:
+        for name in args.scenarios:
+            print(f"Running {name}...")
+            results[name] = await run_scenario(name, client, upstream, args, symbols, run_id)
+    return results
+
+# --- Reporting ---
+
+def print_report(results: dict):
+    header = f"{'scenario':<8} {'reqs':>6} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'hit':>6} {'builds':>7} {'joined':>7} {'yahoo':>6} {'infer':>6}"
+    print("\n" + header)
+    print("-" * len(header))
+    for name, result in results.items():
+        latency = result["latency"]
+        hit_rate = f"{result['cache_hit_rate']:.0%}" if result["cache_hit_rate"] is not None else "-"
+        print(
+            f"{name:<8} {result['requests']:>6} {result['errors']:>4} {result['throughput_rps']:>8.1f} "
+            f"{latency['p50_ms']:>8.1f} {latency['p95_ms']:>8.1f} {latency['p99_ms']:>8.1f} {latency['max_ms']:>8.1f} "
+            f"{hit_rate:>6} {result['builds_started']:>7} {result['builds_coalesced']:>7} "
+            f"{result['upstream_requests']['yahoo_requests']:>6} {result['upstream_requests']['inference_requests']:>6}"
+        )
+    for name, result in results.items():
+        for reason, count in result["failures"].items():
+            print(f"{name}: {count} x {reason}")
+    print("\nhit: brief cache hits (fresh or stale); builds/joined: brief builds started and requests that joined one;")
+    print("yahoo/infer: stubbed upstream requests.")
+
+COMPARED = (
+    ("p50_ms", lambda r: r["latency"]["p50_ms"], False),
+    ("p95_ms", lambda r: r["latency"]["p95_ms"], True),
+    ("p99_ms", lambda r: r["latency"]["p99_ms"], True),
+    ("throughput_rps", lambda r: r["throughput_rps"], False),
+    ("cache_hit_rate", lambda r: r["cache_hit_rate"], False),
+    ("yahoo_requests", lambda r: r["upstream_requests"]["yahoo_requests"], False),
+    ("inference_requests", lambda r: r["upstream_requests"]["inference_requests"], False),
+)
+
+def compare(results: dict, baseline: dict, max_regression: float, min_regression_ms: float) -> list[str]:
+    """
+    Print each metric against the baseline run and return the gated latency regressions:
+    slower by more than `max_regression` (a fraction) and by at least `min_regression_ms`,
+    so sub-millisecond noise on cache hits does not fail a run.
+    """
+    regressions = []
+    print(f"\n{'scenario':<8} {'metric':<20} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in results.items():
+        if name not in baseline["scenarios"]:
+            continue
+        for metric, value_of, gated in COMPARED:
+            old, new = value_of(baseline["scenarios"][name]), value_of(result)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            flag = ""
+            if gated and change > max_regression and new - old >= min_regression_ms:
+                flag = "  REGRESSION"
+                regressions.append(f"{name} {metric} {old} -> {new}")
+            print(f"{name:<8} {metric:<20} {old:>10} {new:>10} {change:>+8.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Comma-separated, run in this order")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per scenario")
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent clients")
+    parser.add_argument("--universe", type=int, default=200, help="Number of distinct symbols")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of symbol popularity (mixed)")
+    parser.add_argument("--batch-size", type=int, default=5, help="Most symbols per batch request (mixed)")
+    parser.add_argument("--headlines", type=int, default=8, help="News headlines per symbol")
+    parser.add_argument("--yahoo-latency", type=float, default=80, help="Median Yahoo request latency in ms")
+    parser.add_argument("--sentiment-latency", type=float, default=120, help="Median inference API latency in ms")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Log-normal sigma of stub latencies (0 for fixed)")
+    parser.add_argument("--yahoo-error-rate", type=float, default=0.0, help="Fraction of Yahoo requests that fail")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--verbose", action="store_true", help="Show the app's logs and warnings")
+    parser.add_argument("--out", default=None, help="Write results as JSON to this file")
+    parser.add_argument("--compare", default=None, help="Earlier --out file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Allowed p95/p99 slowdown with --compare")
+    parser.add_argument("--min-regression-ms", type=float, default=5, help="Ignore p95/p99 slowdowns smaller than this")
+    args = parser.parse_args()
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios {unknown}; expected some of {', '.join(SCENARIOS)}")
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    if not args.verbose:
+        warnings.simplefilter("ignore")
+    results = asyncio.run(run(args))
+    print_report(results)
+
+    config = {key: value for key, value in vars(args).items() if key not in ("out", "compare", "max_regression", "min_regression_ms", "verbose")}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "scenarios": results}, f, indent=2)
+        print(f"\nWrote {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != config:
+            print("\nNote: the baseline was run with different flags:")
+            for key in sorted(set(config) | set(baseline.get("config", {}))):
+                if baseline.get("config", {}).get(key) != config.get(key):
+                    print(f"  {key}: {baseline.get('config', {}).get(key)} -> {config.get(key)}")
+        regressions = compare(results, baseline, args.max_regression, args.min_regression_ms)
+        if regressions:
+            print(f"\n{len(regressions)} latency regression(s) over {args.max_regression:.0%}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Benchmark politician disclosure PDF parsing: the original serial parser against the
+process-pool parser and the content-hash parse cache.
+
+Usage:
+    cd backend
+    python bench_politician_pdf.py [--corpus DIR] [--copies 16] [--workers 4]
+
+With no --corpus, the corpus is `--copies` distinct variants of test_disclosure.pdf
+(a trailing PDF comment changes each file's hash without changing its content).
+Checks that every parser produces the same records as the original one.
+"""
+import argparse
+import glob
+import io
+import os
+import re
+import tempfile
+import time
+from pypdf import PdfReader
+
+from app.core.config import settings
+from app.services import politician
+
+INFO = {"politician": "Bench", "party": "-", "date": "2024-01-01"}
+
+def legacy_parse(pdf_content: bytes):
+    """
+    The original parse_pdf_trades loop: concatenated page text, regexes compiled per line.
+    """
+    reader = PdfReader(io.BytesIO(pdf_content))
+    text = ""
+    for page in reader.pages:
+        text += page.extract_text()
+
+    records = []
+    for line in text.split('\n'):
+        ticker_match = re.search(r'\(([A-Z]+)\)', line)
+        if ticker_match:
+            type_ = "Purchase" if " P " in line or "Purchase" in line else "Sale"
+            if " S " in line or "Sale" in line:
+                type_ = "Sale"
+            amount_match = re.search(r'\$[\d,]+ - \$[\d,]+', line)
+            amount = amount_match.group(0) if amount_match else "Unknown"
+            records.append({"ticker": ticker_match.group(1), "type": type_, "amount": amount})
+    return records
+
+def load_corpus(corpus: str, copies: int):
+    if corpus:
+        paths = sorted(glob.glob(os.path.join(corpus, "*.pdf")))
+        return [open(path, "rb").read() for path in paths]
+    base = open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_disclosure.pdf"), "rb").read()
+    return [base + f"\n% bench copy {i}\n".encode() for i in range(copies)]
+
+def as_records(trades):
+    return [{"ticker": t.ticker, "type": t.type, "amount": t.amount} for t in trades]
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed * 1000:9.1f} ms")
+    return result, elapsed
+
+def run(corpus: str, copies: int, workers: int):
+    pdfs = load_corpus(corpus, copies)
+    filings = [(content, INFO) for content in pdfs]
+    print(f"--- PDF parsing benchmark: {len(pdfs)} PDFs, {workers} workers, {os.cpu_count()} CPUs ---")
+
+    expected, legacy_time = timed("Original serial parser", lambda: [legacy_parse(c) for c in pdfs])
+
+    # Fresh, empty parse cache for each cold run
+    politician.parse_cache = politician.ParseCache("")
+    serial, serial_time = timed("Streamed lines, 1 process", lambda: politician.parse_pdfs_parallel(filings, max_workers=1))
+
+    politician.parse_cache = politician.ParseCache("")
+    default, default_time = timed(
+        f"Default (pool from {settings.PDF_PARSE_POOL_MIN} PDFs)",
+        lambda: politician.parse_pdfs_parallel(filings, max_workers=workers),
+    )
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        politician.parse_cache = politician.ParseCache(cache_dir)
+        pooled, pool_time = timed(
+            f"Process pool ({workers} workers)",
+            lambda: politician.parse_pdfs_parallel(filings, max_workers=workers, min_pool_batch=0),
+        )
+        cached, cached_time = timed("Parse cache (warm)", lambda: politician.parse_pdfs_parallel(filings, max_workers=workers))
+        print(f"Parse cache hits / misses:         {politician.parse_cache.hits} / {politician.parse_cache.misses}")
+
+    print(f"Speedup, process pool:            {legacy_time / pool_time:9.1f}x")
+    print(f"Speedup, default:                 {legacy_time / default_time:9.1f}x")
+    print(f"Speedup, parse cache:             {legacy_time / cached_time:9.1f}x")
+
+    mismatches = sum(
+        1
+        for results in (serial, default, pooled, cached)
+        for want, got in zip(expected, results)
+        if as_records(got) != want
+    )
+    if mismatches:
+        print(f"FAIL: {mismatches} parsed PDFs differ from the original parser")
+    else:
+        print("PASS: all parsers match the original parser")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark politician disclosure PDF parsing")
+    parser.add_argument("--corpus", default="", help="Directory of disclosure PDFs (default: variants of test_disclosure.pdf).")
+    parser.add_argument("--copies", type=int, default=16, help="Synthetic corpus size when no --corpus is given.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parser worker processes.")
+    args = parser.parse_args()
+
+    run(args.corpus, args.copies, args.workers)
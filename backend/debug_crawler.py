@@ -0,0 +1,115 @@
+import hashlib
+import io
+import tempfile
+import threading
+import zipfile
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.services.disclosure_crawler import DisclosureCrawler
+
+# Local stand-in for the House clerk site: a yearly filing index and fixture PDFs
+# (variants of test_disclosure.pdf), with ETag / Last-Modified and 304 support.
+
+YEAR = 2024
+LAST_MODIFIED = "Wed, 21 Feb 2024 00:00:00 GMT"
+# Fixed zip entry timestamp, so an unchanged index has the same bytes (and ETag) every time
+INDEX_DATE_TIME = (YEAR, 2, 21, 0, 0, 0)
+
+with open("test_disclosure.pdf", "rb") as f:
+    FIXTURE_PDF = f.read()
+
+filings = {}
+requests_seen = Counter()
+# While set, PDF requests answer 503 (a clerk site outage)
+outage = threading.Event()
+
+def add_filing(doc_id: str, first: str, last: str, filing_type: str = "P"):
+    filings[doc_id] = (first, last, filing_type)
+
+def index_zip() -> bytes:
+    members = "".join(
+        f"<Member><Prefix>Hon.</Prefix><Last>{last}</Last><First>{first}</First><Suffix />"
+        f"<FilingType>{filing_type}</FilingType><StateDst>CA11</StateDst><Year>{YEAR}</Year>"
+        f"<FilingDate>2/21/{YEAR}</FilingDate><DocID>{doc_id}</DocID></Member>"
+        for doc_id, (first, last, filing_type) in filings.items()
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        info = zipfile.ZipInfo(f"{YEAR}FD.xml", date_time=INDEX_DATE_TIME)
+        archive.writestr(info, f"<FinancialDisclosure>{members}</FinancialDisclosure>")
+    return buffer.getvalue()
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == f"/financial-pdfs/{YEAR}FD.zip":
+            body = index_zip()
+        elif self.path.startswith(f"/ptr-pdfs/{YEAR}/"):
+            doc_id = self.path.rsplit("/", 1)[-1].removesuffix(".pdf")
+            if outage.is_set():
+                requests_seen["503"] += 1
+                self.send_error(503)
+                return
+            if doc_id not in filings:
+                self.send_error(404)
+                return
+            body = FIXTURE_PDF + f"\n% {doc_id}\n".encode()
+        else:
+            self.send_error(404)
+            return
+
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            requests_seen["304"] += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        requests_seen["200"] += 1
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def run_crawl(crawler, label, **kwargs):
+    requests_seen.clear()
+    result = crawler.crawl(**kwargs)
+    result["changed"] = len(result["changed"])
+    print(f"{label:<28} {result}  HTTP: {dict(requests_seen)}")
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    for i in range(20):
+        add_filing(str(20024000 + i), "Member", f"Number{i}")
+    add_filing("10050000", "Annual", "Report", filing_type="O")
+
+    with tempfile.TemporaryDirectory() as root:
+        crawler = DisclosureCrawler(root, years=[YEAR], base_url=base_url, max_concurrency=4)
+        run_crawl(crawler, "First crawl:")
+        run_crawl(crawler, "Second crawl (no changes):")
+
+        add_filing("20025000", "Nancy", "Pelosi")
+        run_crawl(crawler, "After one new filing:")
+        run_crawl(crawler, "Revalidate everything:", revalidate=True)
+
+        # A fresh crawler reads the manifest back from disk
+        run_crawl(DisclosureCrawler(root, years=[YEAR], base_url=base_url), "Restarted crawler:")
+
+        trades = crawler.load_trades()
+        print(f"Loaded {len(trades)} trades from {len(crawler.filings())} filings, e.g. {trades[0] if trades else None}")
+
+        # Failed re-checks keep the good copies: the same trades load afterwards
+        outage.set()
+        run_crawl(crawler, "Revalidate during outage:", revalidate=True)
+        outage.clear()
+        print(f"After the outage: {len(crawler.load_trades())} trades from {len(crawler.filings())} filings")
+
+    server.shutdown()
@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Local stand-in for the Hugging Face inference API (SENTIMENT_API_URL): scores each input
+# with a few keywords, and can answer 503 (model loading), 429 (rate limited) or 500.
+#
+#   python debug_sentiment_stub.py            # run the scenarios below against it
+#   python debug_sentiment_stub.py --serve    # keep it running, then start the app with
+#                                             # SENTIMENT_API_URL=http://127.0.0.1:8765
+
+POSITIVE = ("beat", "surge", "record", "upgrade", "rally")
+NEGATIVE = ("miss", "plunge", "lawsuit", "downgrade", "recall")
+
+# Status every request answers with (200 scores the inputs)
+mode = {"status": 200}
+requests_seen = Counter()
+
+def score(text: str) -> list:
+    lowered = text.lower()
+    if any(word in lowered for word in POSITIVE):
+        best = "positive"
+    elif any(word in lowered for word in NEGATIVE):
+        best = "negative"
+    else:
+        best = "neutral"
+    return [{"label": label, "score": 0.9 if label == best else 0.05} for label in ("positive", "negative", "neutral")]
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        status = mode["status"]
+        requests_seen[str(status)] += 1
+        if status != 200:
+            self.send_response(status)
+            if status == 429:
+                self.send_header("Retry-After", "30")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        inputs = json.loads(body)["inputs"]
+        payload = json.dumps([score(text) for text in inputs]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def run_scenario(label, status, batches):
+    from app.core.breaker import sentiment_breaker
+    from app.services.classifier import analyze_sentiment_batch
+
+    mode["status"] = status
+    requests_seen.clear()
+    results = []
+    for i in range(batches):
+        # Distinct headlines per call, so the score cache never answers for the stub
+        results = analyze_sentiment_batch([f"{label} {i}: shares surge on record quarter", f"{label} {i}: recall widens"])
+    print(f"{label:<24} last results {results}  HTTP: {dict(requests_seen)}  circuit: {sentiment_breaker.state}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stub of the sentiment inference API")
+    parser.add_argument("--serve", action="store_true", help="Serve until interrupted instead of running the scenarios.")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port if args.serve else 0), StubHandler)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    if args.serve:
+        print(f"Stub inference API on {base_url}")
+        server.serve_forever()
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # Settings are read at import: point the classifier at the stub, with an in-memory score cache
+    os.environ["SENTIMENT_API_URL"] = base_url
+    os.environ["SENTIMENT_CACHE_PATH"] = ""
+
+    run_scenario("Healthy:", 200, batches=1)
+    run_scenario("Model loading (503):", 503, batches=3)
+    run_scenario("Rate limited (429):", 429, batches=8)
+    server.shutdown()
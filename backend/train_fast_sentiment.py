@@ -0,0 +1,100 @@
+"""
+Train the hashed n-gram first-stage sentiment model on FinBERT labels, and report
+how the fast tier would route and agree with FinBERT at several thresholds.
+
+Usage:
+    cd backend
+    python train_fast_sentiment.py labels.jsonl [more.jsonl ...] [--out fast_sentiment.json]
+
+Each input line is a JSON object with the headline in "text" (or "headline"/"title")
+and its label in "stance", e.g. the output of Starting_Algorithm's `--high-out` /
+`--low-out` files. Only rows FinBERT labelled ("label_source": "finbert") are used:
+with the router on, those files also hold labels the fast tier chose itself, and
+training on them would teach the model its own output. Rows without a label_source
+(files written before it was recorded) are skipped unless --allow-untagged is given.
+Serve the result with SENTIMENT_FAST_MODEL_PATH=fast_sentiment.json.
+"""
+import argparse
+import json
+import random
+import time
+from collections import Counter
+
+from app.services.fast_sentiment import LABELS, HashedNgramClassifier, LexiconClassifier
+
+THRESHOLDS = (0.6, 0.7, 0.8, 0.85, 0.9, 0.95)
+
+# label_source of rows scored by FinBERT (see Starting_Algorithm/main.py)
+FINBERT_SOURCE = "finbert"
+
+def load_examples(paths, allow_untagged=False):
+    examples = {}
+    skipped = Counter()
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                text = row.get("text") or row.get("headline") or row.get("title")
+                if not text or row.get("stance") not in LABELS:
+                    continue
+                source = row.get("label_source")
+                if source is None and not allow_untagged:
+                    skipped["untagged"] += 1
+                    continue
+                if source is not None and source != FINBERT_SOURCE:
+                    skipped[source] += 1
+                    continue
+                examples[text] = row["stance"]
+    for source, count in skipped.items():
+        if source == "untagged":
+            print(f"Skipped {count} rows without a label_source (use --allow-untagged if FinBERT labelled them)")
+        else:
+            print(f"Skipped {count} rows labelled by {source}")
+    return list(examples.items())
+
+def routing_report(name, classifier, examples):
+    start = time.perf_counter()
+    predictions = classifier.predict_many([text for text, _ in examples])
+    per_text_us = (time.perf_counter() - start) / max(len(examples), 1) * 1e6
+    print(f"\n{name}: {per_text_us:.1f} us/headline over {len(examples)} held-out headlines")
+    print(f"  {'threshold':>9}  {'fast rate':>9}  {'agreement':>9}")
+    for threshold in THRESHOLDS:
+        decided = [(p[0], label) for p, (_, label) in zip(predictions, examples) if p[1] >= threshold]
+        rate = len(decided) / len(examples) if examples else 0.0
+        agreement = sum(p == label for p, label in decided) / len(decided) if decided else float("nan")
+        print(f"  {threshold:>9.2f}  {rate:>9.1%}  {agreement:>9.1%}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("labels", nargs="+", help="JSON Lines files with text and FinBERT stance")
+    parser.add_argument("--out", default="fast_sentiment.json")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Share of headlines kept for evaluation")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--features", type=int, default=2 ** 18)
+    parser.add_argument("--ngrams", type=int, default=2)
+    parser.add_argument("--allow-untagged", action="store_true",
+                        help="Also use rows without a label_source (only for files written with every headline sent to FinBERT)")
+    args = parser.parse_args()
+
+    examples = load_examples(args.labels, allow_untagged=args.allow_untagged)
+    if not examples:
+        raise SystemExit("No labelled headlines found")
+    random.Random(0).shuffle(examples)
+    split = int(len(examples) * (1 - args.holdout))
+    train, held_out = examples[:split], examples[split:] or examples[:split]
+    print(f"{len(train)} training / {len(held_out)} held-out headlines")
+
+    start = time.perf_counter()
+    model = HashedNgramClassifier.fit(train, n_features=args.features, ngrams=args.ngrams, epochs=args.epochs)
+    print(f"Trained in {time.perf_counter() - start:.1f}s ({len(model.weights)} active features)")
+
+    routing_report("lexicon", LexiconClassifier(), held_out)
+    routing_report("hashed n-gram", model, held_out)
+
+    model.save(args.out)
+    print(f"\nSaved model to {args.out}")
+
+if __name__ == "__main__":
+    main()